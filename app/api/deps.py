@@ -3,12 +3,12 @@
 Emergency fallback procedure (if Yahoo Finance API breaks):
 
   PRICE PROVIDER
-    Step 1: requirements.txt  -> uncomment yfinance and pandas
-    Step 2: this file         -> swap the import below:
-              active:   from app.market_data.yahoo_finance_provider import YahooFinanceProvider
-              fallback: from app.market_data.yfinance_provider import YFinanceProvider
-            and replace YahooFinanceProvider() with YFinanceProvider() in _build_provider()
-    Step 3: rebuild Docker image
+    PRICE_PROVIDERS lists the providers to chain, e.g. "yahoo,yfinance".
+    Requests go to the fastest healthy provider and fail over
+    automatically (see app/market_data/registry.py).
+    The yfinance provider needs yfinance and pandas: uncomment them in
+    requirements.txt and rebuild the Docker image once; after that it is
+    enabled or disabled by setting PRICE_PROVIDERS and restarting.
 
   SEARCH PROVIDER
     Step 1: requirements.txt           -> uncomment yfinance
@@ -17,43 +17,347 @@ Emergency fallback procedure (if Yahoo Finance API breaks):
     Step 3: rebuild Docker image
 """
 
-from functools import lru_cache
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException, Request, Response
+from starlette.requests import HTTPConnection
 
+from app.core import executors
+from app.core.admission import AdmissionController
 from app.core.config import get_settings
+from app.core.rate_limit import AbstractRateLimiter, Budget, Decision, MemoryRateLimiter
 from app.market_data.base import AbstractMarketDataProvider, AbstractTickerSearchProvider
 from app.market_data.cache import AbstractCache, LocalCache
 from app.market_data.cached_provider import CachedMarketDataProvider
+from app.market_data.cached_search_provider import CachedTickerSearchProvider
+from app.market_data.file_provider import FileMarketDataProvider
+from app.market_data.hedging import Hedger
+from app.market_data.indexed_search_provider import IndexedTickerSearchProvider
+from app.market_data.market_hours import cache_ttl
+from app.market_data.price_updates import PriceUpdates
+from app.market_data.registry import ProviderRegistry
+from app.market_data.snapshot import load_snapshot, run_snapshots, write_snapshot
+from app.market_data.streaming import Popularity, PriceStreamer
+from app.market_data.symbol_index import BUNDLED_SYMBOLS, SymbolIndex
 from app.market_data.yahoo_finance_provider import YahooFinanceProvider
 from app.market_data.yahoo_search_provider import YahooTickerSearchProvider
+from app.schemas.result import RebalanceResponse
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
 
 
 @lru_cache(maxsize=1)
-def _build_cache() -> AbstractCache:
+def get_redis_client() -> "Redis":
+    """Return the process-wide Redis client; its pool is shared by every user."""
+    s = get_settings()
+    if not s.redis_url:
+        raise ValueError(
+            "REDIS_URL must be set when CACHE_BACKEND=redis. "
+            "Pass it as an environment variable."
+        )
+    from app.market_data.redis_cache import create_client, create_pool
+    pool = create_pool(
+        s.redis_url,
+        max_connections=s.redis_max_connections,
+        pool_timeout=s.redis_pool_timeout_seconds,
+        socket_timeout=s.redis_socket_timeout_seconds,
+    )
+    return create_client(pool)
+
+
+@lru_cache(maxsize=1)
+def _build_cache() -> AbstractCache[float]:
     s = get_settings()
     if s.cache_backend == "redis":
-        if not s.redis_url:
-            raise ValueError(
-                "REDIS_URL must be set when CACHE_BACKEND=redis. "
-                "Pass it as an environment variable."
-            )
         from app.market_data.redis_cache import RedisCache
-        return RedisCache(url=s.redis_url, ttl_seconds=s.cache_ttl_seconds)
-    return LocalCache(ttl_seconds=s.cache_ttl_seconds)
+        return RedisCache(get_redis_client(), ttl_seconds=s.cache_ttl_seconds)
+    if s.cache_backend == "shm":
+        from app.market_data.shm_cache import SharedMemoryCache
+        return SharedMemoryCache(
+            name=s.shm_cache_name, ttl_seconds=s.cache_ttl_seconds, slots=s.shm_cache_slots,
+        )
+    return LocalCache(ttl_seconds=s.cache_ttl_seconds, name="price")
+
+
+def _build_hedger(endpoint: str) -> Hedger:
+    s = get_settings()
+    return Hedger(
+        [h.strip() for h in s.yahoo_hosts.split(",") if h.strip()],
+        endpoint=endpoint,
+        percentile=s.yahoo_hedge_percentile,
+        min_delay=s.yahoo_hedge_min_delay_seconds,
+    )
+
+
+def _build_yfinance() -> AbstractMarketDataProvider:
+    from app.market_data.yfinance_provider import YFinanceProvider
+    return YFinanceProvider()
+
+
+def _build_file_provider() -> AbstractMarketDataProvider:
+    path = get_settings().price_file_path
+    if not path:
+        raise ValueError("PRICE_FILE_PATH must be set when PRICE_PROVIDERS includes 'file'.")
+    return FileMarketDataProvider(Path(path))
+
+
+_PRICE_PROVIDERS = {
+    "yahoo": lambda: YahooFinanceProvider(_build_hedger("chart")),
+    "yfinance": _build_yfinance,
+    "file": _build_file_provider,
+}
+
+
+def _build_upstream() -> AbstractMarketDataProvider:
+    s = get_settings()
+    names = [n.strip() for n in s.price_providers.split(",") if n.strip()]
+    unknown = [n for n in names if n not in _PRICE_PROVIDERS]
+    if not names or unknown:
+        raise ValueError(
+            f"PRICE_PROVIDERS must list providers from {sorted(_PRICE_PROVIDERS)}, "
+            f"got {s.price_providers!r}."
+        )
+    # Also used for a single provider: it records per-provider metrics.
+    return ProviderRegistry(
+        [(n, _PRICE_PROVIDERS[n]()) for n in names],
+        failure_threshold=s.provider_failure_threshold,
+        cooldown_seconds=s.provider_cooldown_seconds,
+    )
+
+
+@lru_cache(maxsize=1)
+def _build_popularity() -> Popularity | None:
+    """Ticker request counts steering the price stream; None without one."""
+    return Popularity() if get_settings().price_stream_url else None
 
 
 @lru_cache(maxsize=1)
 def _build_provider() -> AbstractMarketDataProvider:
-    return CachedMarketDataProvider(YahooFinanceProvider(), _build_cache())
+    s = get_settings()
+    ttl_policy = (
+        partial(cache_ttl, max_ttl_seconds=s.cache_max_ttl_seconds)
+        if s.market_hours_ttl else None
+    )
+    popularity = _build_popularity()
+    return CachedMarketDataProvider(
+        _build_upstream(), _build_cache(), ttl_policy,
+        on_lookup=popularity.record if popularity is not None else None,
+        on_update=get_price_updates().publish,
+    )
 
 
 def get_market_provider() -> AbstractMarketDataProvider:
     return _build_provider()
 
 
+@lru_cache(maxsize=1)
+def get_price_updates() -> PriceUpdates:
+    """Prices written to the price cache by this process, for live watchers."""
+    return PriceUpdates()
+
+
+@lru_cache(maxsize=1)
+def _build_search_cache() -> AbstractCache[dict]:
+    s = get_settings()
+    if s.cache_backend == "redis":
+        from app.market_data.redis_cache import RedisCache
+        return RedisCache(
+            get_redis_client(),
+            ttl_seconds=s.search_cache_ttl_seconds,
+            loads=json.loads,
+            dumps=json.dumps,
+        )
+    return LocalCache(
+        ttl_seconds=s.search_cache_ttl_seconds,
+        max_entries=s.search_cache_max_entries,
+        name="search",
+    )
+
+
+@lru_cache(maxsize=1)
+def get_result_cache() -> LocalCache[RebalanceResponse] | None:
+    """Rebalance responses by :func:`result_key`; None when disabled.
+
+    Kept for the price TTL: past it the prices, and so the key, have
+    usually changed and the entry would not be hit again.
+    """
+    s = get_settings()
+    if s.result_cache_max_entries <= 0:
+        return None
+    return LocalCache(
+        ttl_seconds=s.cache_ttl_seconds,
+        max_entries=s.result_cache_max_entries,
+        name="rebalance_result",
+    )
+
+
+@lru_cache(maxsize=1)
+def _build_symbol_index() -> SymbolIndex:
+    path = get_settings().symbol_index_path
+    return SymbolIndex.from_csv(Path(path) if path else BUNDLED_SYMBOLS)
+
+
 @lru_cache(maxsize=1)
 def _build_search_provider() -> AbstractTickerSearchProvider:
-    return YahooTickerSearchProvider()
+    upstream = CachedTickerSearchProvider(
+        YahooTickerSearchProvider(_build_hedger("search")), _build_search_cache(),
+    )
+    return IndexedTickerSearchProvider(
+        _build_symbol_index(), upstream, get_settings().symbol_index_min_hits,
+        result_limit=YahooTickerSearchProvider.result_limit,
+    )
 
 
 def get_ticker_search_provider() -> AbstractTickerSearchProvider:
     return _build_search_provider()
+
+
+def check_admin_token(token: str | None) -> None:
+    """Reject the request with 403 unless ``token`` matches ADMIN_TOKEN.
+
+    Admin features are disabled entirely while ADMIN_TOKEN is unset.
+    """
+    expected = get_settings().admin_token
+    if not expected or token is None or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="A valid X-Admin-Token header is required.")
+
+
+@lru_cache(maxsize=1)
+def _build_rate_limiter() -> AbstractRateLimiter:
+    if get_settings().cache_backend == "redis":
+        from app.core.rate_limit import RedisRateLimiter
+        return RedisRateLimiter(get_redis_client())
+    return MemoryRateLimiter()
+
+
+@lru_cache(maxsize=1)
+def _api_keys() -> frozenset[str]:
+    return frozenset(k.strip() for k in get_settings().rate_limit_api_keys.split(",") if k.strip())
+
+
+def _client_id(request: HTTPConnection) -> str:
+    api_key = request.headers.get("X-API-Key")
+    # Only configured keys get a bucket of their own: anyone can make up a
+    # key, so an unknown one is limited by IP like no key at all.
+    if api_key and api_key in _api_keys():
+        # Keys are secrets: bucket them by digest, never store them.
+        return "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:32]
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+async def acquire_rate_limit(budget: str, connection: HTTPConnection) -> Decision | None:
+    """Take one request from the client's ``budget``; None when it is not enforced."""
+    s = get_settings()
+    per_minute = getattr(s, f"rate_limit_{budget}_per_minute")
+    if per_minute <= 0:
+        return None
+    return await _build_rate_limiter().acquire(
+        _client_id(connection), Budget(budget, per_minute, getattr(s, f"rate_limit_{budget}_burst")),
+    )
+
+
+def rate_limit(budget: str) -> Callable[[Request, Response], Awaitable[None]]:
+    """Dependency enforcing the per-client ``budget`` ("rebalance" or "search").
+
+    Sets ``RateLimit-Limit``, ``RateLimit-Remaining`` and ``RateLimit-Reset``
+    on the response; rejects with 429 and ``Retry-After`` when the bucket is
+    empty. A budget with a rate of 0 is not enforced.
+    """
+
+    async def dependency(request: Request, response: Response) -> None:
+        decision = await acquire_rate_limit(budget, request)
+        if decision is None:
+            return
+        headers = {
+            "RateLimit-Limit": str(decision.limit),
+            "RateLimit-Remaining": str(decision.remaining),
+            "RateLimit-Reset": str(decision.reset_seconds),
+        }
+        if not decision.allowed:
+            headers["Retry-After"] = str(decision.retry_after)
+            raise HTTPException(status_code=429, detail="Rate limit exceeded.", headers=headers)
+        response.headers.update(headers)
+
+    return dependency
+
+
+_background_tasks: set[asyncio.Task] = set()
+_admission: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController | None:
+    """The controller for the running event loop; None when disabled."""
+    return _admission
+
+
+async def open_resources() -> None:
+    """Build shared resources on the event loop before the first request."""
+    global _admission
+    s = get_settings()
+    get_ticker_search_provider()  # loads the local symbol index
+    loop = asyncio.get_running_loop()
+    # Requests and cache I/O run on the default executor: bound it and
+    # export its queue depth. CPU-heavy solves use the process pool.
+    loop.set_default_executor(executors.track(
+        "io", ThreadPoolExecutor(max_workers=s.io_workers, thread_name_prefix="io"),
+    ))
+    # asyncio primitives belong to one loop: build it here, not lru-cached.
+    _admission = AdmissionController(
+        s.admission_max_concurrent,
+        s.admission_max_queue,
+        s.admission_queue_timeout_seconds,
+        s.admission_expensive_cells,
+        s.admission_expensive_cold_tickers,
+    ) if s.admission_max_concurrent > 0 else None
+    if s.solver_processes > 0:
+        await loop.run_in_executor(
+            None, executors.start_cpu_pool, s.solver_processes, s.solver_process_min_cells,
+        )
+    if s.cache_backend == "redis":
+        _build_cache().bind_loop(loop)
+        _build_search_cache().bind_loop(loop)
+    elif s.cache_backend == "local" and s.price_snapshot_path:
+        path = Path(s.price_snapshot_path)
+        await loop.run_in_executor(None, load_snapshot, path, _build_cache())
+        _background_tasks.add(asyncio.create_task(
+            run_snapshots(path, _build_cache(), s.price_snapshot_interval_seconds)
+        ))
+    if s.price_stream_url:
+        _background_tasks.add(asyncio.create_task(PriceStreamer(
+            s.price_stream_url, _build_cache(), _build_popularity(),
+            s.price_stream_top_n, s.price_stream_refresh_seconds,
+            on_update=get_price_updates().publish,
+        ).run()))
+
+
+async def close_resources() -> None:
+    s = get_settings()
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    _background_tasks.clear()
+    executors.stop_cpu_pool()
+    if s.cache_backend == "redis":
+        await get_redis_client().connection_pool.disconnect()
+    elif s.cache_backend == "local" and s.price_snapshot_path:
+        try:
+            write_snapshot(Path(s.price_snapshot_path), _build_cache())
+        except OSError as exc:
+            logger.warning("Could not write price snapshot on shutdown: %s", exc)
+    elif s.cache_backend == "shm":
+        # Detaches this worker only: the segment itself outlives it.
+        _build_cache().close()
+        _build_cache.cache_clear()
+        _build_provider.cache_clear()
@@ -5,6 +5,7 @@ import logging
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
+from app.api.deps import get_redis_client
 from app.core.config import get_settings
 
 router = APIRouter(tags=["health"])
@@ -17,19 +18,13 @@ async def health() -> JSONResponse:
 
 
 @router.get("/ready", include_in_schema=False)
-def ready() -> JSONResponse:
+async def ready() -> JSONResponse:
     settings = get_settings()
     if settings.cache_backend == "redis":
         if not settings.redis_url:
             return JSONResponse(status_code=503, content={"status": "redis_url_missing"})
         try:
-            import redis
-            client = redis.from_url(
-                settings.redis_url,
-                socket_connect_timeout=2,
-                socket_timeout=2,
-            )
-            client.ping()
+            await get_redis_client().ping()
         except Exception as exc:
             logger.warning("Readiness check failed: %s", exc)
             return JSONResponse(status_code=503, content={"status": "redis_unavailable"})
@@ -0,0 +1,14 @@
+"""GET /metrics in the Prometheus text exposition format."""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core import metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+# Mounted at the root rather than under /v1, where Prometheus scrapers look by default.
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,31 +1,384 @@
 """POST /v1/rebalance endpoint."""
 
 import asyncio
+import json
 import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import ExitStack, asynccontextmanager, nullcontext
+from pathlib import Path
 
-from fastapi import APIRouter, Depends
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from pydantic import ValidationError
 
-from app.api.deps import get_market_provider
-from app.core.exceptions import MarketDataError
+from app.api.deps import (
+    acquire_rate_limit,
+    check_admin_token,
+    get_admission_controller,
+    get_market_provider,
+    get_price_updates,
+    get_result_cache,
+    rate_limit,
+)
+from app.core import metrics, tracing
+from app.core.admission import AdmissionController
+from app.core.concurrency import CancelToken, SingleFlight, cancel_on_disconnect
+from app.core.config import get_settings
+from app.core.exceptions import ClientDisconnected, MarketDataError, Overloaded
 from app.market_data.base import AbstractMarketDataProvider
+from app.market_data.cache import LocalCache, record_lookups
+from app.market_data.price_updates import PriceUpdates
+from app.rebalance import SolverCancelled
 from app.schemas.request import RebalanceRequest
 from app.schemas.result import RebalanceResponse
-from app.services.rebalance_service import run_rebalance
+from app.services.profiling import profile_rebalance
+from app.services.rebalance_service import (
+    estimate_cost,
+    resolve_prices,
+    result_key,
+    run_rebalance,
+    solve,
+    validate_prices,
+)
 
 router = APIRouter(tags=["rebalance"])
 logger = logging.getLogger(__name__)
 
+# Identical requests at identical prices in flight at the same time share one solve.
+_inflight: SingleFlight[RebalanceResponse] = SingleFlight()
+# Live sockets whose cached prices expired share one fetch per ticker list.
+_refreshes: SingleFlight[list[float]] = SingleFlight()
 
-@router.post("/rebalance", response_model=RebalanceResponse)
-async def rebalance(
+_LIVE_SESSIONS = metrics.gauge("live_rebalance_sessions", "Open /v1/rebalance/live sockets.")
+_LIVE_PUSHES = metrics.counter("live_rebalance_pushes_total", "Responses pushed to live sockets.")
+
+
+async def _is_expensive(
+    admission: AdmissionController,
     payload: RebalanceRequest,
-    provider: AbstractMarketDataProvider = Depends(get_market_provider),
+    provider: AbstractMarketDataProvider,
+) -> bool:
+    if not admission.may_be_expensive(len(payload.assets), payload.optimal_redistribute):
+        return False
+    # Only the caching provider can tell warm tickers apart; treat others as cold.
+    peek = getattr(provider, "peek", None)
+    cached = await peek([a.ticker for a in payload.assets]) if peek is not None else {}
+    return admission.is_expensive(*estimate_cost(payload, cached))
+
+
+@asynccontextmanager
+async def _admitted(
+    admission: AdmissionController | None,
+    payload: RebalanceRequest,
+    provider: AbstractMarketDataProvider,
+) -> AsyncIterator[None]:
+    if admission is None:
+        yield
+        return
+    async with admission.admit(await _is_expensive(admission, payload, provider)):
+        yield
+
+
+async def _run(call: Callable[[], RebalanceResponse]) -> RebalanceResponse:
+    return await asyncio.get_running_loop().run_in_executor(None, call)
+
+
+async def _run_cached(
+    payload: RebalanceRequest,
+    prices: list[float],
+    key: str,
+    results: LocalCache[RebalanceResponse],
+    timeout: float | None,
 ) -> RebalanceResponse:
+    """Serve ``payload`` from ``results`` when it was solved at ``prices``.
+
+    A hit costs one lookup. Concurrent misses for the same ``key`` share one
+    solve.
+    """
+    response = results.get(key)
+    if response is not None:
+        record_lookups("rebalance_result", results, hits=1, misses=0)
+        return response
+    record_lookups("rebalance_result", results, hits=0, misses=1)
+
+    async def solve_once() -> RebalanceResponse:
+        # The solve outlives any one caller; SingleFlight cancels this task
+        # once every caller has left, and the token stops the DP.
+        cancel = CancelToken(timeout)
+        try:
+            response = await _run(tracing.bind(solve, payload, prices, False, cancel))
+        finally:
+            cancel.cancel()
+        results.set(key, response)
+        return response
+
+    return await _inflight.run(key, solve_once)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an If-None-Match header (RFC 9110)."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+async def _run_conditional(
+    payload: RebalanceRequest,
+    provider: AbstractMarketDataProvider,
+    results: LocalCache[RebalanceResponse] | None,
+    cancel: CancelToken,
+    timeout: float | None,
+    if_none_match: str | None,
+    response: Response,
+) -> RebalanceResponse | Response:
+    """Resolve prices, then answer 304 if the client holds the response for them.
+
+    The ETag is the :func:`result_key` of the request, prices and solver
+    version: it changes exactly when the response can, and every worker of
+    a release computes the same one.
+    """
     loop = asyncio.get_running_loop()
+    prices = await loop.run_in_executor(None, tracing.bind(resolve_prices, payload, provider))
+    key = result_key(payload, prices)
+    etag = f'"{key}"'
+    # no-cache: clients may keep the response but must revalidate it.
+    response.headers.update({"ETag": etag, "Cache-Control": "no-cache"})
+    if _etag_matches(if_none_match, etag):
+        # Returned as is, so carry over the headers set by dependencies too.
+        return Response(status_code=304, headers=dict(response.headers))
+    if results is None:
+        return await _run(tracing.bind(solve, payload, prices, False, cancel))
+    return await _run_cached(payload, prices, key, results, timeout)
+
+
+@router.post(
+    "/rebalance",
+    response_model=RebalanceResponse,
+    response_model_exclude_none=True,
+    dependencies=[Depends(rate_limit("rebalance"))],
+)
+async def rebalance(
+    request: Request,
+    response: Response,
+    payload: RebalanceRequest,
+    provider: AbstractMarketDataProvider = Depends(get_market_provider),
+    admission: AdmissionController | None = Depends(get_admission_controller),
+    results: LocalCache[RebalanceResponse] | None = Depends(get_result_cache),
+    profile: bool = Query(False, description="Profile the request (requires X-Admin-Token)."),
+    diagnostics: bool = Query(False, description="Report how the solver ran."),
+    x_admin_token: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+) -> RebalanceResponse | Response:
+    if profile:
+        check_admin_token(x_admin_token)
+    s = get_settings()
+    # The executor thread cannot be interrupted; the solver polls this token
+    # and gives up once the client is gone or the timeout has passed.
+    cancel = CancelToken(s.request_timeout_seconds)
+
+    async def work() -> RebalanceResponse | Response:
+        # Admission is decided before prices are fetched (cold tickers count
+        # towards the cost) and the slot is held through the fetch and solve.
+        async with _admitted(admission, payload, provider):
+            if profile:
+                return await _run(tracing.bind(
+                    profile_rebalance, payload, provider,
+                    Path(s.profile_dir) if s.profile_dir else None, diagnostics, cancel,
+                ))
+            if diagnostics:
+                # Diagnostics describe a solver run: never cached, no ETag.
+                return await _run(tracing.bind(
+                    run_rebalance, payload, provider, diagnostics, cancel,
+                ))
+            return await _run_conditional(
+                payload, provider, results, cancel, s.request_timeout_seconds,
+                if_none_match, response,
+            )
+
     try:
-        return await loop.run_in_executor(None, run_rebalance, payload, provider)
-    except MarketDataError:
+        # collect() opens a trace for the cache counters when Server-Timing is off.
+        with tracing.handler(), (tracing.collect() if diagnostics else nullcontext()):
+            return await cancel_on_disconnect(
+                request, asyncio.wait_for(work(), s.request_timeout_seconds),
+            )
+    except (TimeoutError, SolverCancelled):
+        logger.warning("Rebalance of %d assets exceeded %s s", len(payload.assets),
+                       s.request_timeout_seconds)
+        raise HTTPException(status_code=504, detail="Rebalance timed out.")
+    except (MarketDataError, ClientDisconnected, Overloaded):
         raise
     except Exception:
         logger.exception("Unexpected error in /rebalance")
         raise
+    finally:
+        cancel.cancel()
+
+
+async def _live_prices(
+    payload: RebalanceRequest, provider: AbstractMarketDataProvider,
+) -> list[float]:
+    """Prices of ``payload`` for a live check.
+
+    Read from the price cache when it holds them all, so checks cost no
+    upstream call; otherwise fetched once for every socket asking for the
+    same tickers at the same time.
+    """
+    tickers = [a.ticker for a in payload.assets]
+    peek = getattr(provider, "peek", None)
+    if peek is not None:
+        cached = await peek(tickers)
+        if all(t in cached for t in tickers):
+            return validate_prices(tickers, cached)
+    loop = asyncio.get_running_loop()
+    return await _refreshes.run(
+        tuple(tickers), lambda: loop.run_in_executor(None, resolve_prices, payload, provider),
+    )
+
+
+async def _push_if_changed(
+    websocket: WebSocket,
+    payload: RebalanceRequest,
+    provider: AbstractMarketDataProvider,
+    admission: AdmissionController | None,
+    results: LocalCache[RebalanceResponse] | None,
+    last_key: str | None,
+    timeout: float | None,
+) -> str | None:
+    """Send the response to ``payload`` unless its prices give ``last_key`` again.
+
+    Returns the key of the last response sent. Failures that may pass
+    (prices, overload, timeout) are sent as ``{"detail": ...}`` and retried
+    at the next check.
+    """
+    cancel = CancelToken(timeout)
+
+    async def work() -> tuple[str, RebalanceResponse | None]:
+        # As for POST: admitted before the fetch, the slot held until solved.
+        async with _admitted(admission, payload, provider):
+            prices = await _live_prices(payload, provider)
+            key = result_key(payload, prices)
+            if key == last_key:
+                return key, None
+            if results is None:
+                return key, await _run(tracing.bind(solve, payload, prices, False, cancel))
+            return key, await _run_cached(payload, prices, key, results, timeout)
+
+    try:
+        key, response = await asyncio.wait_for(work(), timeout)
+    except MarketDataError as exc:
+        await websocket.send_json({"detail": str(exc)})
+        return last_key
+    except (TimeoutError, SolverCancelled):
+        await websocket.send_json({"detail": "Rebalance timed out."})
+        return last_key
+    except Overloaded as exc:
+        await websocket.send_json({"detail": exc.detail})
+        return last_key
+    finally:
+        cancel.cancel()
+    if response is None:
+        return last_key
+    await websocket.send_json(response.model_dump(mode="json", exclude_none=True))
+    _LIVE_PUSHES.inc()
+    return key
+
+
+@router.websocket("/rebalance/live")
+async def rebalance_live(
+    websocket: WebSocket,
+    provider: AbstractMarketDataProvider = Depends(get_market_provider),
+    admission: AdmissionController | None = Depends(get_admission_controller),
+    results: LocalCache[RebalanceResponse] | None = Depends(get_result_cache),
+    updates: PriceUpdates = Depends(get_price_updates),
+) -> None:
+    """Push a RebalanceResponse each time the portfolio's prices change.
+
+    The client sends a RebalanceRequest as JSON, and may send another at any
+    time to replace it; each one is taken from the client's ``rebalance``
+    rate limit. The portfolio is checked again whenever this process writes
+    the price of one of its tickers to the price cache, and at least every
+    LIVE_POLL_SECONDS (for writes by other workers and expired prices). A
+    check reads the price cache; only when the prices differ from those of
+    the last push is it solved again, through the result cache so that
+    sockets watching the same portfolio share the solve.
+
+    A message that is not JSON or not a valid portfolio is answered with its
+    errors and the socket closed with 1007; one over the rate limit closes
+    it with 1008.
+    """
+    s = get_settings()
+    await websocket.accept()
+    _LIVE_SESSIONS.inc()
+    payload: RebalanceRequest | None = None
+    last_key: str | None = None
+    watching = ExitStack()
+    updated = asyncio.Event()  # never set until a portfolio is watched
+    receiving = asyncio.ensure_future(websocket.receive_json())
+    try:
+        while True:
+            woken = asyncio.ensure_future(updated.wait())
+            try:
+                await asyncio.wait(
+                    {receiving, woken},
+                    timeout=s.live_poll_seconds if payload else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                woken.cancel()
+            if receiving.done():
+                try:
+                    message = receiving.result()
+                except json.JSONDecodeError as exc:
+                    # Same body as the 422 of POST /v1/rebalance for a malformed body.
+                    await websocket.send_json({"detail": [
+                        {"type": "json_invalid", "loc": [exc.pos], "msg": "JSON decode error"},
+                    ]})
+                    await websocket.close(code=status.WS_1007_INVALID_FRAME_PAYLOAD_DATA)
+                    return
+                receiving = asyncio.ensure_future(websocket.receive_json())
+                decision = await acquire_rate_limit("rebalance", websocket)
+                if decision is not None and not decision.allowed:
+                    await websocket.send_json({
+                        "detail": "Rate limit exceeded.", "retry_after": decision.retry_after,
+                    })
+                    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                    return
+                try:
+                    payload = RebalanceRequest.model_validate(message)
+                except ValidationError as exc:
+                    # Same body as the 422 of POST /v1/rebalance.
+                    await websocket.send_json({"detail": exc.errors(
+                        include_url=False, include_context=False, include_input=False,
+                    )})
+                    await websocket.close(code=status.WS_1007_INVALID_FRAME_PAYLOAD_DATA)
+                    return
+                watching.close()
+                updated = watching.enter_context(updates.watch(a.ticker for a in payload.assets))
+                last_key = None
+            # Cleared before the check: a write during it wakes the next one.
+            updated.clear()
+            last_key = await _push_if_changed(
+                websocket, payload, provider, admission, results, last_key,
+                s.request_timeout_seconds,
+            )
+    except WebSocketDisconnect:
+        logger.debug("Live rebalance closed by client")
+    except Exception:
+        logger.exception("Unexpected error in /rebalance/live")
+        raise
+    finally:
+        receiving.cancel()
+        watching.close()
+        _LIVE_SESSIONS.dec()
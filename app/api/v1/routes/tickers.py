@@ -1,29 +1,43 @@
 # app/api/v1/routes/tickers.py
 """GET /v1/tickers/search endpoint."""
 
-import asyncio
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from app.api.deps import get_ticker_search_provider
-from app.market_data.base import AbstractTickerSearchProvider
+from app.api.deps import get_ticker_search_provider, rate_limit
+from app.core import tracing
+from app.core.concurrency import SingleFlight, cancel_on_disconnect
+from app.core.exceptions import ClientDisconnected
+from app.market_data.base import ALLOWED_QUOTE_TYPES, AbstractTickerSearchProvider
 from app.schemas.ticker import TickerResult, TickerSearchResponse
 
 router = APIRouter(tags=["tickers"])
 logger = logging.getLogger(__name__)
 
-_ALLOWED_TYPES = {"EQUITY", "ETF", "MUTUALFUND", "CRYPTOCURRENCY", "CURRENCY"}
+# Identical queries in flight at the same time share one upstream call.
+_inflight: SingleFlight[list[dict]] = SingleFlight()
 
 
-@router.get("/tickers/search", response_model=TickerSearchResponse)
+@router.get(
+    "/tickers/search",
+    response_model=TickerSearchResponse,
+    dependencies=[Depends(rate_limit("search"))],
+)
 async def search_tickers(
+    request: Request,
     q: str = Query(..., min_length=2),
     search_provider: AbstractTickerSearchProvider = Depends(get_ticker_search_provider),
 ) -> TickerSearchResponse:
-    loop = asyncio.get_running_loop()
+    key = (id(search_provider), " ".join(q.casefold().split()))
     try:
-        quotes = await loop.run_in_executor(None, search_provider.search, q)
+        with tracing.stage("search"):
+            quotes = await cancel_on_disconnect(
+                request, _inflight.run(key, lambda: search_provider.asearch(q)),
+            )
+    except ClientDisconnected:
+        logger.debug("ticker search for %r abandoned by client", q)
+        raise
     except Exception:
         logger.exception("ticker search failed for query %r", q)
         raise HTTPException(status_code=503, detail="Market data unavailable")
@@ -36,6 +50,6 @@ async def search_tickers(
             type=quote.get("quoteType", ""),
         )
         for quote in quotes
-        if quote.get("quoteType") in _ALLOWED_TYPES
+        if quote.get("quoteType") in ALLOWED_QUOTE_TYPES
     ]
     return TickerSearchResponse(results=results)
@@ -0,0 +1,108 @@
+"""Cost-aware admission control for expensive requests.
+
+Cheap requests are always admitted. Expensive ones (see
+:meth:`AdmissionController.is_expensive`) share ``max_concurrent`` slots;
+when every slot is busy a request waits in a bounded queue for at most
+``queue_timeout`` seconds. A request that finds the queue full is rejected
+at once, and one that times out in the queue is rejected after waiting, so
+a spike sheds some expensive requests instead of slowing down all of them.
+"""
+
+import asyncio
+import math
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from app.core import metrics
+from app.core.exceptions import Overloaded
+
+_ADMISSIONS = metrics.counter(
+    "admission_requests_total", "Admission decisions by outcome.", ["outcome"],
+)
+_IN_FLIGHT = metrics.gauge("admission_in_flight", "Expensive requests being served.")
+_QUEUED = metrics.gauge("admission_queued", "Expensive requests waiting for a slot.")
+
+
+class AdmissionController:
+    """Cap concurrent expensive requests, with a short bounded queue.
+
+    Args:
+        max_concurrent: Expensive requests served at the same time.
+        max_queue: Expensive requests allowed to wait for a slot.
+        queue_timeout: Longest wait for a slot, in seconds.
+        expensive_cells: Estimated knapsack DP cells from which a request
+            is expensive.
+        expensive_cold_tickers: Uncached tickers from which a request is
+            expensive (each one is an upstream fetch).
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        expensive_cells: int,
+        expensive_cold_tickers: int,
+    ) -> None:
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._expensive_cells = expensive_cells
+        self._expensive_cold = expensive_cold_tickers
+        self._queued = 0
+        self._in_flight = 0
+
+    def may_be_expensive(self, assets: int, knapsack: bool) -> bool:
+        """False when no cache state can make the request expensive (skip the estimate)."""
+        return knapsack or assets >= self._expensive_cold
+
+    def is_expensive(self, cells: int, cold_tickers: int) -> bool:
+        return cells >= self._expensive_cells or cold_tickers >= self._expensive_cold
+
+    @property
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._queue_timeout))
+
+    async def _wait_for_slot(self) -> None:
+        _ADMISSIONS.inc(outcome="queued")
+        self._queued += 1
+        _QUEUED.set(self._queued)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self._queue_timeout)
+        except TimeoutError:
+            _ADMISSIONS.inc(outcome="rejected_timeout")
+            raise Overloaded(503, "Server busy with expensive requests.", self._retry_after)
+        finally:
+            self._queued -= 1
+            _QUEUED.set(self._queued)
+
+    @asynccontextmanager
+    async def admit(self, expensive: bool) -> AsyncIterator[None]:
+        """Hold a slot for the block if ``expensive``.
+
+        Raises:
+            Overloaded: 429 when the queue is full, 503 when no slot freed
+                up within ``queue_timeout``.
+        """
+        if not expensive:
+            _ADMISSIONS.inc(outcome="cheap")
+            yield
+            return
+
+        if not self._slots.locked():
+            await self._slots.acquire()
+        elif self._queued >= self._max_queue:
+            _ADMISSIONS.inc(outcome="rejected_queue_full")
+            raise Overloaded(429, "Too many expensive requests queued.", self._retry_after)
+        else:
+            await self._wait_for_slot()
+
+        _ADMISSIONS.inc(outcome="admitted")
+        self._in_flight += 1
+        _IN_FLIGHT.set(self._in_flight)
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            _IN_FLIGHT.set(self._in_flight)
+            self._slots.release()
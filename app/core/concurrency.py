@@ -0,0 +1,115 @@
+"""Asyncio helpers for coalescing and cancelling request-scoped work."""
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+from starlette.requests import Request
+
+from app.core.exceptions import ClientDisconnected
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[T]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls that share a key into a single task.
+
+    The first caller for a key starts ``factory()`` as a task; callers that
+    arrive while it is running await the same task. Each caller awaits
+    through :func:`asyncio.shield`, so cancelling one caller does not cancel
+    the others. When the last caller leaves before the task finishes, the
+    task itself is cancelled: nobody is left to use its result.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, _Call[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, c=call: self._forget(key, c))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call[T]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+class CancelToken:
+    """Cancellation flag for work running outside the event loop.
+
+    Executor code polls :meth:`is_cancelled`; it turns True once
+    :meth:`cancel` is called or ``timeout`` seconds have passed. Pickling a
+    token (e.g. to send it to a solver process) keeps only the deadline:
+    the other process cannot observe a later :meth:`cancel`.
+    """
+
+    def __init__(self, timeout: float | None = None) -> None:
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set() or (
+            self.deadline is not None and time.monotonic() >= self.deadline
+        )
+
+    def __reduce__(self):
+        # CLOCK_MONOTONIC is system-wide, so the deadline holds in another process.
+        return CancelToken, (), {"deadline": self.deadline}
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    # Once the body has been consumed, the server's receive() blocks until
+    # the client goes away (or the response has been sent).
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable``, cancelling it if the client disconnects first.
+
+    Raises:
+        ClientDisconnected: If the client went away before the result was ready.
+    """
+    task = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    if not task.done():
+        task.cancel()
+        raise ClientDisconnected()
+    return task.result()
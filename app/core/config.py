@@ -11,10 +11,52 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
-    cache_backend: Literal["local", "redis"] = "local"
+    cache_backend: Literal["local", "redis", "shm"] = "local"
     cache_ttl_seconds: int = 300
+    market_hours_ttl: bool = True
+    cache_max_ttl_seconds: int = 4 * 24 * 3600
+    price_snapshot_path: str | None = None
+    price_snapshot_interval_seconds: int = 60
+    price_stream_url: str | None = None
+    price_stream_top_n: int = 50
+    price_stream_refresh_seconds: float = 30.0
+    search_cache_ttl_seconds: int = 3600
+    search_cache_max_entries: int = 2048
+    result_cache_max_entries: int = 1024
+    symbol_index_path: str | None = None
+    symbol_index_min_hits: int = 5
+    price_providers: str = "yahoo"
+    price_file_path: str | None = None
+    provider_failure_threshold: int = 3
+    provider_cooldown_seconds: float = 30.0
+    yahoo_hosts: str = "https://query2.finance.yahoo.com,https://query1.finance.yahoo.com"
+    yahoo_hedge_percentile: float = 0.95
+    yahoo_hedge_min_delay_seconds: float = 0.05
+    shm_cache_name: str = "pestoengine-prices"
+    shm_cache_slots: int = 4096
     redis_url: str | None = None
+    redis_max_connections: int = 50
+    redis_pool_timeout_seconds: float = 2.0
+    redis_socket_timeout_seconds: float = 2.0
     cors_origins: str | None = None
+    server_timing_enabled: bool = False
+    request_timeout_seconds: float | None = 30.0
+    live_poll_seconds: float = 5.0
+    admission_max_concurrent: int = 4
+    admission_max_queue: int = 16
+    admission_queue_timeout_seconds: float = 2.0
+    admission_expensive_cells: int = 200_000
+    admission_expensive_cold_tickers: int = 5
+    rate_limit_rebalance_per_minute: float = 0
+    rate_limit_rebalance_burst: int = 10
+    rate_limit_search_per_minute: float = 0
+    rate_limit_search_burst: int = 30
+    rate_limit_api_keys: str = ""
+    io_workers: int = 32
+    solver_processes: int = 0
+    solver_process_min_cells: int = 20_000
+    admin_token: str | None = None
+    profile_dir: str | None = None
 
     @model_validator(mode="after")
     def _check_redis_url(self) -> "Settings":
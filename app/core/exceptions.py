@@ -3,7 +3,7 @@
 import logging
 
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +12,44 @@ class MarketDataError(RuntimeError):
     """Raised when market prices cannot be retrieved."""
 
 
+class SymbolNotFound(MarketDataError):
+    """Raised when a provider answered but has no price for a ticker.
+
+    Unlike other market data errors it says nothing about the provider's
+    health: the ticker is unknown, delisted or invalid.
+    """
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client went away before its response was ready."""
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed to protect the server; sent with Retry-After."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
 async def market_data_error_handler(request: Request, exc: MarketDataError) -> JSONResponse:
     logger.warning("MarketDataError on %s: %s", request.url, exc)
     return JSONResponse(status_code=502, content={"detail": str(exc)})
+
+
+async def client_disconnected_handler(request: Request, exc: ClientDisconnected) -> Response:
+    # Nobody is listening; 499 (nginx's "client closed request") keeps access
+    # logs distinguishable from real errors.
+    logger.debug("Client disconnected on %s", request.url)
+    return Response(status_code=499)
+
+
+async def overloaded_handler(request: Request, exc: Overloaded) -> JSONResponse:
+    logger.info("Shed %s with %d: %s", request.url.path, exc.status_code, exc.detail)
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
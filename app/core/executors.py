@@ -0,0 +1,136 @@
+"""Executors shared by the app, with their queue depth exported as a metric.
+
+Two kinds of work are kept apart:
+
+* I/O-bound work (price fetches, cache I/O) runs on the event loop's
+  default executor, a bounded thread pool installed at startup.
+* CPU-bound work (large knapsack solves) goes through :func:`run_cpu`. With
+  a process pool started by :func:`start_cpu_pool` it runs there, outside
+  the worker's GIL; without one, or for work too small to be worth the
+  inter-process round trip, it runs inline in the calling thread. If a
+  solver process dies (e.g. killed for memory) the pool is replaced and
+  the task that hit it runs inline.
+
+Register a pool with :func:`track` and ``executor_queue_depth{executor}``
+reports, at scrape time, how many submitted tasks are waiting for a free
+worker.
+"""
+
+import logging
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_QUEUE_DEPTH = metrics.gauge(
+    "executor_queue_depth", "Tasks waiting for a free worker.", ["executor"],
+)
+_CPU_TASKS = metrics.counter(
+    "cpu_tasks_total", "CPU-bound tasks by where they ran.", ["where"],
+)
+
+_tracked: dict[str, Executor] = {}
+_lock = threading.Lock()
+
+_cpu_pool: ProcessPoolExecutor | None = None
+_cpu_min_cost = 0
+
+
+def track(name: str, executor: Executor) -> Executor:
+    """Export the queue depth of ``executor`` as ``name``; replaces a previous one."""
+    with _lock:
+        _tracked[name] = executor
+    return executor
+
+
+def queue_depth(executor: Executor) -> int:
+    # Neither executor has a public accessor for its pending work.
+    if isinstance(executor, ThreadPoolExecutor):
+        return executor._work_queue.qsize()
+    if isinstance(executor, ProcessPoolExecutor):
+        # Running and queued items are kept together.
+        return max(0, len(executor._pending_work_items) - executor._max_workers)
+    return 0
+
+
+def _depths() -> dict[tuple[str, ...], float]:
+    with _lock:
+        items = list(_tracked.items())
+    return {(name,): queue_depth(executor) for name, executor in items}
+
+
+_QUEUE_DEPTH.set_function(_depths)
+
+
+def start_cpu_pool(processes: int, min_cost: int = 0) -> None:
+    """Start ``processes`` solver processes; tasks cheaper than ``min_cost`` stay inline.
+
+    Blocks until every worker is up.
+
+    Workers are spawned rather than forked: the parent runs threads (executor
+    pools, the Redis client) whose locks a fork could copy mid-acquire.
+    """
+    global _cpu_pool, _cpu_min_cost
+    stop_cpu_pool()
+    _cpu_pool = _new_pool(processes)
+    _cpu_min_cost = min_cost
+    track("cpu", _cpu_pool)
+    # Spawn the workers (and let them import) now, not on the first large solve.
+    wait([_cpu_pool.submit(int) for _ in range(processes)])
+
+
+def _new_pool(processes: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def _replace_broken_pool(broken: ProcessPoolExecutor) -> None:
+    """Swap ``broken`` for a fresh pool of the same size, once per breakage."""
+    global _cpu_pool
+    with _lock:
+        if _cpu_pool is not broken:
+            return  # already replaced by another caller, or stopped
+        _cpu_pool = _new_pool(broken._max_workers)
+        _tracked["cpu"] = _cpu_pool
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def stop_cpu_pool() -> None:
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=False, cancel_futures=True)
+        with _lock:
+            _tracked.pop("cpu", None)
+        _cpu_pool = None
+
+
+def run_cpu(fn: Callable[..., T], *args: Any, cost: int = 0) -> T:
+    """Run ``fn(*args)`` in the process pool and wait for the result.
+
+    Runs inline when no pool is started or ``cost`` (an estimate in the
+    caller's unit, e.g. DP cells) is below the pool's threshold. ``fn`` and
+    ``args`` must be picklable. When a solver process has died the pool is
+    replaced (workers spawn on its next task) and this call runs inline.
+    """
+    pool = _cpu_pool
+    if pool is None or cost < _cpu_min_cost:
+        _CPU_TASKS.inc(where="inline")
+        return fn(*args)
+    try:
+        result = pool.submit(fn, *args).result()
+    except BrokenProcessPool:
+        _CPU_TASKS.inc(where="broken_pool")
+        logger.error("A solver process died; restarting the pool and solving inline")
+        _replace_broken_pool(pool)
+        return fn(*args)
+    _CPU_TASKS.inc(where="process")
+    return result
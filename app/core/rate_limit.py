@@ -0,0 +1,142 @@
+"""Per-client token-bucket rate limiting.
+
+Each client (API key, else IP address) has one bucket per budget, e.g.
+``search`` and ``rebalance``. A bucket holds up to ``burst`` tokens and
+refills at ``rate`` tokens per second; a request takes one token or is
+rejected. :class:`MemoryRateLimiter` keeps buckets in the process (one
+uvicorn worker); :class:`RedisRateLimiter` keeps them in Redis so every
+worker and host shares them.
+"""
+
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from app.core import metrics
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+_DECISIONS = metrics.counter(
+    "rate_limit_requests_total", "Rate-limited requests by budget and outcome.",
+    ["budget", "outcome"],
+)
+
+
+@dataclass(frozen=True)
+class Budget:
+    """``burst`` requests at once, refilled at ``per_minute`` requests a minute."""
+
+    name: str
+    per_minute: float
+    burst: int
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60.0
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until the bucket is full again, and until a rejected request can retry.
+    reset_seconds: int
+    retry_after: int
+
+
+def _decide(tokens: float, budget: Budget, allowed: bool) -> Decision:
+    missing = budget.burst - tokens
+    return Decision(
+        allowed=allowed,
+        limit=budget.burst,
+        remaining=int(tokens),
+        reset_seconds=math.ceil(missing / budget.rate),
+        retry_after=0 if allowed else max(1, math.ceil((1 - tokens) / budget.rate)),
+    )
+
+
+class AbstractRateLimiter(ABC):
+    async def acquire(self, client: str, budget: Budget) -> Decision:
+        """Take one token from ``client``'s bucket for ``budget``."""
+        decision = await self._take(f"{budget.name}:{client}", budget)
+        _DECISIONS.inc(budget=budget.name, outcome="allowed" if decision.allowed else "limited")
+        return decision
+
+    @abstractmethod
+    async def _take(self, key: str, budget: Budget) -> Decision: ...
+
+
+class MemoryRateLimiter(AbstractRateLimiter):
+    """Buckets in a bounded LRU dict; the least recently seen clients are dropped."""
+
+    def __init__(self, max_clients: int = 100_000, clock=time.monotonic) -> None:
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._max_clients = max_clients
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    async def _take(self, key: str, budget: Budget) -> Decision:
+        now = self._clock()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (float(budget.burst), now))
+            tokens = min(budget.burst, tokens + (now - last) * budget.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self._max_clients:
+                self._buckets.popitem(last=False)
+        return _decide(tokens, budget, allowed)
+
+
+# KEYS[1] bucket hash; ARGV: rate (tokens/s), burst. Uses the server clock,
+# so workers with skewed clocks agree. Returns {allowed, tokens * 1000}.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return {allowed, math.floor(tokens * 1000)}
+"""
+
+
+class RedisRateLimiter(AbstractRateLimiter):
+    """Buckets in Redis, updated atomically by a Lua script.
+
+    When Redis fails the request is allowed (fail open): rate limiting
+    protects the upstream quota, it must not take the API down with Redis.
+    """
+
+    def __init__(self, client: "Redis", prefix: str = "ratelimit:") -> None:
+        self._script = client.register_script(_TOKEN_BUCKET_LUA)
+        self._prefix = prefix
+
+    async def _take(self, key: str, budget: Budget) -> Decision:
+        try:
+            allowed, millitokens = await self._script(
+                keys=[self._prefix + key], args=[budget.rate, budget.burst],
+            )
+        except Exception as exc:
+            logger.warning("Rate limiter unavailable, allowing request: %s", exc)
+            return _decide(float(budget.burst), budget, True)
+        return _decide(int(millitokens) / 1000, budget, bool(allowed))
@@ -0,0 +1,58 @@
+"""Per-route HTTP request latency, exported as a Prometheus histogram."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+
+_DURATION = metrics.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response starts, by route template.",
+    ["method", "route", "status"],
+)
+
+
+class RequestMetricsMiddleware:
+    """Observe every HTTP request in ``http_request_duration_seconds``.
+
+    Routes are labelled by their template (``/v1/rebalance``) rather than
+    the raw path, so the label set stays bounded; requests that match no
+    route (404s, static files) are labelled ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        started = False
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                _observe(scope, message["status"], time.perf_counter() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if not started:  # failed before a response was started
+                _observe(scope, 500, time.perf_counter() - start)
+
+
+def _route(scope: Scope) -> str:
+    # scope["route"] of a route from an included router lacks the router's
+    # prefix; FastAPI keeps the full template in its effective route context.
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _observe(scope: Scope, status: int, seconds: float) -> None:
+    route = _route(scope)
+    _DURATION.observe(seconds, method=scope["method"], route=route, status=str(status))
@@ -0,0 +1,166 @@
+"""Per-request stage timings, reported in the ``Server-Timing`` header.
+
+:class:`ServerTimingMiddleware` opens a :class:`RequestTrace` for every
+HTTP request and stores it in a context variable. Code on the request path
+times its stages with :func:`stage`::
+
+    with tracing.stage("solve"):
+        ...
+
+and the middleware adds the totals to the response, e.g.
+``Server-Timing: parse;dur=0.41, cache;dur=0.05, solve;dur=2.10, total;dur=3.02``.
+
+Without the middleware no trace exists and :func:`stage` and :func:`count`
+only read a context variable. Executor threads do not inherit context
+variables; run work through :func:`bind` to keep the trace.
+"""
+
+import contextvars
+import logging
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RequestTrace:
+    """Stage durations (seconds) and event counters of one request."""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self._handler_end: float | None = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items())
+
+
+_current: contextvars.ContextVar[RequestTrace | None] = contextvars.ContextVar(
+    "request_trace", default=None,
+)
+
+
+def current() -> RequestTrace | None:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Add the duration of the block to stage ``name`` of the current trace."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start)
+
+
+def count(name: str, amount: int = 1) -> None:
+    trace = _current.get()
+    if trace is not None:
+        trace.count(name, amount)
+
+
+@contextmanager
+def handler() -> Iterator[None]:
+    """Mark the route handler's body.
+
+    Time from the start of the request to entering the block (reading the
+    body, validation, dependencies) is recorded as ``parse``; time from
+    leaving it to the response start (serialisation) as ``serialize``.
+    """
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    trace.add("parse", time.perf_counter() - trace.start)
+    try:
+        yield
+    finally:
+        trace._handler_end = time.perf_counter()
+
+
+@contextmanager
+def collect() -> Iterator[RequestTrace]:
+    """Yield the current trace, opening one for the block if there is none.
+
+    Lets a request read its counters (e.g. cache hits) when the
+    Server-Timing middleware is disabled.
+    """
+    trace = _current.get()
+    if trace is not None:
+        yield trace
+        return
+    trace = RequestTrace()
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def bind(fn: Callable[..., T], *args: Any) -> Callable[[], T]:
+    """Return ``fn(*args)`` as a callable for an executor, keeping the trace.
+
+    The call runs in a copy of the current context, and the wait between
+    binding and the call starting is recorded as stage ``queue``.
+    """
+    ctx = contextvars.copy_context()
+    submitted = time.perf_counter()
+
+    def run() -> T:
+        trace = ctx.get(_current)
+        if trace is not None:
+            trace.add("queue", time.perf_counter() - submitted)
+        return fn(*args)
+
+    return lambda: ctx.run(run)
+
+
+class ServerTimingMiddleware:
+    """Trace every HTTP request and return its stages in ``Server-Timing``."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _current.set(trace)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if trace._handler_end is not None:
+                    trace.add("serialize", now - trace._handler_end)
+                trace.add("total", now - trace.start)
+                value = trace.server_timing()
+                MutableHeaders(scope=message).append("Server-Timing", value)
+                logger.debug("%s %s timing: %s %s", scope["method"], scope["path"],
+                             value, trace.counters or "")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
@@ -9,17 +9,29 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from app.api.v1.routes import health, rebalance, tickers
+from app.api.deps import close_resources, open_resources
+from app.api.v1.routes import health, metrics, rebalance, tickers
 from app.core.config import get_settings
-from app.core.exceptions import MarketDataError, market_data_error_handler
+from app.core.exceptions import (
+    ClientDisconnected,
+    MarketDataError,
+    Overloaded,
+    client_disconnected_handler,
+    market_data_error_handler,
+    overloaded_handler,
+)
 from app.core.log_config import setup_logging
+from app.core.request_metrics import RequestMetricsMiddleware
+from app.core.tracing import ServerTimingMiddleware
 
 setup_logging()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await open_resources()
     yield
+    await close_resources()
 
 
 app = FastAPI(title="PestoENGINE API", version="2.0.0", lifespan=lifespan)
@@ -34,7 +46,14 @@ if _origins:
         allow_headers=["*"],
     )
 
+if get_settings().server_timing_enabled:
+    app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
+
 app.add_exception_handler(MarketDataError, market_data_error_handler)
+app.add_exception_handler(ClientDisconnected, client_disconnected_handler)
+app.add_exception_handler(Overloaded, overloaded_handler)
+app.include_router(metrics.router)
 app.include_router(health.router, prefix="/v1")
 app.include_router(rebalance.router, prefix="/v1")
 app.include_router(tickers.router, prefix="/v1")
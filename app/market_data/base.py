@@ -1,6 +1,20 @@
 """Abstract interfaces for market data providers."""
 
+import asyncio
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from app.market_data.market_hours import TradingSession
+
+# Instrument types exposed by ticker search. Indices, futures and options
+# cannot be bought as shares and are filtered out.
+ALLOWED_QUOTE_TYPES = frozenset({"EQUITY", "ETF", "MUTUALFUND", "CRYPTOCURRENCY", "CURRENCY"})
+
+
+@dataclass(frozen=True)
+class Quote:
+    price: float
+    session: TradingSession | None = None
 
 
 class AbstractMarketDataProvider(ABC):
@@ -8,6 +22,34 @@ class AbstractMarketDataProvider(ABC):
     def get_prices(self, tickers: list[str]) -> dict[str, float]: ...
 
 
+class AbstractQuoteProvider(AbstractMarketDataProvider):
+    """Provider that can also report the trading session behind each price.
+
+    Callers that need session metadata (e.g. the cache, to hold prices while
+    the market is closed) check for this interface and call ``get_quotes``;
+    everything else keeps using ``get_prices``.
+    """
+
+    @abstractmethod
+    def get_quotes(self, tickers: list[str]) -> dict[str, Quote]: ...
+
+    def get_prices(self, tickers: list[str]) -> dict[str, float]:
+        return {ticker: quote.price for ticker, quote in self.get_quotes(tickers).items()}
+
+
 class AbstractTickerSearchProvider(ABC):
+    # Maximum number of quotes a single ``search`` call can return, or ``None``
+    # when unbounded/unknown. A result shorter than this limit is complete.
+    result_limit: int | None = None
+
     @abstractmethod
     def search(self, q: str) -> list[dict]: ...
+
+    async def asearch(self, q: str) -> list[dict]:
+        """Async variant of :meth:`search`.
+
+        The default runs ``search`` on the default executor, where it cannot
+        be interrupted once started. Providers doing network I/O override it
+        with a native coroutine so that cancelling the caller aborts the call.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.search, q)
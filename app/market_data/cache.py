@@ -3,37 +3,75 @@
 import threading
 import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from collections.abc import Callable
+from typing import Generic, TypeVar
 
+from app.core import metrics
+
+V = TypeVar("V")
+
+_LOOKUPS = metrics.counter(
+    "cache_lookups_total", "Cache lookups by cache, backend and result.",
+    ["cache", "backend", "result"],
+)
+_EVICTIONS = metrics.counter(
+    "cache_evictions_total",
+    "Entries a size-bounded local cache dropped to make room.",
+    ["cache"],
+)
+
+
+class AbstractCache(ABC, Generic[V]):
+    # Backend label used in metrics.
+    backend = "custom"
 
-class AbstractCache(ABC):
     @abstractmethod
-    def get(self, key: str) -> float | None: ...
+    def get(self, key: str) -> V | None: ...
 
     @abstractmethod
-    def set(self, key: str, value: float) -> None: ...
+    def set(self, key: str, value: V, ttl_seconds: float | None = None) -> None:
+        """Store ``value``; ``ttl_seconds`` overrides the cache's default TTL."""
+
+    # Coroutine variants for callers on the event loop. In-memory backends
+    # answer inline; network backends override them with non-blocking I/O.
+    async def aget(self, key: str) -> V | None:
+        return self.get(key)
+
+    async def aset(self, key: str, value: V, ttl_seconds: float | None = None) -> None:
+        self.set(key, value, ttl_seconds)
 
 
-class LocalCache(AbstractCache):
-    """Thread-safe in-memory cache with TTL.
+class LocalCache(AbstractCache[V]):
+    """Thread-safe in-memory cache with TTL and an optional size bound.
 
-    Two invariants:
+    Three invariants:
     - ``get`` returns ``None`` for both missing and expired keys; the caller
       cannot distinguish between the two cases.
-    - Expiry is stamped at ``set`` time, not at ``get`` time.
+    - Expiry is stamped at ``set`` time, not at ``get`` time, using the
+      per-call ``ttl_seconds`` when given and the default TTL otherwise.
+    - When ``max_entries`` is set, inserting a new key into a full cache
+      evicts the least recently used entry (counted in
+      ``cache_evictions_total`` under ``name``).
     """
 
+    backend = "local"
+
     def __init__(
         self,
         ttl_seconds: int,
         clock: Callable[[], float] = time.monotonic,
+        max_entries: int | None = None,
+        name: str = "local",
     ) -> None:
-        self._store: dict[str, tuple[float, float]] = {}
+        self._store: OrderedDict[str, tuple[V, float]] = OrderedDict()
         self._lock = threading.Lock()
         self._ttl = ttl_seconds
         self._clock = clock
+        self._max_entries = max_entries
+        self._name = name
 
-    def get(self, key: str) -> float | None:
+    def get(self, key: str) -> V | None:
         with self._lock:
             entry = self._store.get(key)
             if entry is None:
@@ -42,8 +80,34 @@ class LocalCache(AbstractCache):
             if self._clock() > expires_at:
                 del self._store[key]
                 return None
+            self._store.move_to_end(key)
             return value
 
-    def set(self, key: str, value: float) -> None:
+    def set(self, key: str, value: V, ttl_seconds: float | None = None) -> None:
+        ttl = self._ttl if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._store[key] = (value, self._clock() + ttl)
+            self._store.move_to_end(key)
+            if self._max_entries is not None:
+                while len(self._store) > self._max_entries:
+                    self._store.popitem(last=False)
+                    _EVICTIONS.inc(cache=self._name)
+
+    def entries(self) -> list[tuple[str, V, float]]:
+        """Return ``(key, value, seconds_until_expiry)`` for every live entry."""
         with self._lock:
-            self._store[key] = (value, self._clock() + self._ttl)
+            now = self._clock()
+            return [
+                (key, value, expires_at - now)
+                for key, (value, expires_at) in self._store.items()
+                if expires_at >= now
+            ]
+
+
+def record_lookups(cache: str, backend: AbstractCache, hits: int, misses: int) -> None:
+    """Count ``hits`` and ``misses`` of the ``cache`` role (e.g. ``price``)."""
+    label = getattr(type(backend), "backend", "custom")
+    if hits:
+        _LOOKUPS.inc(hits, cache=cache, backend=label, result="hit")
+    if misses:
+        _LOOKUPS.inc(misses, cache=cache, backend=label, result="miss")
@@ -1,15 +1,24 @@
 """Caching decorator for AbstractMarketDataProvider."""
 
+import asyncio
 import logging
+from collections.abc import Callable
 
-from app.market_data.base import AbstractMarketDataProvider
-from app.market_data.cache import AbstractCache
+from app.core import tracing
+from app.market_data.base import AbstractMarketDataProvider, AbstractQuoteProvider, Quote
+from app.market_data.cache import AbstractCache, record_lookups
+from app.market_data.market_hours import TradingSession
 
 logger = logging.getLogger(__name__)
 
 _KEY_PREFIX = "market:price:"
 
 
+def price_key(ticker: str) -> str:
+    """Key of ``ticker``'s price in the price cache, for writers besides the provider."""
+    return _KEY_PREFIX + ticker
+
+
 class CachedMarketDataProvider(AbstractMarketDataProvider):
     """Decorator that adds a cache layer to any AbstractMarketDataProvider.
 
@@ -19,33 +28,73 @@ class CachedMarketDataProvider(AbstractMarketDataProvider):
 
     Stale data is never returned. If resilience is needed in the future, add
     an explicit ``stale_on_error`` flag rather than changing the default.
+
+    When the wrapped provider is an :class:`AbstractQuoteProvider` and a
+    ``ttl_policy`` is given, each price is cached for
+    ``ttl_policy(quote.session)`` seconds (``None`` = the cache default),
+    e.g. :func:`~app.market_data.market_hours.cache_ttl` holds prices of a
+    closed market until it reopens.
+
+    ``on_lookup``, when given, is called with the tickers of every
+    ``get_prices`` call, e.g. :meth:`~app.market_data.streaming.Popularity.record`.
+    ``on_update``, when given, is called with the tickers whose prices were
+    fetched and cached, e.g. :meth:`~app.market_data.price_updates.PriceUpdates.publish`.
     """
 
     def __init__(
         self,
         provider: AbstractMarketDataProvider,
-        cache: AbstractCache,
+        cache: AbstractCache[float],
+        ttl_policy: Callable[[TradingSession | None], float | None] | None = None,
+        on_lookup: Callable[[list[str]], None] | None = None,
+        on_update: Callable[[list[str]], None] | None = None,
     ) -> None:
         self._provider = provider
         self._cache = cache
+        self._ttl_policy = ttl_policy
+        self._on_lookup = on_lookup
+        self._on_update = on_update
+
+    def _fetch(self, tickers: list[str]) -> dict[str, Quote]:
+        if self._ttl_policy is not None and isinstance(self._provider, AbstractQuoteProvider):
+            return self._provider.get_quotes(tickers)
+        return {t: Quote(p) for t, p in self._provider.get_prices(tickers).items()}
+
+    async def peek(self, tickers: list[str]) -> dict[str, float]:
+        """Cached prices of ``tickers``, without fetching or counting lookups."""
+        values = await asyncio.gather(*(self._cache.aget(price_key(t)) for t in tickers))
+        return {t: v for t, v in zip(tickers, values) if v is not None}
 
     def get_prices(self, tickers: list[str]) -> dict[str, float]:
         prices: dict[str, float] = {}
         misses: list[str] = []
+        if self._on_lookup is not None:
+            self._on_lookup(tickers)
 
-        for ticker in tickers:
-            cached = self._cache.get(_KEY_PREFIX + ticker)
-            if cached is not None:
-                logger.debug("Cache HIT for %s", ticker)
-                prices[ticker] = cached
-            else:
-                logger.debug("Cache MISS for %s", ticker)
-                misses.append(ticker)
+        with tracing.stage("cache"):
+            for ticker in tickers:
+                cached = self._cache.get(price_key(ticker))
+                if cached is not None:
+                    logger.debug("Cache HIT for %s", ticker)
+                    prices[ticker] = cached
+                else:
+                    logger.debug("Cache MISS for %s", ticker)
+                    misses.append(ticker)
+        tracing.count("price_cache_hits", len(prices))
+        tracing.count("price_cache_misses", len(misses))
+        record_lookups("price", self._cache, len(prices), len(misses))
 
         if misses:
-            fresh = self._provider.get_prices(misses)
-            for ticker, price in fresh.items():
-                self._cache.set(_KEY_PREFIX + ticker, price)
-                prices[ticker] = price
+            with tracing.stage("upstream"):
+                quotes = self._fetch(misses)
+            with tracing.stage("cache"):
+                for ticker, quote in quotes.items():
+                    ttl = self._ttl_policy(quote.session) if self._ttl_policy else None
+                    if ttl is not None:
+                        logger.debug("Market closed for %s, caching for %.0f s", ticker, ttl)
+                    self._cache.set(price_key(ticker), quote.price, ttl_seconds=ttl)
+                    prices[ticker] = quote.price
+            if self._on_update is not None and quotes:
+                self._on_update(list(quotes))
 
         return prices
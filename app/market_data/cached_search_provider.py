@@ -0,0 +1,118 @@
+"""Caching decorator for AbstractTickerSearchProvider."""
+
+import logging
+
+from app.market_data.base import AbstractTickerSearchProvider
+from app.market_data.cache import AbstractCache, record_lookups
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "market:search:"
+_MIN_PREFIX_LENGTH = 2
+
+
+def _normalise(q: str) -> str:
+    return " ".join(q.casefold().split())
+
+
+def _matches(quote: dict, terms: list[str]) -> bool:
+    haystack = " ".join(
+        str(quote.get(field) or "") for field in ("symbol", "shortname", "longname")
+    ).casefold()
+    return all(term in haystack for term in terms)
+
+
+class CachedTickerSearchProvider(AbstractTickerSearchProvider):
+    """Decorator that adds a result cache with prefix reuse to a search provider.
+
+    Each entry stores the quotes returned for a normalised query together with
+    a ``complete`` flag, set when the upstream returned fewer quotes than its
+    ``result_limit`` (the result set was not truncated).
+
+    Lookup order for a query ``q``:
+      1. Exact hit on ``q``.
+      2. Longest cached *complete* prefix of ``q`` (e.g. ``"vwc"`` for
+         ``"vwce"``): the cached quotes are filtered locally, keeping those
+         whose symbol or name contains every term of ``q``. The filtered
+         result is stored under ``q`` so the next keystroke is an exact hit.
+      3. Upstream call, stored under ``q``.
+
+    Step 2 relies on upstream matching being monotone: extending a query
+    never surfaces a quote the shorter query did not already return. That
+    holds for the substring matching Yahoo applies to symbols and names.
+    Truncated results are never reused for prefixes because a quote ranked
+    below the cut-off could match the longer query.
+    """
+
+    def __init__(
+        self,
+        provider: AbstractTickerSearchProvider,
+        cache: AbstractCache[dict],
+    ) -> None:
+        self._provider = provider
+        self._cache = cache
+        self.result_limit = provider.result_limit
+
+    @staticmethod
+    def _prefixes(key: str) -> list[str]:
+        return [key[:end] for end in range(len(key) - 1, _MIN_PREFIX_LENGTH - 1, -1)]
+
+    @staticmethod
+    def _narrow(key: str, prefix: str, parent: dict) -> list[dict]:
+        logger.debug("Search cache PREFIX HIT for %r via %r", key, prefix)
+        terms = key.split()
+        return [quote for quote in parent["quotes"] if _matches(quote, terms)]
+
+    def _lookup(self, key: str) -> list[dict] | None:
+        cached = self._cache.get(_KEY_PREFIX + key)
+        if cached is not None:
+            logger.debug("Search cache HIT for %r", key)
+            return cached["quotes"]
+
+        for prefix in self._prefixes(key):
+            parent = self._cache.get(_KEY_PREFIX + prefix)
+            if parent is not None and parent["complete"]:
+                quotes = self._narrow(key, prefix, parent)
+                self._cache.set(_KEY_PREFIX + key, {"quotes": quotes, "complete": True})
+                return quotes
+
+        logger.debug("Search cache MISS for %r", key)
+        return None
+
+    async def _alookup(self, key: str) -> list[dict] | None:
+        cached = await self._cache.aget(_KEY_PREFIX + key)
+        if cached is not None:
+            logger.debug("Search cache HIT for %r", key)
+            return cached["quotes"]
+
+        for prefix in self._prefixes(key):
+            parent = await self._cache.aget(_KEY_PREFIX + prefix)
+            if parent is not None and parent["complete"]:
+                quotes = self._narrow(key, prefix, parent)
+                await self._cache.aset(_KEY_PREFIX + key, {"quotes": quotes, "complete": True})
+                return quotes
+
+        logger.debug("Search cache MISS for %r", key)
+        return None
+
+    def _entry(self, quotes: list[dict]) -> dict:
+        complete = self.result_limit is not None and len(quotes) < self.result_limit
+        return {"quotes": quotes, "complete": complete}
+
+    def search(self, q: str) -> list[dict]:
+        key = _normalise(q)
+        quotes = self._lookup(key)
+        record_lookups("search", self._cache, quotes is not None, quotes is None)
+        if quotes is None:
+            quotes = self._provider.search(q)
+            self._cache.set(_KEY_PREFIX + key, self._entry(quotes))
+        return quotes
+
+    async def asearch(self, q: str) -> list[dict]:
+        key = _normalise(q)
+        quotes = await self._alookup(key)
+        record_lookups("search", self._cache, quotes is not None, quotes is None)
+        if quotes is None:
+            quotes = await self._provider.asearch(q)
+            await self._cache.aset(_KEY_PREFIX + key, self._entry(quotes))
+        return quotes
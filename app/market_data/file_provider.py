@@ -0,0 +1,131 @@
+"""Price provider serving a local CSV snapshot file (no network access)."""
+
+import logging
+import mmap
+from pathlib import Path
+
+from app.core.exceptions import MarketDataError, SymbolNotFound
+from app.market_data.base import AbstractMarketDataProvider
+
+logger = logging.getLogger(__name__)
+
+_PRICE_COLUMNS = ("close", "price")
+
+
+class FileMarketDataProvider(AbstractMarketDataProvider):
+    """Serve prices from a CSV file, for load tests and air-gapped runs.
+
+    The file has a header row naming at least a ``symbol`` column and a
+    ``close`` (or ``price``) column, and optionally a ``date`` column in ISO
+    format (``YYYY-MM-DD``)::
+
+        symbol,date,close
+        VWCE.DE,2024-05-30,112.10
+        VWCE.DE,2024-05-31,112.64
+
+    Rows may appear in any order. A symbol's price is its row with the
+    latest date, or its last row when there is no date column; all its rows
+    form the series returned by :meth:`get_history`. Fields are split on
+    commas, so quoted fields are not supported. Blank rows and rows missing
+    a column or a symbol are skipped with a warning.
+
+    The file is memory-mapped and scanned once at construction to build an
+    index of row offsets per symbol; lookups then parse only the rows they
+    need. The file must not be modified while the provider is in use.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._file = open(path, "rb")
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._rows: dict[str, list[int]] = {}
+        self._latest: dict[str, int] = {}
+        self._build_index()
+        logger.info("Loaded %d symbols from price file %s", len(self._rows), path)
+
+    def _build_index(self) -> None:
+        buf = self._buf
+        size = len(buf)
+        end = buf.find(b"\n")
+        if end == -1:
+            end = size
+        header = [c.strip().lower() for c in buf[:end].decode().split(",")]
+        try:
+            self._symbol_col = header.index("symbol")
+            self._price_col = next(header.index(c) for c in _PRICE_COLUMNS if c in header)
+        except (ValueError, StopIteration):
+            raise ValueError(
+                f"{self._path}: header must contain 'symbol' and 'close' (or 'price') columns."
+            ) from None
+        self._date_col = header.index("date") if "date" in header else None
+        columns = max(self._symbol_col, self._price_col, self._date_col or 0) + 1
+
+        latest_date: dict[str, bytes] = {}
+        malformed: list[int] = []
+        line = 1
+        offset = end + 1
+        while offset < size:
+            line += 1
+            end = buf.find(b"\n", offset)
+            if end == -1:
+                end = size
+            row = buf[offset:end].rstrip(b"\r")
+            fields = row.split(b",")
+            symbol = fields[self._symbol_col].strip() if len(fields) >= columns else b""
+            if symbol:
+                symbol = symbol.decode(errors="replace")
+                self._rows.setdefault(symbol, []).append(offset)
+                date = fields[self._date_col].strip() if self._date_col is not None else b""
+                if date >= latest_date.get(symbol, b""):
+                    latest_date[symbol] = date
+                    self._latest[symbol] = offset
+            elif row.strip():
+                malformed.append(line)
+            offset = end + 1
+        if malformed:
+            logger.warning(
+                "%s: skipped %d malformed rows (first at line %d)",
+                self._path, len(malformed), malformed[0],
+            )
+
+    def _fields(self, offset: int) -> list[bytes]:
+        end = self._buf.find(b"\n", offset)
+        return self._buf[offset:end if end != -1 else len(self._buf)].rstrip(b"\r").split(b",")
+
+    def _price(self, ticker: str, fields: list[bytes]) -> float:
+        try:
+            return float(fields[self._price_col])
+        except ValueError:
+            raise MarketDataError(
+                f"Invalid price {fields[self._price_col].strip().decode(errors='replace')!r} "
+                f"for '{ticker}' in price file {self._path}."
+            ) from None
+
+    def get_prices(self, tickers: list[str]) -> dict[str, float]:
+        if not tickers:
+            raise ValueError("Ticker list cannot be empty.")
+        missing = [t for t in tickers if t not in self._latest]
+        if missing:
+            raise SymbolNotFound(f"No price for {missing} in price file {self._path}.")
+        return {t: self._price(t, self._fields(self._latest[t])) for t in tickers}
+
+    def get_history(self, ticker: str) -> list[tuple[str, float]]:
+        """Return ``(date, price)`` rows for ``ticker``, oldest first.
+
+        Dates are empty strings when the file has no ``date`` column; rows
+        then keep file order.
+
+        Raises:
+            SymbolNotFound: If the symbol is not in the file.
+            MarketDataError: If one of its prices is not a number.
+        """
+        if ticker not in self._rows:
+            raise SymbolNotFound(f"No price for '{ticker}' in price file {self._path}.")
+        history = []
+        for offset in self._rows[ticker]:
+            fields = self._fields(offset)
+            date = fields[self._date_col].strip().decode() if self._date_col is not None else ""
+            history.append((date, self._price(ticker, fields)))
+        if self._date_col is not None:
+            history.sort(key=lambda row: row[0])
+        return history
@@ -0,0 +1,180 @@
+"""Hedged upstream calls across equivalent hosts to cut tail latency."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from concurrent import futures
+from typing import TypeVar
+
+from app.core import executors, metrics
+
+T = TypeVar("T")
+
+_CALLS = metrics.counter(
+    "upstream_calls_total", "Upstream calls made through a hedger.", ["endpoint"],
+)
+_HEDGES = metrics.counter(
+    "upstream_hedges_total",
+    "Upstream calls for which a hedged request to an alternate host was sent.",
+    ["endpoint"],
+)
+_HEDGE_WINS = metrics.counter(
+    "upstream_hedge_wins_total",
+    "Hedged requests that answered before the primary request.",
+    ["endpoint"],
+)
+
+_pool: futures.ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> futures.ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = executors.track(
+                "hedge", futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge"),
+            )
+        return _pool
+
+
+class LatencyTracker:
+    """Rolling window of recent latencies with a percentile query."""
+
+    def __init__(self, window: int = 256) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class Hedger:
+    """Send a call to a primary host and, if slow, hedge it to an alternate.
+
+    The primary request goes to ``hosts[0]``. When it has not answered after
+    the hedge delay, the same request is sent to the next alternate host
+    (alternates are used in turn) and the first successful answer wins.
+    A failure is returned only when every request sent has failed; a
+    primary that fails before the delay is not hedged, so retries stay
+    with the caller.
+
+    The hedge delay is the ``percentile`` of recent primary latencies, never
+    below ``min_delay``, so only about ``1 - percentile`` of calls are
+    hedged. Until ``min_samples`` latencies are known ``initial_delay`` is
+    used. With a single host calls run directly, without hedging.
+
+    The losing request is cancelled: on the async path its task is
+    cancelled; a blocking HTTP call on the sync path cannot be interrupted,
+    so it is abandoned and its result discarded when it finishes.
+    """
+
+    def __init__(
+        self,
+        hosts: Sequence[str],
+        endpoint: str,
+        percentile: float = 0.95,
+        min_delay: float = 0.05,
+        initial_delay: float = 0.5,
+        min_samples: int = 20,
+    ) -> None:
+        if not hosts:
+            raise ValueError("At least one host is required.")
+        self.hosts = [h.rstrip("/") for h in hosts]
+        self._endpoint = endpoint
+        self._percentile = percentile
+        self._min_delay = min_delay
+        self._initial_delay = initial_delay
+        self._min_samples = min_samples
+        self._latency = LatencyTracker()
+        self._turn = 0
+
+    def hedge_delay(self) -> float:
+        if len(self._latency) < self._min_samples:
+            return self._initial_delay
+        return max(self._min_delay, self._latency.percentile(self._percentile))
+
+    def _record(self, primary: "futures.Future | asyncio.Future", start: float) -> None:
+        if not primary.cancelled() and primary.exception() is None:
+            self._latency.record(time.perf_counter() - start)
+
+    def _alternate(self) -> str:
+        self._turn += 1
+        return self.hosts[1 + self._turn % (len(self.hosts) - 1)]
+
+    def call(self, fn: Callable[[str], T]) -> T:
+        """Run ``fn(host)`` with hedging, blocking until a result is ready."""
+        _CALLS.inc(endpoint=self._endpoint)
+        if len(self.hosts) == 1:
+            return fn(self.hosts[0])
+
+        pool = _executor()
+        start = time.perf_counter()
+        primary = pool.submit(fn, self.hosts[0])
+        primary.add_done_callback(lambda f: self._record(f, start))
+        done, _ = futures.wait([primary], timeout=self.hedge_delay())
+        if done:
+            return primary.result()
+
+        _HEDGES.inc(endpoint=self._endpoint)
+        hedge = pool.submit(fn, self._alternate())
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        while pending:
+            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if f is hedge:
+                        _HEDGE_WINS.inc(endpoint=self._endpoint)
+                    return f.result()
+                error = f.exception()
+        raise error
+
+    async def acall(self, fn: Callable[[str], Awaitable[T]]) -> T:
+        """Coroutine counterpart of :meth:`call` for async ``fn``."""
+        _CALLS.inc(endpoint=self._endpoint)
+        if len(self.hosts) == 1:
+            return await fn(self.hosts[0])
+
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(fn(self.hosts[0]))
+        primary.add_done_callback(lambda t: self._record(t, start))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay())
+            if done:
+                return primary.result()
+
+            _HEDGES.inc(endpoint=self._endpoint)
+            hedge = asyncio.ensure_future(fn(self._alternate()))
+            tasks.add(hedge)
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.exception() is None:
+                        if t is hedge:
+                            _HEDGE_WINS.inc(endpoint=self._endpoint)
+                        return t.result()
+                    error = t.exception()
+            raise error
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
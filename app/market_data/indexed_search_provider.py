@@ -0,0 +1,72 @@
+"""Local-first decorator for AbstractTickerSearchProvider."""
+
+import logging
+
+from app.market_data.base import AbstractTickerSearchProvider
+from app.market_data.symbol_index import SymbolIndex
+
+logger = logging.getLogger(__name__)
+
+
+class IndexedTickerSearchProvider(AbstractTickerSearchProvider):
+    """Decorator that answers searches from a local :class:`SymbolIndex` first.
+
+    The index is searched for up to ``result_limit`` quotes. When it returns
+    at least ``min_hits`` of them the upstream provider is not called.
+    Otherwise the upstream is queried and its quotes are appended after the
+    local ones, skipping symbols already present, up to ``result_limit``.
+
+    If the upstream call fails and the index produced any quote, the local
+    quotes are returned instead of propagating the error, so common
+    instruments stay searchable while the upstream is unreachable.
+    """
+
+    def __init__(
+        self,
+        index: SymbolIndex,
+        provider: AbstractTickerSearchProvider,
+        min_hits: int,
+        result_limit: int = 10,
+    ) -> None:
+        self._index = index
+        self._provider = provider
+        self._min_hits = min_hits
+        self._result_limit = result_limit
+
+    def _local(self, q: str) -> tuple[list[dict], bool]:
+        local = self._index.search(q, limit=self._result_limit)
+        if len(local) >= self._min_hits:
+            logger.debug("Symbol index answered %r with %d quotes", q, len(local))
+            return local, True
+        return local, False
+
+    def _merge(self, local: list[dict], upstream: list[dict]) -> list[dict]:
+        seen = {quote["symbol"] for quote in local}
+        merged = local + [quote for quote in upstream if quote.get("symbol") not in seen]
+        return merged[:self._result_limit]
+
+    def _fallback(self, q: str, local: list[dict], exc: Exception) -> list[dict]:
+        if not local:
+            raise exc
+        logger.warning("Upstream search failed for %r, serving local quotes: %s", q, exc)
+        return local
+
+    def search(self, q: str) -> list[dict]:
+        local, enough = self._local(q)
+        if enough:
+            return local
+        try:
+            upstream = self._provider.search(q)
+        except Exception as exc:
+            return self._fallback(q, local, exc)
+        return self._merge(local, upstream)
+
+    async def asearch(self, q: str) -> list[dict]:
+        local, enough = self._local(q)
+        if enough:
+            return local
+        try:
+            upstream = await self._provider.asearch(q)
+        except Exception as exc:
+            return self._fallback(q, local, exc)
+        return self._merge(local, upstream)
@@ -0,0 +1,91 @@
+"""Trading-session aware cache expiry for market prices."""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# After the regular close the last bar can still be revised for a while
+# (closing auctions, late prints); keep the normal TTL during that window.
+SETTLE_SECONDS = 15 * 60
+# Mutual funds publish their NAV hours after the close, once the holdings
+# are valued; keep the normal TTL until the evening's NAV is surely out.
+FUND_SETTLE_SECONDS = 8 * 60 * 60
+
+# Markets quoting (nearly) around the clock, like FX, show a session of
+# about a day with a short gap at the daily roll-over. Only a gap longer
+# than this is treated as the market being closed (e.g. the weekend).
+_ROLLOVER_SECONDS = 60 * 60
+_CONTINUOUS_SESSION_SECONDS = 23 * 60 * 60
+
+
+@dataclass(frozen=True)
+class TradingSession:
+    """The regular trading period an exchange reported alongside a price.
+
+    Attributes:
+        start: Unix time of the regular session open.
+        end: Unix time of the regular session close.
+        timezone: IANA name of the exchange timezone (e.g. ``Europe/Berlin``).
+        settle_seconds: How long after ``end`` the price may still change.
+    """
+
+    start: float
+    end: float
+    timezone: str
+    settle_seconds: float = SETTLE_SECONDS
+
+
+def next_open(session: TradingSession, now: float) -> float:
+    """Return the first weekday open strictly after ``now``.
+
+    The open is taken at the same local wall-clock time as ``session.start``
+    in the exchange timezone, so DST changes between sessions are honoured.
+    Exchange holidays are not known: on a holiday the price is refetched at
+    the usual open, the exchange reports the previous session again, and
+    the hold is simply extended to the following open.
+    """
+    try:
+        tz = ZoneInfo(session.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = ZoneInfo("UTC")
+    opened = datetime.fromtimestamp(session.start, tz)
+    day = opened
+    while True:
+        day += timedelta(days=1)
+        if day.weekday() >= 5:
+            continue
+        candidate = datetime.combine(day.date(), opened.timetz()).timestamp()
+        if candidate > now:
+            return candidate
+
+
+def cache_ttl(
+    session: TradingSession | None,
+    max_ttl_seconds: float,
+    now: float | None = None,
+) -> float | None:
+    """Return how long a price quoted during ``session`` may be cached.
+
+    Returns ``None`` (use the cache's default TTL) while the market is open,
+    when no session is known, or within the session's ``settle_seconds``
+    after the close. While the market is closed the price cannot change, so it is held
+    until the next open, capped at ``max_ttl_seconds``.
+    """
+    if session is None:
+        return None
+    now = time.time() if now is None else now
+
+    if now < session.start:
+        hold = session.start - now
+    elif now < session.end + session.settle_seconds:
+        return None
+    elif (
+        session.end - session.start >= _CONTINUOUS_SESSION_SECONDS
+        and now < session.end + _ROLLOVER_SECONDS
+    ):
+        return None
+    else:
+        hold = next_open(session, now) - now
+
+    return min(hold, max_ttl_seconds)
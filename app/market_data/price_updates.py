@@ -0,0 +1,61 @@
+"""Notifications of prices written to the price cache.
+
+Writers (:class:`~app.market_data.cached_provider.CachedMarketDataProvider`
+after an upstream fetch, :class:`~app.market_data.streaming.PriceStreamer`
+for every streamed price) call :meth:`PriceUpdates.publish`; async code that
+follows some tickers, such as ``/v1/rebalance/live``, waits on the event of
+:meth:`PriceUpdates.watch` instead of polling the provider.
+
+Only writes made by this process are seen: with a cache shared between
+workers (Redis, shared memory) a price fetched by another worker is not
+published here.
+"""
+
+import asyncio
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+
+class PriceUpdates:
+    """Wake the watchers of tickers whose price was written.
+
+    :meth:`publish` may be called from any thread; each watcher's event is
+    set on the event loop it was created on.
+    """
+
+    def __init__(self) -> None:
+        self._watchers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, tickers: Iterable[str]) -> None:
+        with self._lock:
+            targets = {w for t in tickers for w in self._watchers.get(t, ())}
+        for loop, event in targets:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # the watcher's loop has closed
+
+    @contextmanager
+    def watch(self, tickers: Iterable[str]) -> Iterator[asyncio.Event]:
+        """Yield an event set whenever the price of one of ``tickers`` is written.
+
+        The event is never cleared here: the watcher clears it before it
+        reads the prices, so a write during the read wakes it again.
+        """
+        watcher = (asyncio.get_running_loop(), asyncio.Event())
+        tickers = set(tickers)
+        with self._lock:
+            for ticker in tickers:
+                self._watchers.setdefault(ticker, set()).add(watcher)
+        try:
+            yield watcher[1]
+        finally:
+            with self._lock:
+                for ticker in tickers:
+                    watchers = self._watchers.get(ticker)
+                    if watchers is not None:
+                        watchers.discard(watcher)
+                        if not watchers:
+                            del self._watchers[ticker]
@@ -1,30 +1,147 @@
-"""Redis-backed cache implementation."""
+"""Redis-backed cache implementation on a shared asyncio connection pool."""
 
-from app.market_data.cache import AbstractCache
+import asyncio
+import math
+from collections.abc import Callable, Coroutine
+from typing import TYPE_CHECKING, Any, TypeVar
 
+from app.core import metrics
+from app.market_data.cache import AbstractCache, V
 
-class RedisCache(AbstractCache):
+if TYPE_CHECKING:
+    from redis.asyncio import BlockingConnectionPool, Redis
+
+T = TypeVar("T")
+
+_COMMAND_SECONDS = metrics.histogram(
+    "redis_command_duration_seconds",
+    "Latency of Redis commands issued by the cache, including pool wait time.",
+    ["command"],
+    buckets=metrics.FAST_BUCKETS,
+)
+_COMMAND_ERRORS = metrics.counter(
+    "redis_command_errors_total", "Redis commands that raised.", ["command"],
+)
+_POOL_CONNECTIONS = metrics.gauge(
+    "redis_pool_connections", "Connections in the shared Redis pool.", ["state"],
+)
+_POOL_SATURATION = metrics.gauge(
+    "redis_pool_saturation_ratio",
+    "In-use connections divided by the pool's max_connections.",
+)
+
+
+def _import_redis_asyncio():
+    try:
+        import redis.asyncio
+    except ImportError as exc:
+        raise RuntimeError(
+            "redis package not found. "
+            "Ensure redis>=5 is installed (it is listed in requirements.txt). "
+            "If running in a custom environment, install it manually: pip install redis>=5"
+        ) from exc
+    return redis.asyncio
+
+
+def create_pool(
+    url: str,
+    max_connections: int,
+    pool_timeout: float,
+    socket_timeout: float,
+) -> "BlockingConnectionPool":
+    """Create the process-wide Redis pool and expose its usage as metrics.
+
+    A :class:`~redis.asyncio.BlockingConnectionPool` makes callers wait up to
+    ``pool_timeout`` seconds for a free connection instead of opening more
+    than ``max_connections``, so saturation shows up as latency in
+    ``redis_command_duration_seconds`` and as a ratio near 1 in
+    ``redis_pool_saturation_ratio``.
+    """
+    aioredis = _import_redis_asyncio()
+    pool = aioredis.BlockingConnectionPool.from_url(
+        url,
+        max_connections=max_connections,
+        timeout=pool_timeout,
+        socket_connect_timeout=socket_timeout,
+        socket_timeout=socket_timeout,
+        decode_responses=True,
+    )
+    _POOL_CONNECTIONS.set_function(lambda: {
+        ("in_use",): len(pool._in_use_connections),
+        ("available",): len(pool._available_connections),
+    })
+    _POOL_SATURATION.set_function(lambda: len(pool._in_use_connections) / pool.max_connections)
+    return pool
+
+
+def create_client(pool: "BlockingConnectionPool") -> "Redis":
+    return _import_redis_asyncio().Redis(connection_pool=pool)
+
+
+class RedisCache(AbstractCache[V]):
     """Redis cache using ``SETEX`` for atomic write-with-TTL.
 
-    The ``redis`` package is imported lazily so deployments using
-    ``CACHE_BACKEND=local`` do not require the package to be installed.
+    Commands run on an asyncio client whose connection pool is created once
+    at startup and shared with the readiness probe. Coroutine callers use
+    :meth:`aget`/:meth:`aset`; the sync :meth:`get`/:meth:`set` used from
+    executor threads submit the same coroutines to the event loop bound with
+    :meth:`bind_loop` and block the calling thread until they complete.
+
+    Values are stored as strings: ``dumps`` encodes on write and ``loads``
+    decodes on read. The defaults round-trip the float prices used by
+    :class:`~app.market_data.cached_provider.CachedMarketDataProvider`.
     """
 
-    def __init__(self, url: str, ttl_seconds: int) -> None:
-        try:
-            import redis
-        except ImportError as exc:
-            raise RuntimeError(
-                "redis package not found. "
-                "Ensure redis>=5 is installed (it is listed in requirements.txt). "
-                "If running in a custom environment, install it manually: pip install redis>=5"
-            ) from exc
-        self._client = redis.Redis.from_url(url, decode_responses=True)
+    backend = "redis"
+
+    def __init__(
+        self,
+        client: "Redis",
+        ttl_seconds: int,
+        loads: Callable[[str], V] = float,
+        dumps: Callable[[V], str] = str,
+    ) -> None:
+        self._client = client
         self._ttl = ttl_seconds
+        self._loads = loads
+        self._dumps = dumps
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    async def _timed(self, command: str, coro: Coroutine[Any, Any, T]) -> T:
+        with _COMMAND_SECONDS.time(command=command):
+            try:
+                return await coro
+            except Exception:
+                _COMMAND_ERRORS.inc(command=command)
+                raise
+
+    async def aget(self, key: str) -> V | None:
+        raw = await self._timed("get", self._client.get(key))
+        return self._loads(raw) if raw is not None else None
+
+    async def aset(self, key: str, value: V, ttl_seconds: float | None = None) -> None:
+        ttl = self._ttl if ttl_seconds is None else max(1, math.ceil(ttl_seconds))
+        await self._timed("setex", self._client.setex(key, ttl, self._dumps(value)))
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        loop = self._loop
+        if loop is None:
+            coro.close()
+            raise RuntimeError("RedisCache used before bind_loop() was called.")
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise RuntimeError("Use aget/aset on the event loop; get/set would deadlock.")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
 
-    def get(self, key: str) -> float | None:
-        raw = self._client.get(key)
-        return float(raw) if raw is not None else None
+    def get(self, key: str) -> V | None:
+        return self._run(self.aget(key))
 
-    def set(self, key: str, value: float) -> None:
-        self._client.setex(key, self._ttl, value)
+    def set(self, key: str, value: V, ttl_seconds: float | None = None) -> None:
+        self._run(self.aset(key, value, ttl_seconds))
@@ -0,0 +1,150 @@
+"""Latency-aware failover across several price providers."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+
+from app.core import metrics
+from app.core.exceptions import MarketDataError, SymbolNotFound
+from app.market_data.base import AbstractMarketDataProvider, AbstractQuoteProvider, Quote
+
+logger = logging.getLogger(__name__)
+
+_REQUESTS = metrics.counter(
+    "price_provider_requests_total",
+    "Price provider calls made by the registry.",
+    ["provider", "outcome"],
+)
+_LATENCY = metrics.histogram(
+    "price_provider_duration_seconds",
+    "Latency of price provider calls made by the registry.",
+    ["provider"],
+)
+_CIRCUIT_OPEN = metrics.gauge(
+    "price_provider_circuit_open",
+    "1 while a price provider is skipped after repeated failures.",
+    ["provider"],
+)
+
+
+class _ProviderState:
+    """Smoothed health of one provider (exponentially weighted averages)."""
+
+    def __init__(self, name: str, provider: AbstractMarketDataProvider) -> None:
+        self.name = name
+        self.provider = provider
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+
+
+class ProviderRegistry(AbstractQuoteProvider):
+    """Route price requests to the fastest healthy provider, failing over.
+
+    Providers are ranked by expected cost: the smoothed latency of recent
+    calls plus ``error_penalty_seconds`` weighted by the smoothed error rate.
+    A provider not yet called ranks as free, so each provider is tried once
+    early on; ties keep the configured order.
+
+    Tickers go to the best provider as one batch. If it raises, the tickers
+    still missing move on to the next provider, and so on; only when every
+    provider has failed is :class:`MarketDataError` raised.
+
+    After ``failure_threshold`` consecutive failures a provider's circuit
+    opens and it is skipped for ``cooldown_seconds``. Open providers are
+    still tried last, so a failure on every provider costs latency, never
+    an outage. :class:`SymbolNotFound` (an unknown or invalid ticker) is
+    not a failure: the provider answered, so its tickers move on to the
+    next provider without hurting its health.
+
+    Plain :class:`AbstractMarketDataProvider` members report prices without a
+    trading session; the registry returns those as ``Quote(price)``.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[tuple[str, AbstractMarketDataProvider]],
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30.0,
+        error_penalty_seconds: float = 5.0,
+        smoothing: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not providers:
+            raise ValueError("At least one price provider is required.")
+        self._states = [_ProviderState(name, p) for name, p in providers]
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown_seconds
+        self._penalty = error_penalty_seconds
+        self._alpha = smoothing
+        self._clock = clock
+        self._lock = threading.Lock()
+        _CIRCUIT_OPEN.set_function(lambda: {
+            (s.name,): float(s.open_until > self._clock()) for s in self._states
+        })
+
+    def ranked(self) -> list[str]:
+        """Provider names in the order the next request will try them."""
+        return [s.name for s in self._ranked()]
+
+    def _ranked(self) -> list[_ProviderState]:
+        now = self._clock()
+        with self._lock:
+            return sorted(
+                self._states,
+                key=lambda s: (s.open_until > now, s.latency + s.error_rate * self._penalty),
+            )
+
+    def _record(
+        self, state: _ProviderState, seconds: float, ok: bool, outcome: str | None = None,
+    ) -> None:
+        a = self._alpha
+        with self._lock:
+            state.latency += a * (seconds - state.latency) if state.latency else seconds
+            state.error_rate += a * ((0.0 if ok else 1.0) - state.error_rate)
+            if ok:
+                state.failures = 0
+                state.open_until = 0.0
+            else:
+                state.failures += 1
+                if state.failures >= self._failure_threshold:
+                    state.open_until = self._clock() + self._cooldown
+        _REQUESTS.inc(provider=state.name, outcome=outcome or ("success" if ok else "error"))
+        _LATENCY.observe(seconds, provider=state.name)
+
+    @staticmethod
+    def _call(provider: AbstractMarketDataProvider, tickers: list[str]) -> dict[str, Quote]:
+        if isinstance(provider, AbstractQuoteProvider):
+            return provider.get_quotes(tickers)
+        return {t: Quote(p) for t, p in provider.get_prices(tickers).items()}
+
+    def get_quotes(self, tickers: list[str]) -> dict[str, Quote]:
+        if not tickers:
+            raise ValueError("Ticker list cannot be empty.")
+        quotes: dict[str, Quote] = {}
+        missing = list(tickers)
+        last_error: Exception | None = None
+        for state in self._ranked():
+            start = time.perf_counter()
+            try:
+                quotes.update(self._call(state.provider, missing))
+            except SymbolNotFound as exc:
+                self._record(state, time.perf_counter() - start, ok=True, outcome="not_found")
+                logger.info("Price provider '%s' has no price for %s: %s", state.name, missing, exc)
+                last_error = exc
+                continue
+            except Exception as exc:
+                self._record(state, time.perf_counter() - start, ok=False)
+                logger.warning("Price provider '%s' failed for %s: %s", state.name, missing, exc)
+                last_error = exc
+                continue
+            self._record(state, time.perf_counter() - start, ok=True)
+            missing = [t for t in missing if t not in quotes]
+            if not missing:
+                return quotes
+        raise MarketDataError(
+            f"No price provider could fetch {missing}. "
+            f"Last error: {last_error or 'no price returned'}"
+        )
@@ -0,0 +1,176 @@
+"""Shared-memory price cache shared by all worker processes on a host."""
+
+import fcntl
+import logging
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+from app.market_data.cache import AbstractCache
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"PXSHM001"
+_HEADER = struct.Struct("<8sII")      # magic | slot count | key size
+_HEADER_SIZE = 64
+KEY_SIZE = 64
+_SEQ = struct.Struct("<I")
+_SEQ_MASK = 0xFFFFFFFF
+_SLOT = struct.Struct(f"<I4x{KEY_SIZE}sdd")  # seq | key | value | expires_at
+_BODY = struct.Struct(f"<{KEY_SIZE}sdd")
+_READ_RETRIES = 100
+
+
+def _open_segment(name: str, size: int) -> tuple[shared_memory.SharedMemory, bool]:
+    # The segment outlives any single worker: keep the resource tracker from
+    # unlinking it when the process that created or attached it exits.
+    # Python 3.13 can skip tracking; older versions need it undone.
+    untracked = {"track": False} if sys.version_info >= (3, 13) else {}
+    try:
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size, **untracked)
+        created = True
+    except FileExistsError:
+        shm, created = shared_memory.SharedMemory(name=name, **untracked), False
+    if not untracked:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm, created
+
+
+class SharedMemoryCache(AbstractCache[float]):
+    """Fixed-layout price table in a named POSIX shared-memory segment.
+
+    Every worker on the host attaches the same segment, so a price fetched
+    by one worker is a cache hit for all of them, like Redis, while a read
+    costs only a few ``struct.unpack_from`` calls on mapped memory: no
+    syscall, socket or serialisation.
+
+    Layout: a 64-byte header (magic, slot count, key size) followed by
+    ``slots`` fixed-size slots of ``seq | key | value | expires_at``.
+
+    Symbol-to-slot index:
+        Keys are placed by open addressing: ``crc32(key) % slots``, then
+        linear probing. Slots are claimed once and never freed; an expired
+        entry keeps its slot and is overwritten in place by the next
+        ``set``. When every slot is taken, new keys are not cached (each
+        ``get`` misses) and a warning is logged; size ``slots`` well above
+        the number of distinct tickers served.
+
+    Concurrency:
+        Writers serialise on an ``flock`` on a lock file next to the
+        segment (plus a thread lock, since ``flock`` does not exclude threads
+        sharing a descriptor). Readers take no lock: each slot carries a
+        sequence counter that a writer makes odd before updating and even
+        after, and a reader retries until it sees the same even value before
+        and after copying the slot (a seqlock).
+
+    Expiry uses wall-clock time so all processes agree on it. Keys longer
+    than :data:`KEY_SIZE` bytes are never cached.
+
+    The segment is not unlinked when workers exit; it persists until the
+    host reboots or it is removed from ``/dev/shm``. A segment with a
+    different layout (e.g. another ``slots`` value) is rejected.
+    """
+
+    backend = "shm"
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: int,
+        slots: int = 4096,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._slots = slots
+        self._thread_lock = threading.Lock()
+        self._lock_fd = os.open(
+            os.path.join(tempfile.gettempdir(), f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o600,
+        )
+        with self._write_lock():
+            self._shm, created = _open_segment(name, _HEADER_SIZE + slots * _SLOT.size)
+            self._buf = self._shm.buf
+            if created:
+                _HEADER.pack_into(self._buf, 0, _MAGIC, slots, KEY_SIZE)
+            elif _HEADER.unpack_from(self._buf, 0) != (_MAGIC, slots, KEY_SIZE):
+                raise RuntimeError(
+                    f"Shared memory segment {name!r} has an incompatible layout. "
+                    f"Remove /dev/shm/{name} or choose another SHM_CACHE_NAME."
+                )
+        self._full_warned = False
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        with self._thread_lock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _offset(self, index: int) -> int:
+        return _HEADER_SIZE + index * _SLOT.size
+
+    def _read(self, offset: int) -> tuple[bytes, float, float] | None:
+        buf = self._buf
+        for _ in range(_READ_RETRIES):
+            (before,) = _SEQ.unpack_from(buf, offset)
+            if before & 1:
+                continue
+            _, key, value, expires_at = _SLOT.unpack_from(buf, offset)
+            (after,) = _SEQ.unpack_from(buf, offset)
+            if before == after:
+                return key, value, expires_at
+        return None
+
+    def _probe(self, raw_key: bytes) -> Iterator[int]:
+        start = zlib.crc32(raw_key) % self._slots
+        for i in range(self._slots):
+            yield self._offset((start + i) % self._slots)
+
+    def get(self, key: str) -> float | None:
+        raw_key = key.encode()
+        if len(raw_key) > KEY_SIZE:
+            return None
+        padded = raw_key.ljust(KEY_SIZE, b"\0")
+        for offset in self._probe(raw_key):
+            slot = self._read(offset)
+            if slot is None:
+                return None
+            slot_key, value, expires_at = slot
+            if slot_key[0] == 0:
+                return None
+            if slot_key == padded:
+                return value if self._clock() <= expires_at else None
+        return None
+
+    def set(self, key: str, value: float, ttl_seconds: float | None = None) -> None:
+        raw_key = key.encode()
+        if len(raw_key) > KEY_SIZE:
+            return
+        padded = raw_key.ljust(KEY_SIZE, b"\0")
+        expires_at = self._clock() + (self._ttl if ttl_seconds is None else ttl_seconds)
+        buf = self._buf
+        with self._write_lock():
+            for offset in self._probe(raw_key):
+                seq, slot_key, _, _ = _SLOT.unpack_from(buf, offset)
+                if slot_key[0] == 0 or slot_key == padded:
+                    _SEQ.pack_into(buf, offset, (seq + 1) & _SEQ_MASK)
+                    _BODY.pack_into(buf, offset + 8, padded, value, expires_at)
+                    _SEQ.pack_into(buf, offset, (seq + 2) & _SEQ_MASK)
+                    return
+        if not self._full_warned:
+            logger.warning("Shared memory cache is full; %r and later new keys are not cached.", key)
+            self._full_warned = True
+
+    def close(self) -> None:
+        self._buf = None
+        self._shm.close()
+        os.close(self._lock_fd)
@@ -0,0 +1,119 @@
+"""On-disk snapshot of the local price cache for warm restarts.
+
+File layout (little-endian)::
+
+    header   4s magic b"PXS1" | I entry count
+    entry    H key length | key (UTF-8) | d price | d expires_at (Unix time)
+
+Expiry is stored as absolute wall-clock time, so an entry restored after a
+restart keeps the expiry it was given when first fetched: a price cached
+four minutes before shutdown with a five minute TTL is served for one more
+minute, and entries that expired while the process was down are skipped.
+"""
+
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from app.market_data.cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"PXS1"
+_HEADER = struct.Struct("<4sI")
+_KEY_LEN = struct.Struct("<H")
+_ENTRY = struct.Struct("<dd")
+
+
+def write_snapshot(
+    path: Path,
+    cache: LocalCache[float],
+    clock: Callable[[], float] = time.time,
+) -> int:
+    """Atomically write the live entries of ``cache`` to ``path``.
+
+    The file is written next to ``path`` and renamed over it, so readers
+    (including other workers sharing the path) never see a partial file.
+
+    Returns:
+        The number of entries written.
+    """
+    now = clock()
+    entries = cache.entries()
+    chunks = [_HEADER.pack(_MAGIC, len(entries))]
+    for key, value, remaining in entries:
+        raw_key = key.encode()
+        chunks.append(_KEY_LEN.pack(len(raw_key)))
+        chunks.append(raw_key)
+        chunks.append(_ENTRY.pack(value, now + remaining))
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(b"".join(chunks))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(entries)
+
+
+def load_snapshot(
+    path: Path,
+    cache: LocalCache[float],
+    clock: Callable[[], float] = time.time,
+) -> int:
+    """Restore unexpired entries from ``path`` into ``cache``.
+
+    A missing, empty or malformed file is logged and ignored: the cache
+    simply starts cold.
+
+    Returns:
+        The number of entries restored.
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            magic, count = _HEADER.unpack_from(buf, 0)
+            if magic != _MAGIC:
+                raise ValueError(f"bad magic {magic!r}")
+            offset = _HEADER.size
+            entries = []
+            for _ in range(count):
+                (key_len,) = _KEY_LEN.unpack_from(buf, offset)
+                offset += _KEY_LEN.size
+                key = buf[offset:offset + key_len].decode()
+                offset += key_len
+                value, expires_at = _ENTRY.unpack_from(buf, offset)
+                offset += _ENTRY.size
+                entries.append((key, value, expires_at))
+    except FileNotFoundError:
+        logger.info("No price snapshot at %s, starting cold.", path)
+        return 0
+    except (OSError, ValueError, struct.error) as exc:
+        logger.warning("Ignoring unreadable price snapshot %s: %s", path, exc)
+        return 0
+
+    # Parse fully before restoring so a truncated file restores nothing.
+    now = clock()
+    restored = 0
+    for key, value, expires_at in entries:
+        if expires_at > now:
+            cache.set(key, value, ttl_seconds=expires_at - now)
+            restored += 1
+
+    logger.info("Restored %d/%d cached prices from %s", restored, count, path)
+    return restored
+
+
+async def run_snapshots(path: Path, cache: LocalCache[float], interval_seconds: float) -> None:
+    """Write a snapshot every ``interval_seconds`` until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await loop.run_in_executor(None, write_snapshot, path, cache)
+        except OSError as exc:
+            logger.warning("Could not write price snapshot %s: %s", path, exc)
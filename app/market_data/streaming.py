@@ -0,0 +1,265 @@
+"""Push-based price ingestion from Yahoo's streaming quote feed.
+
+:class:`PriceStreamer` keeps a WebSocket open to a streamer speaking
+Yahoo's protocol (``wss://streamer.finance.yahoo.com/?version=2``, or the
+stand-in in ``benchmarks/mock_yahoo.py``), subscribes to the tickers most
+requested lately and writes every price it receives into the price cache.
+Hot tickers then stay cached without a request ever fetching them; a ticker
+that stops trading stops receiving updates, its entry expires and the
+request path fetches it as usual.
+
+Protocol: the client sends ``{"subscribe": [tickers]}`` and
+``{"unsubscribe": [tickers]}``. The server sends base64-encoded
+``PricingData`` protobuf messages, wrapped in
+``{"type": "pricing", "message": ...}`` by version 2. Only the ticker
+(field 1, string) and price (field 2, float) are read; the rest is skipped,
+so no protobuf dependency is needed.
+"""
+
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import math
+import struct
+import threading
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from typing import Any
+
+from app.core import metrics
+from app.market_data.cache import AbstractCache
+from app.market_data.cached_provider import price_key
+
+logger = logging.getLogger(__name__)
+
+_MESSAGES = metrics.counter(
+    "price_stream_messages_total", "Streamed price messages by result.", ["result"],
+)
+_SUBSCRIBED = metrics.gauge("price_stream_subscribed", "Tickers subscribed on the price stream.")
+
+_MAX_BACKOFF = 60.0
+
+
+@dataclass(frozen=True)
+class PriceUpdate:
+    ticker: str
+    price: float
+
+
+# -- PricingData wire format -------------------------------------------------
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        if pos >= len(data) or shift > 63:
+            raise ValueError("truncated varint")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_pricing(data: bytes) -> PriceUpdate:
+    """Read ticker and price from a ``PricingData`` message.
+
+    Raises:
+        ValueError: If the message is malformed or lacks either field.
+    """
+    ticker: str | None = None
+    price: float | None = None
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            _, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            pos += 8
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            if field == 1:
+                ticker = data[pos:pos + length].decode()
+            pos += length
+        elif wire_type == 5:
+            if pos + 4 > len(data):
+                raise ValueError("truncated field")
+            if field == 2:
+                (price,) = struct.unpack_from("<f", data, pos)
+            pos += 4
+        else:
+            raise ValueError(f"unsupported wire type {wire_type}")
+        if pos > len(data):
+            raise ValueError("truncated field")
+    if not ticker or price is None:
+        raise ValueError("ticker or price missing")
+    # The price is a float32: drop the binary noise (189.5299987... -> 189.53).
+    return PriceUpdate(ticker, float(f"{price:.7g}"))
+
+
+def encode_pricing(ticker: str, price: float) -> bytes:
+    """Encode ``ticker`` and ``price`` as a ``PricingData`` message (for stand-ins and tests)."""
+    raw = ticker.encode()
+    return (
+        _write_varint(1 << 3 | 2) + _write_varint(len(raw)) + raw
+        + _write_varint(2 << 3 | 5) + struct.pack("<f", price)
+    )
+
+
+def decode_message(message: str | bytes) -> PriceUpdate | None:
+    """Decode one streamer frame; None for frames that carry no price.
+
+    Raises:
+        ValueError: If the frame is malformed.
+    """
+    if isinstance(message, bytes):
+        message = message.decode()
+    if message.startswith("{"):
+        envelope = json.loads(message)
+        if envelope.get("type") != "pricing":
+            return None
+        message = envelope.get("message", "")
+    try:
+        return decode_pricing(base64.b64decode(message, validate=True))
+    except binascii.Error as exc:
+        raise ValueError(str(exc)) from exc
+
+
+# -- Popularity ----------------------------------------------------------------
+
+class Popularity:
+    """Decaying request counts per ticker.
+
+    :meth:`record` is fed every ticker priced by the request path; each
+    :meth:`top` call returns the most requested ones, then halves all counts
+    so that tickers nobody asks for any more fall out. At most
+    ``max_tracked`` tickers are counted; new ones beyond that are ignored
+    until decay makes room.
+    """
+
+    def __init__(self, max_tracked: int = 10_000) -> None:
+        self._counts: dict[str, float] = {}
+        self._max_tracked = max_tracked
+        self._lock = threading.Lock()
+
+    def record(self, tickers: list[str]) -> None:
+        with self._lock:
+            for ticker in tickers:
+                if ticker in self._counts:
+                    self._counts[ticker] += 1
+                elif len(self._counts) < self._max_tracked:
+                    self._counts[ticker] = 1
+
+    def top(self, n: int) -> list[str]:
+        with self._lock:
+            ranked = sorted(self._counts, key=self._counts.__getitem__, reverse=True)[:n]
+            # A single request keeps a ticker ranked for three rounds.
+            self._counts = {t: c / 2 for t, c in self._counts.items() if c >= 0.5}
+        return ranked
+
+
+# -- Streamer ------------------------------------------------------------------
+
+def _connect(url: str) -> AbstractAsyncContextManager[Any]:
+    # Imported on first use: only needed when streaming is on.
+    from websockets.asyncio.client import connect
+    return connect(url, open_timeout=10, ping_interval=20)
+
+
+class PriceStreamer:
+    """Stream prices of the ``top_n`` most popular tickers into ``cache``.
+
+    Subscriptions follow :class:`Popularity` every ``refresh_seconds``. On a
+    lost connection it reconnects with exponential backoff (1 s up to 60 s).
+    ``connect(url)`` returns an async context manager yielding a connection
+    with ``send(str)`` and async iteration over received frames; the default
+    uses the ``websockets`` client. ``on_update``, when given, is called with
+    the ticker of every price written.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        cache: AbstractCache[float],
+        popularity: Popularity,
+        top_n: int,
+        refresh_seconds: float,
+        connect: Callable[[str], AbstractAsyncContextManager[Any]] = _connect,
+        on_update: Callable[[list[str]], None] | None = None,
+    ) -> None:
+        self._url = url
+        self._cache = cache
+        self._popularity = popularity
+        self._top_n = top_n
+        self._refresh = refresh_seconds
+        self._connect = connect
+        self._on_update = on_update
+
+    async def run(self) -> None:
+        """Stream until cancelled."""
+        backoff = 1.0
+        while True:
+            try:
+                async with self._connect(self._url) as ws:
+                    logger.info("Price stream connected to %s", self._url)
+                    backoff = 1.0
+                    await self.stream(ws)
+            except Exception as exc:
+                logger.warning("Price stream to %s lost (%s); reconnecting in %.0f s",
+                               self._url, exc, backoff)
+            _SUBSCRIBED.set(0)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, _MAX_BACKOFF)
+
+    async def stream(self, ws: Any) -> None:
+        """Ingest from the open connection ``ws`` until it closes."""
+        subscriptions = asyncio.create_task(self._follow_popularity(ws))
+        try:
+            async for message in ws:
+                await self._ingest(message)
+        finally:
+            subscriptions.cancel()
+            await asyncio.gather(subscriptions, return_exceptions=True)
+
+    async def _follow_popularity(self, ws: Any) -> None:
+        subscribed: set[str] = set()
+        while True:
+            wanted = set(self._popularity.top(self._top_n))
+            if gone := sorted(subscribed - wanted):
+                await ws.send(json.dumps({"unsubscribe": gone}))
+            if new := sorted(wanted - subscribed):
+                await ws.send(json.dumps({"subscribe": new}))
+            subscribed = wanted
+            _SUBSCRIBED.set(len(subscribed))
+            await asyncio.sleep(self._refresh)
+
+    async def _ingest(self, message: str | bytes) -> None:
+        try:
+            update = decode_message(message)
+        except ValueError as exc:
+            _MESSAGES.inc(result="malformed")
+            logger.debug("Malformed price stream message: %s", exc)
+            return
+        if update is None or not math.isfinite(update.price) or update.price <= 0:
+            _MESSAGES.inc(result="ignored")
+            return
+        await self._cache.aset(price_key(update.ticker), update.price)
+        _MESSAGES.inc(result="update")
+        if self._on_update is not None:
+            self._on_update([update.ticker])
@@ -0,0 +1,101 @@
+"""In-memory prefix index over instrument symbols and names."""
+
+import csv
+import logging
+import re
+from bisect import bisect_left
+from pathlib import Path
+
+from app.market_data.base import ALLOWED_QUOTE_TYPES
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_SYMBOLS = Path(__file__).resolve().parent / "data" / "symbols.csv"
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def _tokens(quote: dict) -> set[str]:
+    symbol = quote["symbol"].casefold()
+    tokens = {symbol}
+    tokens.update(t for t in _TOKEN_SPLIT.split(symbol) if t)
+    tokens.update(t for t in _TOKEN_SPLIT.split(quote["shortname"].casefold()) if t)
+    return tokens
+
+
+class SymbolIndex:
+    """Sorted-array prefix index answering autocomplete queries locally.
+
+    Every quote contributes its full symbol, the alphanumeric parts of the
+    symbol (``vwce`` and ``de`` for ``VWCE.DE``) and the words of its name as
+    tokens. The ``(token, quote_id)`` pairs are kept in one sorted array, so
+    the quotes matching a prefix are a contiguous slice found with two
+    bisections: O(log T) per query term, T = number of tokens.
+
+    A quote matches a query when every whitespace-separated query term is a
+    prefix of one of its tokens. Matches are ranked exact symbol first, then
+    symbol prefix, then name matches; ties keep the file order, so the
+    symbol file should list the most popular instruments first.
+
+    Quotes are stored in the shape returned by Yahoo search (``symbol``,
+    ``shortname``, ``exchange``, ``quoteType``) so callers can treat local
+    and upstream results alike. Rows whose type is not in
+    :data:`~app.market_data.base.ALLOWED_QUOTE_TYPES` are dropped at load.
+    """
+
+    def __init__(self, quotes: list[dict]) -> None:
+        self._quotes = [q for q in quotes if q["quoteType"] in ALLOWED_QUOTE_TYPES]
+        pairs = sorted(
+            (token, i) for i, quote in enumerate(self._quotes) for token in _tokens(quote)
+        )
+        self._keys = [token for token, _ in pairs]
+        self._ids = [i for _, i in pairs]
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "SymbolIndex":
+        """Load an index from a CSV file with ``symbol,name,exchange,type`` columns."""
+        with open(path, newline="", encoding="utf-8") as f:
+            quotes = [
+                {
+                    "symbol": row["symbol"],
+                    "shortname": row["name"],
+                    "exchange": row["exchange"],
+                    "quoteType": row["type"],
+                }
+                for row in csv.DictReader(f)
+            ]
+        index = cls(quotes)
+        logger.info("Loaded %d symbols from %s", len(index), path)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    def _prefix_ids(self, term: str) -> set[int]:
+        lo = bisect_left(self._keys, term)
+        hi = bisect_left(self._keys, term[:-1] + chr(ord(term[-1]) + 1), lo)
+        return set(self._ids[lo:hi])
+
+    def search(self, q: str, limit: int) -> list[dict]:
+        terms = q.casefold().split()
+        if not terms:
+            return []
+
+        matches: set[int] | None = None
+        for term in terms:
+            ids = self._prefix_ids(term)
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                return []
+
+        query = " ".join(terms)
+
+        def rank(i: int) -> tuple[int, int]:
+            symbol = self._quotes[i]["symbol"].casefold()
+            if symbol == query or symbol.split(".")[0] == query:
+                return 0, i
+            if symbol.startswith(query):
+                return 1, i
+            return 2, i
+
+        return [dict(self._quotes[i]) for i in sorted(matches, key=rank)[:limit]]
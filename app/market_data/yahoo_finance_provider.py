@@ -5,53 +5,104 @@ import time
 
 import httpx
 
-from app.core.exceptions import MarketDataError
-from app.market_data.base import AbstractMarketDataProvider
+from app.core.exceptions import MarketDataError, SymbolNotFound
+from app.market_data.base import AbstractQuoteProvider, Quote
+from app.market_data.hedging import Hedger
+from app.market_data.market_hours import FUND_SETTLE_SECONDS, SETTLE_SECONDS, TradingSession
 
 logger = logging.getLogger(__name__)
 
-_URL = "https://query2.finance.yahoo.com/v8/finance/chart/{ticker}"
+DEFAULT_HOSTS = ("https://query2.finance.yahoo.com", "https://query1.finance.yahoo.com")
+_PATH = "/v8/finance/chart/{ticker}"
 _PARAMS = {"interval": "1d", "range": "1d"}
 _HEADERS = {"User-Agent": "Mozilla/5.0"}
 _RETRIES = 3
 _DELAY = 1.0
+# Statuses answered for an unknown or malformed symbol: retrying will not help.
+_NOT_FOUND = (400, 404)
 
 
-def _fetch_single(ticker: str) -> float:
+def _parse_session(meta: dict) -> TradingSession | None:
+    """Extract the regular trading session from a chart ``meta`` block.
+
+    Crypto trades around the clock, so it gets no session (normal TTL).
+    Mutual funds price once a day, hours after the close: their session
+    settles for :data:`FUND_SETTLE_SECONDS`.
+    """
+    instrument = meta.get("instrumentType")
+    if instrument == "CRYPTOCURRENCY":
+        return None
+    try:
+        regular = meta["currentTradingPeriod"]["regular"]
+        return TradingSession(
+            start=float(regular["start"]),
+            end=float(regular["end"]),
+            timezone=meta["exchangeTimezoneName"],
+            settle_seconds=FUND_SETTLE_SECONDS if instrument == "MUTUALFUND" else SETTLE_SECONDS,
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _get_chart(host: str, ticker: str) -> dict:
+    r = httpx.get(
+        host + _PATH.format(ticker=ticker),
+        params=_PARAMS,
+        headers=_HEADERS,
+        timeout=10,
+    )
+    r.raise_for_status()
+    return r.json()
+
+
+def _fetch_single(ticker: str, hedger: Hedger) -> Quote:
     last_error: str | None = None
+    empty = False
     for attempt in range(1, _RETRIES + 1):
         try:
-            r = httpx.get(
-                _URL.format(ticker=ticker),
-                params=_PARAMS,
-                headers=_HEADERS,
-                timeout=10,
-            )
-            r.raise_for_status()
-            closes = r.json()["chart"]["result"][0]["indicators"]["quote"][0]["close"]
+            payload = hedger.call(lambda host: _get_chart(host, ticker))
+            result = payload["chart"]["result"][0]
+            closes = result["indicators"]["quote"][0]["close"]
             closes = [c for c in closes if c is not None]
             if closes:
-                return float(closes[-1])
-            last_error = f"Empty close data for '{ticker}'."
+                return Quote(float(closes[-1]), _parse_session(result.get("meta") or {}))
+            last_error, empty = f"Empty close data for '{ticker}'.", True
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code in _NOT_FOUND:
+                raise SymbolNotFound(
+                    f"Yahoo Finance has no price for '{ticker}' "
+                    f"({exc.response.status_code})."
+                ) from exc
+            last_error, empty = str(exc), False
+            logger.warning(
+                "Attempt %d/%d failed for '%s': %s",
+                attempt, _RETRIES, ticker, exc,
+            )
         except Exception as exc:
-            last_error = str(exc)
+            last_error, empty = str(exc), False
             logger.warning(
                 "Attempt %d/%d failed for '%s': %s",
                 attempt, _RETRIES, ticker, exc,
             )
         if attempt < _RETRIES:
             time.sleep(_DELAY)
-    raise MarketDataError(
+    # A chart without closes answered every attempt: the symbol has no price.
+    raise (SymbolNotFound if empty else MarketDataError)(
         f"Could not fetch price for '{ticker}' after {_RETRIES} attempts. "
         f"Last error: {last_error}"
     )
 
 
-class YahooFinanceProvider(AbstractMarketDataProvider):
-    def get_prices(self, tickers: list[str]) -> dict[str, float]:
+class YahooFinanceProvider(AbstractQuoteProvider):
+    """Chart API prices, hedged across ``hedger.hosts`` (see :class:`Hedger`)."""
+
+    def __init__(self, hedger: Hedger | None = None) -> None:
+        self._hedger = hedger or Hedger(DEFAULT_HOSTS, endpoint="chart")
+
+    def get_quotes(self, tickers: list[str]) -> dict[str, Quote]:
         if not tickers:
             raise ValueError("Ticker list cannot be empty.")
         logger.info("Fetching prices for: %s", tickers)
-        prices = {ticker: _fetch_single(ticker) for ticker in tickers}
-        logger.info("Prices fetched: %s", prices)
-        return prices
+        quotes = {ticker: _fetch_single(ticker, self._hedger) for ticker in tickers}
+        logger.info("Prices fetched: %s", {t: q.price for t, q in quotes.items()})
+        return quotes
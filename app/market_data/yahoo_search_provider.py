@@ -5,23 +5,45 @@ import logging
 import httpx
 
 from app.market_data.base import AbstractTickerSearchProvider
+from app.market_data.hedging import Hedger
+from app.market_data.yahoo_finance_provider import DEFAULT_HOSTS
 
 logger = logging.getLogger(__name__)
 
-_SEARCH_URL = "https://query2.finance.yahoo.com/v1/finance/search"
+_SEARCH_PATH = "/v1/finance/search"
 _HEADERS = {"User-Agent": "Mozilla/5.0"}
 
 
 class YahooTickerSearchProvider(AbstractTickerSearchProvider):
-    def search(self, q: str) -> list[dict]:
-        r = httpx.get(
-            _SEARCH_URL,
-            params={"q": q, "lang": "en-US", "region": "US", "quotesCount": 10, "newsCount": 0},
-            headers=_HEADERS,
-            timeout=10,
-        )
+    """Search API results, hedged across ``hedger.hosts`` (see :class:`Hedger`)."""
+
+    result_limit = 10
+
+    def __init__(self, hedger: Hedger | None = None) -> None:
+        self._hedger = hedger or Hedger(DEFAULT_HOSTS, endpoint="search")
+
+    def _params(self, q: str) -> dict:
+        return {
+            "q": q, "lang": "en-US", "region": "US",
+            "quotesCount": self.result_limit, "newsCount": 0,
+        }
+
+    def _get(self, host: str, q: str) -> dict:
+        r = httpx.get(host + _SEARCH_PATH, params=self._params(q), headers=_HEADERS, timeout=10)
         r.raise_for_status()
-        return r.json().get("quotes") or []
+        return r.json()
+
+    async def _aget(self, host: str, q: str) -> dict:
+        async with httpx.AsyncClient(headers=_HEADERS, timeout=10) as client:
+            r = await client.get(host + _SEARCH_PATH, params=self._params(q))
+        r.raise_for_status()
+        return r.json()
+
+    def search(self, q: str) -> list[dict]:
+        return self._hedger.call(lambda host: self._get(host, q)).get("quotes") or []
+
+    async def asearch(self, q: str) -> list[dict]:
+        return (await self._hedger.acall(lambda host: self._aget(host, q))).get("quotes") or []
 
 
 # --- Fallback: yfinance-based implementation (commented out) ---
@@ -6,7 +6,7 @@ import time
 import pandas as pd
 import yfinance as yf
 
-from app.core.exceptions import MarketDataError
+from app.core.exceptions import MarketDataError, SymbolNotFound
 from app.market_data.base import AbstractMarketDataProvider
 
 logger = logging.getLogger(__name__)
@@ -27,9 +27,11 @@ def _fetch_single(ticker: str) -> float:
         Latest closing price as a float.
 
     Raises:
+        SymbolNotFound: If every attempt returned an empty history.
         MarketDataError: If the price cannot be fetched after all retries.
     """
     last_error: str | None = None
+    empty = False
     for attempt in range(1, _FALLBACK_RETRIES + 1):
         try:
             history = yf.Ticker(ticker).history(period="1d")
@@ -39,9 +41,9 @@ def _fetch_single(ticker: str) -> float:
                 "Attempt %d/%d: empty history for '%s'.",
                 attempt, _FALLBACK_RETRIES, ticker,
             )
-            last_error = f"Empty price history for ticker '{ticker}'."
+            last_error, empty = f"Empty price history for ticker '{ticker}'.", True
         except Exception as exc:
-            last_error = str(exc)
+            last_error, empty = str(exc), False
             logger.warning(
                 "Attempt %d/%d failed for '%s': %s",
                 attempt, _FALLBACK_RETRIES, ticker, exc,
@@ -49,7 +51,7 @@ def _fetch_single(ticker: str) -> float:
         if attempt < _FALLBACK_RETRIES:
             time.sleep(_FALLBACK_DELAY)
 
-    raise MarketDataError(
+    raise (SymbolNotFound if empty else MarketDataError)(
         f"Could not fetch price for '{ticker}' after {_FALLBACK_RETRIES} attempts. "
         f"Last error: {last_error}"
     )
@@ -1,13 +1,21 @@
 """Portfolio rebalancing calculation module."""
 
 from .rebalance import (
+    KnapsackProblem,
+    SolverCancelled,
+    SolverStats,
     calculate_rebalance,
     redistribute_change,
     redistribute_change_optimal,
+    solve_knapsack,
 )
 
 __all__ = [
+    "KnapsackProblem",
+    "SolverCancelled",
+    "SolverStats",
     "calculate_rebalance",
     "redistribute_change",
     "redistribute_change_optimal",
+    "solve_knapsack",
 ]
@@ -1,8 +1,62 @@
 """Core functions for portfolio rebalancing calculations."""
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import NamedTuple
+
 # DP safety cap: above this change (in cents) fall back to greedy to avoid O(n*c) blowup.
 MAX_CENTS: int = 1_000_000
 
+# Capacities filled between two should_cancel() checks in the DP.
+_CANCEL_CHECK_INTERVAL = 4096
+
+# Bytes per DP cell: one 8-byte list slot in each of dp_spent, dp_tie and parent.
+_CELL_BYTES = 3 * 8
+
+
+class SolverCancelled(Exception):
+    """Raised by the DP when its ``should_cancel`` callback returns True."""
+
+
+@dataclass
+class SolverStats:
+    """How :func:`redistribute_change_optimal` solved one call.
+
+    Attributes:
+        path: ``"dp"``, ``"greedy_fallback"`` (change above :data:`MAX_CENTS`),
+            ``"no_candidates"`` (no affordable eligible asset) or
+            ``"no_change"`` (nothing to redistribute).
+        candidates: Assets considered by the DP.
+        capacity_cents: Change redistributed, in cents.
+        cells: DP inner-loop evaluations (``candidates * capacity_cents``).
+        table_bytes: Approximate size of the DP tables (pointer slots only).
+    """
+
+    path: str = "no_change"
+    candidates: int = 0
+    capacity_cents: int = 0
+    cells: int = 0
+    table_bytes: int = 0
+
+
+class KnapsackProblem(NamedTuple):
+    """Arguments of :func:`redistribute_change_optimal` as plain lists.
+
+    Cheap to pickle, for solving in another process with :func:`solve_knapsack`.
+    """
+
+    only_buy: bool
+    buy_quantities: list[int]
+    ticker_prices: list[float]
+    current_percentages: list[float]
+    desired_percentages: list[float]
+    change: float
+
+    @property
+    def cost(self) -> int:
+        """Upper bound of the DP cells the problem can take."""
+        return round(self.change * 100) * len(self.buy_quantities)
+
 
 def _redistribute_proportional_to_gap(
     values: list[float],
@@ -203,6 +257,9 @@ def redistribute_change_optimal(
     current_percentages: list[float],
     desired_percentages: list[float],
     change: float,
+    *,
+    stats: SolverStats | None = None,
+    should_cancel: Callable[[], bool] | None = None,
 ) -> tuple[list[int], float]:
     """Exact redistribution of leftover cash via bounded-knapsack dynamic programming.
 
@@ -286,6 +343,13 @@ def redistribute_change_optimal(
         current_percentages: Current portfolio weight of each asset (%).
         desired_percentages: Target portfolio weight of each asset (%).
         change: Leftover cash to redistribute, in portfolio currency units.
+        stats: Optional :class:`SolverStats`, filled in with the path taken
+            and the DP size.
+        should_cancel: Optional callback polled every few thousand DP
+            capacities; when it returns True the solve is abandoned.
+
+    Raises:
+        SolverCancelled: If ``should_cancel`` returned True.
 
     Returns:
         A tuple ``(updated_buy_quantities, remaining_change)``.  The remaining
@@ -297,6 +361,8 @@ def redistribute_change_optimal(
         :func:`redistribute_change`: the original O(n log n) greedy heuristic.
     """
     n = len(buy_quantities)
+    if stats is None:
+        stats = SolverStats()
 
     # Fast exits: nothing to distribute, or no assets at all.
     if n == 0 or change <= 0:
@@ -327,12 +393,16 @@ def redistribute_change_optimal(
         if 0 < (p := round(ticker_prices[i] * 100)) <= change_cents
     }
     candidates = list(prices_cents.keys())
+    stats.candidates = len(candidates)
+    stats.capacity_cents = change_cents
     if not candidates:
+        stats.path = "no_candidates"
         return list(buy_quantities), change
 
     # Safety cap: very large leftovers silently fall back to the cheap
     # greedy pass to avoid O(n * change_cents) memory/time blowups.
     if change_cents > MAX_CENTS:
+        stats.path = "greedy_fallback"
         return redistribute_change(
             buy_quantities, ticker_prices,
             current_percentages, desired_percentages, change,
@@ -345,11 +415,17 @@ def redistribute_change_optimal(
 
     # --- Dynamic programming: lexicographic max over (spent, tiebreaker) ----
     size     = change_cents + 1
+    stats.path = "dp"
+    stats.cells = len(candidates) * change_cents
+    stats.table_bytes = _CELL_BYTES * size
     dp_spent = [0] * size
     dp_tie   = [0.0] * size
     parent   = [-1] * size  # -1 = "carried forward from capacity k-1".
 
     for k in range(1, size):
+        if should_cancel is not None and k % _CANCEL_CHECK_INTERVAL == 0 and should_cancel():
+            raise SolverCancelled(f"DP cancelled at capacity {k} of {change_cents}")
+
         best_spent = dp_spent[k - 1]
         best_tie   = dp_tie[k - 1]
         best_item  = -1
@@ -395,3 +471,15 @@ def redistribute_change_optimal(
     remaining = (change_cents - spent_cents) / 100.0
 
     return updated, remaining
+
+
+def solve_knapsack(
+    problem: KnapsackProblem,
+    should_cancel: Callable[[], bool] | None = None,
+) -> tuple[list[int], float, SolverStats]:
+    """Solve ``problem`` with :func:`redistribute_change_optimal`; also return its stats."""
+    stats = SolverStats()
+    updated, remaining = redistribute_change_optimal(
+        *problem, stats=stats, should_cancel=should_cancel,
+    )
+    return updated, remaining, stats
@@ -24,10 +24,40 @@ class AssetResultOut(BaseModel):
         return truncate2(v)
 
 
+class ProfileOut(BaseModel):
+    """Profile of one request, returned when profiling was requested."""
+
+    id: str
+    seconds: float
+    prices: dict[str, float]
+    stats: str
+
+
+class DiagnosticsOut(BaseModel):
+    """How the leftover cash was redistributed, returned on request.
+
+    ``path`` is ``greedy`` for ``optimal_redistribute=false``; otherwise
+    ``dp``, ``greedy_fallback`` (change above the DP cap), ``no_candidates``
+    or ``no_change``. DP fields are 0 when the DP did not run.
+    """
+
+    solver: str
+    path: str
+    candidates: int
+    capacity_cents: int
+    cells: int
+    table_bytes: int
+    solve_ms: float
+    price_cache_hits: int
+    price_cache_misses: int
+
+
 class RebalanceResponse(BaseModel):
     results: list[AssetResultOut]
     total_fees: float
     change: float
+    profile: ProfileOut | None = None
+    diagnostics: DiagnosticsOut | None = None
 
     @field_serializer("total_fees", "change")
     def _fmt_totals(self, v: float) -> float:
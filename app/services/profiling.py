@@ -0,0 +1,112 @@
+"""Profile one rebalance request and capture what is needed to replay it.
+
+A capture holds the request, the prices it was solved with and the
+response, so a slow request can be rerun offline against the same inputs
+(see ``benchmarks/replay.py``) without touching a price provider.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from app.core.concurrency import CancelToken
+from app.core.exceptions import Overloaded
+from app.market_data.base import AbstractMarketDataProvider
+from app.schemas.request import RebalanceRequest
+from app.schemas.result import ProfileOut, RebalanceResponse
+from app.services.rebalance_service import run_rebalance
+
+logger = logging.getLogger(__name__)
+
+# Functions listed in the returned profile summary.
+TOP_FUNCTIONS = 30
+
+# One profile at a time: from Python 3.12 cProfile hooks sys.monitoring, which
+# takes one profiler per process, and concurrent runs would skew each other anyway.
+_profiling = threading.Lock()
+
+
+class RecordingProvider(AbstractMarketDataProvider):
+    """Pass-through provider that remembers every price it returned."""
+
+    def __init__(self, provider: AbstractMarketDataProvider) -> None:
+        self._provider = provider
+        self.prices: dict[str, float] = {}
+
+    def get_prices(self, tickers: list[str]) -> dict[str, float]:
+        prices = self._provider.get_prices(tickers)
+        self.prices.update(prices)
+        return prices
+
+
+def profile_rebalance(
+    request: RebalanceRequest,
+    market_provider: AbstractMarketDataProvider,
+    profile_dir: Path | None = None,
+    diagnostics: bool = False,
+    cancel: CancelToken | None = None,
+) -> RebalanceResponse:
+    """Run :func:`run_rebalance` under :mod:`cProfile`.
+
+    The response carries a :class:`ProfileOut` with the resolved prices and
+    the most expensive functions by cumulative time. With ``profile_dir``
+    the capture is also written there as ``<id>.json`` and the raw profile
+    as ``<id>.prof`` (readable with :mod:`pstats` or snakeviz).
+
+    Raises:
+        Overloaded: 429 when another request is being profiled.
+    """
+    if not _profiling.acquire(blocking=False):
+        raise Overloaded(429, "Another request is being profiled.", retry_after=1)
+    try:
+        recorder = RecordingProvider(market_provider)
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = run_rebalance(request, recorder, diagnostics, cancel)
+        finally:
+            profiler.disable()
+        seconds = time.perf_counter() - start
+    finally:
+        _profiling.release()
+
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    profile = ProfileOut(
+        id=uuid.uuid4().hex,
+        seconds=seconds,
+        prices=recorder.prices,
+        stats=summary.getvalue(),
+    )
+    if profile_dir is not None:
+        try:
+            write_capture(profile_dir, profile.id, request, recorder.prices, response)
+            profiler.dump_stats(profile_dir / f"{profile.id}.prof")
+        except OSError as exc:
+            logger.warning("Could not store profile %s: %s", profile.id, exc)
+    logger.info("Profiled rebalance %s in %.1f ms", profile.id, seconds * 1000)
+    return response.model_copy(update={"profile": profile})
+
+
+def write_capture(
+    directory: Path,
+    capture_id: str,
+    request: RebalanceRequest,
+    prices: dict[str, float],
+    response: RebalanceResponse,
+) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{capture_id}.json"
+    path.write_text(json.dumps({
+        "request": request.model_dump(),
+        "prices": prices,
+        "response": response.model_dump(exclude_none=True),
+    }, indent=2) + "\n")
+    return path
@@ -1,11 +1,37 @@
 """Orchestration of the DCA rebalancing flow."""
 
+import hashlib
+import json
+import time
+
 from app import rebalance
+from app.core import executors, metrics, tracing
+from app.core.concurrency import CancelToken
 from app.core.exceptions import MarketDataError
 from app.core.formatting import truncate2
 from app.market_data.base import AbstractMarketDataProvider
+from app.rebalance.rebalance import MAX_CENTS
 from app.schemas.request import RebalanceRequest
-from app.schemas.result import RebalanceResponse
+from app.schemas.result import DiagnosticsOut, RebalanceResponse
+
+# Part of every result_key, hence of ETags: bump it with any change that can
+# alter the response to an unchanged request and prices, so that clients
+# and caches holding responses of the previous release revalidate.
+SOLVER_VERSION = 1
+
+_SOLVER_SECONDS = metrics.histogram(
+    "rebalance_solver_duration_seconds",
+    "Leftover-cash redistribution time by solver mode.",
+    ["mode"], buckets=metrics.FAST_BUCKETS,
+)
+_DP_CELLS = metrics.histogram(
+    "rebalance_dp_cells", "Knapsack DP cells evaluated per request.",
+    buckets=(1e2, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8),
+)
+_DP_TABLE_BYTES = metrics.histogram(
+    "rebalance_dp_table_bytes", "Approximate knapsack DP table size per request.",
+    buckets=(1e3, 1e4, 1e5, 1e6, 1e7, 1e8),
+)
 
 
 def _effective_fee(fee: float, percentage_fee: bool, rebalance_amount: float) -> float:
@@ -15,24 +41,67 @@ def _effective_fee(fee: float, percentage_fee: bool, rebalance_amount: float) ->
     return fee
 
 
+def estimate_cost(request: RebalanceRequest, cached: dict[str, float]) -> tuple[int, int]:
+    """Estimate ``(knapsack DP cells, uncached tickers)`` before running ``request``.
+
+    The leftover the DP redistributes is below one share of each asset, so
+    with every price cached the cells are bounded by their sum; otherwise by
+    the increment. Both are capped at :data:`MAX_CENTS`.
+    """
+    tickers = [a.ticker for a in request.assets]
+    cold = sum(t not in cached for t in tickers)
+    if not request.optimal_redistribute:
+        return 0, cold
+    bound = request.increment if cold else min(request.increment, sum(cached.values()))
+    return len(tickers) * min(round(bound * 100), MAX_CENTS), cold
+
+
 def run_rebalance(
     request: RebalanceRequest,
     market_provider: AbstractMarketDataProvider,
+    diagnostics: bool = False,
+    cancel: CancelToken | None = None,
 ) -> RebalanceResponse:
     """Compute optimal buy quantities for each asset in a portfolio.
 
     Args:
         request: A fully validated RebalanceRequest instance.
         market_provider: Provider used to fetch current market prices.
+        diagnostics: Attach a DiagnosticsOut describing the solver run.
+            Price cache counts are read from the current trace (see
+            :func:`app.core.tracing.collect`) and are 0 without one.
+        cancel: Token polled by the knapsack DP; see :class:`CancelToken`.
 
     Returns:
         A RebalanceResponse with per-asset results, total fees, and leftover change.
+
+    Raises:
+        MarketDataError: If a price is missing or not positive.
+        SolverCancelled: If ``cancel`` was cancelled or timed out before
+            the solve finished.
+    """
+    prices = resolve_prices(request, market_provider)
+    return solve(request, prices, diagnostics, cancel)
+
+
+def resolve_prices(
+    request: RebalanceRequest, market_provider: AbstractMarketDataProvider,
+) -> list[float]:
+    """Fetch and validate the price of each asset, rounded to cents, in request order.
+
+    Raises:
+        MarketDataError: If a price is missing or not positive.
     """
     tickers = [a.ticker for a in request.assets]
-    desired_pcts = [a.desired_percentage for a in request.assets]
-    shares = [a.shares for a in request.assets]
+    return validate_prices(tickers, market_provider.get_prices(tickers))
+
 
-    prices = market_provider.get_prices(tickers)
+def validate_prices(tickers: list[str], prices: dict[str, float]) -> list[float]:
+    """The price of each of ``tickers`` in ``prices``, rounded to cents.
+
+    Raises:
+        MarketDataError: If a price is missing or not positive.
+    """
     try:
         ticker_prices = [round(prices[t], 2) for t in tickers]
     except KeyError as exc:
@@ -43,7 +112,51 @@ def run_rebalance(
             raise MarketDataError(
                 f"Invalid price for '{ticker}': {price}. Prices must be positive."
             )
+    return ticker_prices
+
+
+def result_key(request: RebalanceRequest, prices: list[float]) -> str:
+    """Digest identifying the response to ``request`` at ``prices``.
 
+    The response depends on nothing else but :data:`SOLVER_VERSION`, so
+    equal keys can share one result.
+    """
+    canonical = json.dumps(
+        [SOLVER_VERSION, request.model_dump(mode="json"), prices],
+        sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def solve(
+    request: RebalanceRequest,
+    ticker_prices: list[float],
+    diagnostics: bool = False,
+    cancel: CancelToken | None = None,
+) -> RebalanceResponse:
+    """Compute the response to ``request`` at prices from :func:`resolve_prices`.
+
+    Takes the same ``diagnostics`` and ``cancel`` as :func:`run_rebalance`.
+    """
+    tickers = [a.ticker for a in request.assets]
+    desired_pcts = [a.desired_percentage for a in request.assets]
+    shares = [a.shares for a in request.assets]
+
+    if cancel is not None and cancel.is_cancelled():
+        raise rebalance.SolverCancelled("cancelled before solving")
+    with tracing.stage("solve"):
+        return _solve(request, tickers, desired_pcts, shares, ticker_prices, diagnostics, cancel)
+
+
+def _solve(
+    request: RebalanceRequest,
+    tickers: list[str],
+    desired_pcts: list[float],
+    shares: list[float],
+    ticker_prices: list[float],
+    diagnostics: bool = False,
+    cancel: CancelToken | None = None,
+) -> RebalanceResponse:
     values = [s * p for s, p in zip(shares, ticker_prices)]
     total_value = sum(values)
     current_pcts = [v * 100.0 / total_value if total_value else 0.0 for v in values]
@@ -67,16 +180,29 @@ def run_rebalance(
     total_fees = sum(ef for ef, b in zip(effective_fees, buy_quantities) if b > 0)
     change = truncate2(request.increment - spent - total_fees)
 
+    start = time.perf_counter()
+    stats = rebalance.SolverStats(path="greedy")
     if request.optimal_redistribute:
-        buy_quantities, change = rebalance.redistribute_change_optimal(
+        problem = rebalance.KnapsackProblem(
             request.only_buy,
             buy_quantities, ticker_prices,
             current_pcts, desired_pcts, change,
         )
+        # Large DPs go to the solver process pool when one is configured.
+        buy_quantities, change, stats = executors.run_cpu(
+            rebalance.solve_knapsack, problem, cancel and cancel.is_cancelled, cost=problem.cost,
+        )
+        mode = "knapsack_fallback" if stats.path == "greedy_fallback" else "knapsack"
+        if stats.path == "dp":
+            _DP_CELLS.observe(stats.cells)
+            _DP_TABLE_BYTES.observe(stats.table_bytes)
     else:
         buy_quantities, change = rebalance.redistribute_change(
             buy_quantities, ticker_prices, current_pcts, desired_pcts, change
         )
+        mode = "greedy"
+    solve_seconds = time.perf_counter() - start
+    _SOLVER_SECONDS.observe(solve_seconds, mode=mode)
 
     results = [
         {
@@ -96,4 +222,19 @@ def run_rebalance(
         )
     ]
 
-    return RebalanceResponse(results=results, total_fees=total_fees, change=change)
+    response = RebalanceResponse(results=results, total_fees=total_fees, change=change)
+    if diagnostics:
+        trace = tracing.current()
+        counters = trace.counters if trace is not None else {}
+        response.diagnostics = DiagnosticsOut(
+            solver="knapsack" if request.optimal_redistribute else "greedy",
+            path=stats.path,
+            candidates=stats.candidates,
+            capacity_cents=stats.capacity_cents,
+            cells=stats.cells,
+            table_bytes=stats.table_bytes,
+            solve_ms=solve_seconds * 1000,
+            price_cache_hits=counters.get("price_cache_hits", 0),
+            price_cache_misses=counters.get("price_cache_misses", 0),
+        )
+    return response
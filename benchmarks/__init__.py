@@ -0,0 +1 @@
+"""Load tests and benchmarks. Run modules with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,265 @@
+"""End-to-end load test of the API against a mock Yahoo Finance.
+
+For each scenario the harness starts :mod:`benchmarks.mock_yahoo` and the
+app (``uvicorn app.main:app``) as subprocesses on free local ports, sends a
+warm-up round, then drives the app with ``--concurrency`` clients until
+``--requests`` requests have completed. Traffic is a realistic portfolio
+mix for ``POST /v1/rebalance`` plus, in some scenarios, ticker searches.
+
+Reported per scenario: throughput, latency percentiles, error count,
+upstream chart calls per rebalance request and the price cache hit rate,
+computed as ``1 - chart calls / tickers priced`` (upstream retries count
+as misses, so it is a lower bound)::
+
+    python -m benchmarks.load                       # every scenario
+    python -m benchmarks.load baseline slow-tail --requests 5000 --json out.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import httpx
+
+from benchmarks.portfolios import UNIVERSE, random_portfolio
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class Scenario:
+    description: str
+    faults: dict[str, float] = field(default_factory=dict)
+    env: dict[str, str] = field(default_factory=dict)
+    optimal_ratio: float = 0.2
+    search_ratio: float = 0.0
+    # Each upstream host is listed this many times in YAHOO_HOSTS. Listing
+    # the mock twice lets hedged requests go to an "alternate" host.
+    hosts: int = 1
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "baseline": Scenario("Warm price cache, fast upstream."),
+    "cold-cache": Scenario(
+        "Every price fetched upstream (cache TTL 0).",
+        env={"CACHE_TTL_SECONDS": "0", "MARKET_HOURS_TTL": "false"},
+    ),
+    "slow-tail": Scenario(
+        "Cold cache, 5% of upstream calls take 800 ms; hedged across two hosts.",
+        faults={"tail_ratio": 0.05, "tail_ms": 800},
+        env={"CACHE_TTL_SECONDS": "0", "MARKET_HOURS_TTL": "false"},
+        hosts=2,
+    ),
+    "flaky-upstream": Scenario(
+        "Cold cache, 2% of upstream calls fail (provider retries after 1 s).",
+        faults={"error_rate": 0.02},
+        env={"CACHE_TTL_SECONDS": "0", "MARKET_HOURS_TTL": "false"},
+    ),
+    "knapsack": Scenario(
+        "Warm cache, every request uses the knapsack solver.", optimal_ratio=1.0,
+    ),
+    "mixed-search": Scenario(
+        "Warm cache, one request in three is a ticker search.", search_ratio=1 / 3,
+    ),
+}
+
+
+@dataclass
+class Result:
+    scenario: str
+    requests: int
+    errors: int
+    seconds: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    upstream_calls_per_request: float
+    cache_hit_rate: float
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def _process(args: list[str], env: dict[str, str] | None = None) -> Iterator[subprocess.Popen]:
+    proc = subprocess.Popen(args, cwd=ROOT, env={**os.environ, **(env or {})})
+    try:
+        yield proc
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not become ready within {timeout:.0f} s")
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def _drive(
+    base_url: str,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    rng: random.Random,
+) -> tuple[list[float], int, int, int]:
+    """Send ``requests`` requests; return latencies, errors, rebalances, tickers priced."""
+    latencies: list[float] = []
+    errors = rebalances = tickers = 0
+    remaining = requests
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal remaining, errors, rebalances, tickers
+        while remaining > 0:
+            remaining -= 1
+            if rng.random() < scenario.search_ratio:
+                symbol = rng.choice(UNIVERSE)
+                send = client.get("/v1/tickers/search", params={"q": symbol[:rng.randint(2, 4)]})
+            else:
+                payload = random_portfolio(rng, optimal_ratio=scenario.optimal_ratio)
+                rebalances += 1
+                tickers += len(payload["assets"])
+                send = client.post("/v1/rebalance", json=payload)
+            start = time.perf_counter()
+            try:
+                response = await send
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return latencies, errors, rebalances, tickers
+
+
+def run_scenario(
+    name: str,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    workers: int,
+    seed: int,
+) -> Result:
+    mock_port, app_port = _free_port(), _free_port()
+    mock_url, app_url = f"http://127.0.0.1:{mock_port}", f"http://127.0.0.1:{app_port}"
+    mock_args = [sys.executable, "-m", "benchmarks.mock_yahoo", "--port", str(mock_port),
+                 "--seed", str(seed)]
+    for key, value in scenario.faults.items():
+        mock_args += [f"--{key.replace('_', '-')}", str(value)]
+    app_env = {
+        "PRICE_PROVIDERS": "yahoo",
+        "YAHOO_HOSTS": ",".join([mock_url] * scenario.hosts),
+        "CACHE_BACKEND": "local",
+        "LOG_LEVEL": "WARNING",
+        **scenario.env,
+    }
+    app_args = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(app_port),
+                "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+
+    with _process(mock_args), _process(app_args, app_env):
+        _wait_ready(f"{mock_url}/__stats")
+        _wait_ready(f"{app_url}/v1/health")
+        rng = random.Random(seed)
+        warmup = max(concurrency, requests // 10)
+        asyncio.run(_drive(app_url, scenario, warmup, concurrency, rng))
+        httpx.post(f"{mock_url}/__reset")
+
+        start = time.perf_counter()
+        latencies, errors, rebalances, tickers = asyncio.run(
+            _drive(app_url, scenario, requests, concurrency, rng)
+        )
+        seconds = time.perf_counter() - start
+        chart_calls = httpx.get(f"{mock_url}/__stats").json().get("chart", 0)
+
+    latencies.sort()
+    return Result(
+        scenario=name,
+        requests=requests,
+        errors=errors,
+        seconds=round(seconds, 3),
+        rps=round(requests / seconds, 1),
+        p50_ms=round(_percentile(latencies, 0.50) * 1000, 2),
+        p95_ms=round(_percentile(latencies, 0.95) * 1000, 2),
+        p99_ms=round(_percentile(latencies, 0.99) * 1000, 2),
+        max_ms=round(latencies[-1] * 1000, 2),
+        upstream_calls_per_request=round(chart_calls / rebalances, 3) if rebalances else 0.0,
+        cache_hit_rate=round(max(0.0, 1 - chart_calls / tickers), 3) if tickers else 0.0,
+    )
+
+
+def _print_table(results: list[Result]) -> None:
+    header = (f"{'scenario':<16}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+              f"{'errors':>8}{'up/req':>8}{'hit':>7}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r.scenario:<16}{r.rps:>9.1f}{r.p50_ms:>9.1f}{r.p95_ms:>9.1f}{r.p99_ms:>9.1f}"
+              f"{r.errors:>8}{r.upstream_calls_per_request:>8.2f}{r.cache_hit_rate:>7.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", help="Scenarios to run (default: all).")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", type=Path, help="Also write results to this JSON file.")
+    parser.add_argument("--list", action="store_true", help="List scenarios and exit.")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            print(f"{name:<16}{scenario.description}")
+        return
+
+    unknown = sorted(set(args.scenarios) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios {unknown}; use --list")
+
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        print(f"running {name}: {SCENARIOS[name].description}", file=sys.stderr)
+        results.append(run_scenario(
+            name, SCENARIOS[name], args.requests, args.concurrency, args.workers, args.seed,
+        ))
+    _print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps([asdict(r) for r in results], indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Local stand-in for the Yahoo Finance chart, search and streamer endpoints.
+
+Serves deterministic prices (see :func:`benchmarks.portfolios.price_for`)
+and search results from the bundled symbol list, with injected latency and
+errors, so the app can be load tested without touching Yahoo::
+
+    python -m benchmarks.mock_yahoo --port 8900 --latency-ms 40 --error-rate 0.01
+
+Point the app at it with ``YAHOO_HOSTS=http://127.0.0.1:8900``, and the
+price stream with ``PRICE_STREAM_URL=ws://127.0.0.1:8900/``: the WebSocket
+at ``/`` speaks the version 2 streamer protocol and sends every subscribed
+ticker a price every ``--stream-interval-ms``, randomly walking around its
+chart price.
+``GET /__stats`` returns request counts per endpoint and
+``POST /__reset`` clears them.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+
+from app.market_data.streaming import encode_pricing
+from app.market_data.symbol_index import BUNDLED_SYMBOLS, SymbolIndex
+from benchmarks.portfolios import price_for
+
+
+@dataclass
+class Faults:
+    """Latency and error injection applied to every upstream endpoint.
+
+    Attributes:
+        latency_ms: Base response delay.
+        jitter_ms: Uniform random delay added on top of the base.
+        tail_ratio: Fraction of responses delayed by ``tail_ms`` instead,
+            modelling a slow host (what request hedging targets).
+        tail_ms: Delay of a tail response.
+        error_rate: Fraction of responses answered with HTTP 500.
+    """
+
+    latency_ms: float = 20.0
+    jitter_ms: float = 10.0
+    tail_ratio: float = 0.0
+    tail_ms: float = 1000.0
+    error_rate: float = 0.0
+
+
+def create_app(
+    faults: Faults, seed: int | None = None, stream_interval_ms: float = 1000.0,
+) -> FastAPI:
+    app = FastAPI(title="Mock Yahoo Finance")
+    rng = random.Random(seed)
+    index = SymbolIndex.from_csv(BUNDLED_SYMBOLS)
+    stats: Counter[str] = Counter()
+
+    async def _inject(endpoint: str) -> Response | None:
+        stats[endpoint] += 1
+        if rng.random() < faults.tail_ratio:
+            delay = faults.tail_ms
+        else:
+            delay = faults.latency_ms + rng.uniform(0, faults.jitter_ms)
+        await asyncio.sleep(delay / 1000)
+        if rng.random() < faults.error_rate:
+            stats[f"{endpoint}_errors"] += 1
+            return JSONResponse(status_code=500, content={"error": "injected"})
+        return None
+
+    @app.get("/v8/finance/chart/{ticker}")
+    async def chart(ticker: str) -> Response:
+        if (error := await _inject("chart")) is not None:
+            return error
+        now = int(time.time())
+        return JSONResponse(content={"chart": {"result": [{
+            "meta": {
+                "symbol": ticker,
+                "instrumentType": "EQUITY",
+                "exchangeTimezoneName": "UTC",
+                # An open session, so prices get the normal cache TTL.
+                "currentTradingPeriod": {"regular": {"start": now - 3600, "end": now + 3600}},
+            },
+            "indicators": {"quote": [{"close": [price_for(ticker)]}]},
+        }]}})
+
+    @app.get("/v1/finance/search")
+    async def search(q: str, quotesCount: int = 10) -> Response:  # noqa: N803 (Yahoo's name)
+        if (error := await _inject("search")) is not None:
+            return error
+        return JSONResponse(content={"quotes": index.search(q, quotesCount), "news": []})
+
+    @app.websocket("/")
+    async def streamer(websocket: WebSocket) -> None:
+        await websocket.accept()
+        subscribed: dict[str, float] = {}
+
+        async def tick() -> None:
+            while True:
+                await asyncio.sleep(stream_interval_ms / 1000)
+                for ticker, price in list(subscribed.items()):
+                    price = subscribed[ticker] = round(price * rng.uniform(0.999, 1.001), 2)
+                    stats["stream"] += 1
+                    await websocket.send_text(json.dumps({
+                        "type": "pricing",
+                        "message": base64.b64encode(encode_pricing(ticker, price)).decode(),
+                    }))
+
+        ticks = asyncio.create_task(tick())
+        try:
+            while True:
+                message = await websocket.receive_json()
+                for ticker in message.get("subscribe", []):
+                    subscribed.setdefault(ticker, price_for(ticker))
+                for ticker in message.get("unsubscribe", []):
+                    subscribed.pop(ticker, None)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            ticks.cancel()
+
+    @app.get("/__stats")
+    async def get_stats() -> dict[str, int]:
+        return dict(stats)
+
+    @app.post("/__reset")
+    async def reset() -> dict[str, int]:
+        stats.clear()
+        return {}
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--stream-interval-ms", type=float, default=1000.0,
+                        help="Interval between streamed prices of a subscribed ticker.")
+    for name, default in vars(Faults()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=default)
+    args = parser.parse_args()
+    faults = Faults(**{name: getattr(args, name) for name in vars(Faults())})
+    uvicorn.run(create_app(faults, args.seed, args.stream_interval_ms),
+                host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
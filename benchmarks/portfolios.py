@@ -0,0 +1,75 @@
+"""Synthetic portfolios shared by the load test and the benchmarks."""
+
+import csv
+import random
+import zlib
+
+from app.market_data.base import AbstractMarketDataProvider
+from app.market_data.symbol_index import BUNDLED_SYMBOLS
+
+with open(BUNDLED_SYMBOLS, newline="", encoding="utf-8") as _f:
+    UNIVERSE: list[str] = [
+        row["symbol"] for row in csv.DictReader(_f) if row["type"] in ("EQUITY", "ETF")
+    ]
+
+# Assets per portfolio and how often each size occurs: most DCA portfolios
+# hold a handful of ETFs, a few hold a dozen or more positions.
+_SIZES = [1, 2, 3, 4, 5, 6, 8, 10, 12, 15]
+_SIZE_WEIGHTS = [3, 20, 25, 18, 12, 8, 6, 4, 2, 2]
+
+
+def price_for(symbol: str) -> float:
+    """Deterministic pseudo price in [5, 800) for ``symbol``."""
+    h = zlib.crc32(symbol.encode())
+    return round(5 + (h % 79_500) / 100, 2)
+
+
+def weights(rng: random.Random, n: int) -> list[float]:
+    """``n`` positive target percentages with two decimals summing to 100."""
+    cuts = sorted(rng.sample(range(1, 10_000), n - 1)) if n > 1 else []
+    bounds = [0, *cuts, 10_000]
+    return [(b - a) / 100 for a, b in zip(bounds, bounds[1:])]
+
+
+def random_portfolio(
+    rng: random.Random,
+    n_assets: int | None = None,
+    universe: list[str] = UNIVERSE,
+    optimal_ratio: float = 0.2,
+) -> dict:
+    """Return a ``POST /v1/rebalance`` payload.
+
+    Args:
+        rng: Source of randomness; a seeded instance gives a reproducible mix.
+        n_assets: Number of holdings, drawn from a realistic mix when ``None``.
+        universe: Tickers to draw holdings from.
+        optimal_ratio: Probability that the request asks for the knapsack solver.
+    """
+    n = n_assets or rng.choices(_SIZES, _SIZE_WEIGHTS)[0]
+    tickers = rng.sample(universe, min(n, len(universe)))
+    percentage_fee = rng.random() < 0.3
+    return {
+        "only_buy": rng.random() < 0.8,
+        "increment": float(rng.choice([100, 200, 250, 500, 1000, 2000, 5000])),
+        "optimal_redistribute": rng.random() < optimal_ratio,
+        "assets": [
+            {
+                "ticker": t,
+                "desired_percentage": w,
+                "shares": float(rng.randint(0, 200)),
+                "fees": round(rng.uniform(0, 0.5), 2) if percentage_fee else rng.choice([0, 1, 2.5]),
+                "percentage_fee": percentage_fee,
+            }
+            for t, w in zip(tickers, weights(rng, len(tickers)))
+        ],
+    }
+
+
+class StaticPrices(AbstractMarketDataProvider):
+    """Provider serving fixed ``prices`` from memory, for offline runs."""
+
+    def __init__(self, prices: dict[str, float]) -> None:
+        self.prices = prices
+
+    def get_prices(self, tickers: list[str]) -> dict[str, float]:
+        return {t: self.prices[t] for t in tickers}
@@ -0,0 +1,213 @@
+"""Micro-benchmarks for the rebalance core in ``app/rebalance/rebalance.py``.
+
+Times ``calculate_rebalance``, ``redistribute_change`` and
+``redistribute_change_optimal`` on synthetic inputs across asset counts,
+leftover sizes and price distributions, and records peak memory of one
+call with :mod:`tracemalloc`. Results are written as JSON so two versions
+can be compared::
+
+    python -m benchmarks.rebalance_core --json before.json
+    # ... change the solver ...
+    python -m benchmarks.rebalance_core --json after.json --compare before.json
+
+``--compare`` prints the ratio of the minimum time and of peak memory for
+every case present in both files and exits with status 1 when a case is
+slower than ``--tolerance`` allows.
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.rebalance import rebalance
+from benchmarks.portfolios import weights
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Price per share samplers, in portfolio currency.
+PRICE_DISTRIBUTIONS: dict[str, Callable[[random.Random], float]] = {
+    # Typical ETF and large-cap prices.
+    "lognormal": lambda rng: min(5000.0, max(1.0, rng.lognormvariate(4.2, 1.0))),
+    "uniform": lambda rng: rng.uniform(5, 500),
+    # Cheap shares: many candidates fit the leftover, the DP does the most work.
+    "penny": lambda rng: rng.uniform(0.5, 10),
+}
+
+FUNCTIONS = ("calculate_rebalance", "redistribute_change", "redistribute_change_optimal")
+
+
+@dataclass(frozen=True)
+class Case:
+    function: str
+    assets: int
+    leftover: float
+    distribution: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.function}/n={self.assets}/leftover={self.leftover:g}/{self.distribution}"
+
+
+@dataclass
+class Measurement:
+    function: str
+    assets: int
+    leftover: float
+    distribution: str
+    runs: int
+    min_s: float
+    mean_s: float
+    peak_bytes: int
+
+
+def make_inputs(rng: random.Random, n: int, leftover: float, distribution: str) -> dict:
+    """Synthetic solver inputs: about half the assets underweight, all scheduled."""
+    desired = weights(rng, n)
+    current = [max(0.0, d + rng.uniform(-d / 2, d / 2)) for d in desired]
+    total = sum(current) or 1.0
+    current = [c * 100 / total for c in current]
+    prices = [round(PRICE_DISTRIBUTIONS[distribution](rng), 2) for _ in range(n)]
+    values = [c * 100 for c in current]
+    return {
+        "values": values,
+        "desired": desired,
+        "current": current,
+        "prices": prices,
+        "quantities": [rng.randint(1, 20) for _ in range(n)],
+        "increment": leftover * 10,
+        "change": leftover,
+    }
+
+
+def _call(function: str, inputs: dict) -> Callable[[], object]:
+    if function == "calculate_rebalance":
+        return lambda: rebalance.calculate_rebalance(
+            True, inputs["increment"], inputs["values"], inputs["desired"],
+        )
+    if function == "redistribute_change":
+        return lambda: rebalance.redistribute_change(
+            inputs["quantities"], inputs["prices"], inputs["current"], inputs["desired"],
+            inputs["change"],
+        )
+    return lambda: rebalance.redistribute_change_optimal(
+        False, inputs["quantities"], inputs["prices"], inputs["current"], inputs["desired"],
+        inputs["change"],
+    )
+
+
+def measure(case: Case, seed: int, min_time: float, max_runs: int) -> Measurement:
+    """Time ``case`` until ``min_time`` seconds or ``max_runs`` runs, at least 3."""
+    fn = _call(case.function, make_inputs(random.Random(seed), case.assets, case.leftover,
+                                          case.distribution))
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    spent = 0.0
+    while len(times) < 3 or (spent < min_time and len(times) < max_runs):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        spent += elapsed
+    return Measurement(
+        **asdict(case),
+        runs=len(times),
+        min_s=min(times),
+        mean_s=spent / len(times),
+        peak_bytes=peak,
+    )
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _key(result: dict) -> str:
+    return Case(result["function"], result["assets"], result["leftover"],
+                result["distribution"]).key
+
+
+def compare(current: list[dict], baseline_path: Path, tolerance: float) -> bool:
+    """Print time/memory ratios against ``baseline_path``; False on a regression."""
+    baseline = {_key(r): r for r in json.loads(baseline_path.read_text())["results"]}
+    ok = True
+    print(f"\n{'case':<62}{'time':>8}{'memory':>8}")
+    for r in current:
+        key = _key(r)
+        if key not in baseline:
+            continue
+        old = baseline[key]
+        time_ratio = r["min_s"] / old["min_s"] if old["min_s"] else float("inf")
+        mem_ratio = r["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else 1.0
+        flag = "  REGRESSION" if time_ratio > 1 + tolerance else ""
+        ok &= not flag
+        print(f"{key:<62}{time_ratio:>7.2f}x{mem_ratio:>7.2f}x{flag}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, nargs="+", default=[2, 5, 10, 20, 50])
+    parser.add_argument("--leftovers", type=float, nargs="+", default=[10, 100, 1000],
+                        help="Leftover cash to redistribute, in currency units.")
+    parser.add_argument("--distributions", nargs="+", default=list(PRICE_DISTRIBUTIONS),
+                        choices=list(PRICE_DISTRIBUTIONS))
+    parser.add_argument("--functions", nargs="+", default=list(FUNCTIONS), choices=FUNCTIONS)
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Keep repeating a case until this many seconds were spent.")
+    parser.add_argument("--max-runs", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", type=Path, help="Write results to this JSON file.")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown before a case counts as a regression.")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'case':<62}{'min ms':>10}{'mean ms':>10}{'peak KiB':>10}")
+    for function in args.functions:
+        for distribution in args.distributions:
+            for n in args.assets:
+                for leftover in args.leftovers:
+                    case = Case(function, n, leftover, distribution)
+                    m = measure(case, args.seed, args.min_time, args.max_runs)
+                    results.append(asdict(m))
+                    print(f"{case.key:<62}{m.min_s * 1e3:>10.3f}{m.mean_s * 1e3:>10.3f}"
+                          f"{m.peak_bytes / 1024:>10.1f}")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "meta": {
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "revision": _git_revision(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "max_cents": rebalance.MAX_CENTS,
+                "seed": args.seed,
+            },
+            "results": results,
+        }, indent=2) + "\n")
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
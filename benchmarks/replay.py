@@ -0,0 +1,88 @@
+"""Replay captured ``/v1/rebalance?profile=true`` requests offline.
+
+A capture (``<id>.json`` in ``PROFILE_DIR``) holds the request, the prices
+it was solved with and the response. Each capture is rerun through
+``run_rebalance`` against those prices, so no price provider or network is
+involved, and checked against the recorded response::
+
+    python -m benchmarks.replay /data/profiles/3f2a....json
+    python -m benchmarks.replay /data/profiles/*.json --repeat 50 --profile
+
+``--profile`` prints a :mod:`cProfile` summary of the replayed runs. Exits
+with status 1 when a replay no longer matches its recorded response;
+``profile`` and ``diagnostics`` (timings, cache counters) describe the
+recorded run only and are left out of the comparison.
+Captures are also valid ``--corpus`` entries for ``benchmarks.solver_quality``
+once collected into a JSON list.
+"""
+
+import argparse
+import cProfile
+import json
+import pstats
+import sys
+import time
+from pathlib import Path
+
+from app.schemas.request import RebalanceRequest
+from app.services.rebalance_service import run_rebalance
+from benchmarks.portfolios import StaticPrices
+
+# Response fields describing one run rather than the result.
+_RUN_FIELDS = ("profile", "diagnostics")
+
+
+def replay(capture: dict, repeat: int) -> tuple[dict, float]:
+    """Rerun ``capture`` ``repeat`` times; return the response and the best time."""
+    request = RebalanceRequest(**capture["request"])
+    provider = StaticPrices(capture["prices"])
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = run_rebalance(request, provider)
+        best = min(best, time.perf_counter() - start)
+    return response.model_dump(exclude_none=True), best
+
+
+def matches(response: dict, recorded: dict | None) -> bool:
+    """Whether a replayed ``response`` gives the result of the ``recorded`` one."""
+    if recorded is None:
+        return True
+    return {k: v for k, v in response.items() if k not in _RUN_FIELDS} == {
+        k: v for k, v in recorded.items() if k not in _RUN_FIELDS
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("captures", nargs="+", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a cProfile summary of the replayed runs.")
+    parser.add_argument("--top", type=int, default=30, help="Functions in the summary.")
+    args = parser.parse_args()
+
+    profiler = cProfile.Profile() if args.profile else None
+    mismatches = 0
+    print(f"{'capture':<36}{'assets':>7}{'best ms':>10}  result")
+    for path in args.captures:
+        capture = json.loads(path.read_text())
+        if profiler:
+            profiler.enable()
+        response, best = replay(capture, args.repeat)
+        if profiler:
+            profiler.disable()
+        same = matches(response, capture.get("response"))
+        mismatches += not same
+        print(f"{path.stem:<36}{len(capture['request']['assets']):>7}{best * 1000:>10.3f}"
+              f"  {'ok' if same else 'DIFFERS from recorded response'}")
+
+    if profiler:
+        print()
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.top)
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Quality versus latency of the leftover-cash redistribution strategies.
+
+Runs every portfolio of a corpus through ``run_rebalance`` once per
+strategy, with prices served from memory, and reports per strategy the
+leftover cash, the drift from target weights after buying and the
+wall-clock cost of the redistribution step. It also reports how often the
+greedy ``redistribute_change`` leaves no more cash than the knapsack DP
+(i.e. is already optimal) and the knapsack cost by the size of the cash
+it redistributes, against ``MAX_CENTS`` (above which the DP falls back
+to greedy)::
+
+    python -m benchmarks.solver_quality --portfolios 5000
+    python -m benchmarks.solver_quality --corpus recorded.json --json quality.json
+
+A recorded corpus is a JSON list of ``{"request": <POST /v1/rebalance
+body>, "prices": {"<ticker>": <price>, ...}}`` objects.
+
+Drift is half the sum of absolute differences between post-trade and
+target weights, in percentage points (0 = on target, 100 = disjoint).
+"""
+
+import argparse
+import json
+import random
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from app import rebalance
+from app.rebalance.rebalance import MAX_CENTS
+from app.schemas.request import RebalanceRequest
+from app.services.rebalance_service import run_rebalance
+from benchmarks.portfolios import StaticPrices, price_for, random_portfolio
+
+STRATEGIES = {"greedy": False, "knapsack": True}
+
+# Change bands (currency units) for the MAX_CENTS report.
+_BANDS = (1, 10, 100, 1000, 10_000)
+
+
+@dataclass
+class Outcome:
+    strategy: str
+    change: float  # cash handed to the redistribution step
+    leftover: float
+    drift: float
+    seconds: float  # redistribution step only
+
+
+@contextmanager
+def _timed_solvers() -> Iterator[dict]:
+    """Record the input change and duration of the redistribution call."""
+    last: dict = {}
+    originals = {name: getattr(rebalance, name)
+                 for name in ("redistribute_change", "solve_knapsack")}
+
+    def wrap(fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                change = args[0].change if isinstance(args[0], rebalance.KnapsackProblem) else args[-1]
+                last.update(change=change, seconds=time.perf_counter() - start)
+        return timed
+
+    for name, fn in originals.items():
+        setattr(rebalance, name, wrap(fn))
+    try:
+        yield last
+    finally:
+        for name, fn in originals.items():
+            setattr(rebalance, name, fn)
+
+
+@dataclass
+class Summary:
+    strategy: str
+    cases: int
+    mean_leftover: float
+    p95_leftover: float
+    mean_drift: float
+    mean_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+def random_corpus(n: int, seed: int) -> list[tuple[dict, dict[str, float]]]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        request = random_portfolio(rng)
+        corpus.append((request, {a["ticker"]: price_for(a["ticker"]) for a in request["assets"]}))
+    return corpus
+
+
+def load_corpus(path: Path) -> list[tuple[dict, dict[str, float]]]:
+    return [(entry["request"], entry["prices"]) for entry in json.loads(path.read_text())]
+
+
+def _drift(response) -> float:
+    values = [(r.shares + r.buy) * r.ticker_price for r in response.results]
+    total = sum(values)
+    if total <= 0:
+        return 0.0
+    return sum(
+        abs(v * 100 / total - r.desired_percentage) for v, r in zip(values, response.results)
+    ) / 2
+
+
+def evaluate(request: dict, prices: dict[str, float], last_call: dict) -> list[Outcome]:
+    provider = StaticPrices(prices)
+    outcomes = []
+    for strategy, optimal in STRATEGIES.items():
+        payload = RebalanceRequest(**{**request, "optimal_redistribute": optimal})
+        response = run_rebalance(payload, provider)
+        outcomes.append(Outcome(
+            strategy, last_call["change"], response.change, _drift(response), last_call["seconds"],
+        ))
+    return outcomes
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def summarise(strategy: str, outcomes: list[Outcome]) -> Summary:
+    leftovers = [o.leftover for o in outcomes]
+    times = [o.seconds * 1000 for o in outcomes]
+    return Summary(
+        strategy=strategy,
+        cases=len(outcomes),
+        mean_leftover=round(sum(leftovers) / len(outcomes), 4),
+        p95_leftover=round(_percentile(leftovers, 0.95), 4),
+        mean_drift=round(sum(o.drift for o in outcomes) / len(outcomes), 4),
+        mean_ms=round(sum(times) / len(times), 4),
+        p99_ms=round(_percentile(times, 0.99), 4),
+        max_ms=round(max(times), 4),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--portfolios", type=int, default=2000,
+                        help="Randomised portfolios to generate (0 to use only --corpus).")
+    parser.add_argument("--corpus", type=Path, action="append", default=[],
+                        help="Recorded corpus JSON file; may be repeated.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", type=Path, help="Write the summary to this JSON file.")
+    args = parser.parse_args()
+
+    corpus = random_corpus(args.portfolios, args.seed)
+    for path in args.corpus:
+        corpus += load_corpus(path)
+    if not corpus:
+        parser.error("empty corpus")
+
+    by_strategy: dict[str, list[Outcome]] = {s: [] for s in STRATEGIES}
+    greedy_optimal = 0
+    with _timed_solvers() as last_call:
+        for request, prices in corpus:
+            greedy, knapsack = evaluate(request, prices, last_call)
+            by_strategy["greedy"].append(greedy)
+            by_strategy["knapsack"].append(knapsack)
+            greedy_optimal += greedy.leftover <= knapsack.leftover + 0.005
+
+    summaries = [summarise(s, outcomes) for s, outcomes in by_strategy.items()]
+    print(f"{'strategy':<10}{'cases':>7}{'leftover':>10}{'p95':>9}{'drift pp':>10}"
+          f"{'mean ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for s in summaries:
+        print(f"{s.strategy:<10}{s.cases:>7}{s.mean_leftover:>10.2f}{s.p95_leftover:>9.2f}"
+              f"{s.mean_drift:>10.3f}{s.mean_ms:>9.3f}{s.p99_ms:>9.3f}{s.max_ms:>9.3f}")
+    rate = greedy_optimal / len(corpus)
+    print(f"\ngreedy leaves no more cash than knapsack in {rate:.1%} of {len(corpus)} cases")
+
+    # Knapsack cost by the cash it redistributes (the DP capacity).
+    bands = []
+    print(f"\n{'change':<18}{'cases':>7}{'knapsack mean ms':>18}{'max ms':>9}"
+          f"  (DP cap: MAX_CENTS = {MAX_CENTS / 100:g} in currency)")
+    lower = 0.0
+    for upper in (*_BANDS, float("inf")):
+        times = [k.seconds * 1000 for k in by_strategy["knapsack"] if lower <= k.change < upper]
+        if times:
+            label = f"[{lower:g}, {upper:g})"
+            bands.append({
+                "from": lower, "to": None if upper == float("inf") else upper,
+                "cases": len(times), "mean_ms": sum(times) / len(times), "max_ms": max(times),
+            })
+            print(f"{label:<18}{len(times):>7}{sum(times) / len(times):>18.3f}{max(times):>9.3f}")
+        lower = upper
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "cases": len(corpus),
+            "max_cents": MAX_CENTS,
+            "greedy_optimal_rate": rate,
+            "strategies": [asdict(s) for s in summaries],
+            "knapsack_cost_by_leftover": bands,
+        }, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
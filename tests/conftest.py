@@ -5,8 +5,10 @@ from fastapi.testclient import TestClient
 from unittest.mock import MagicMock
 
 from app.main import app
-from app.api.deps import get_market_provider
+from app.api.deps import get_market_provider, get_result_cache
+from app.market_data.cache import LocalCache
 from app.market_data.base import AbstractMarketDataProvider
+from app.services import rebalance_service
 
 
 @pytest.fixture
@@ -18,6 +20,36 @@ def mock_provider() -> MagicMock:
 @pytest.fixture
 def client(mock_provider: MagicMock) -> TestClient:
     app.dependency_overrides[get_market_provider] = lambda: mock_provider
+    # A result cache per test: responses memoised by one must not answer another.
+    results = LocalCache(ttl_seconds=60, max_entries=8)
+    app.dependency_overrides[get_result_cache] = lambda: results
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def payload() -> dict:
+    """A two-asset POST /v1/rebalance body, priced by tickers A and B."""
+    return {
+        "only_buy": True,
+        "increment": 1000.0,
+        "assets": [
+            {"ticker": "A", "desired_percentage": 60.0, "shares": 0, "fees": 0},
+            {"ticker": "B", "desired_percentage": 40.0, "shares": 0, "fees": 0},
+        ],
+    }
+
+
+@pytest.fixture
+def solves(monkeypatch) -> list:
+    """Arguments of every solver run during the test, in order."""
+    calls = []
+    real = rebalance_service._solve
+
+    def counting(*args):
+        calls.append(args)
+        return real(*args)
+
+    monkeypatch.setattr(rebalance_service, "_solve", counting)
+    return calls
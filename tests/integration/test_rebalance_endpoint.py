@@ -134,3 +134,40 @@ def test_502_on_market_data_error(client, mock_provider):
     resp = client.post("/v1/rebalance", json=payload)
     assert resp.status_code == 502
     assert "feed unavailable" in resp.json()["detail"]
+
+
+def test_diagnostics_query_adds_diagnostics_block(client, mock_provider):
+    mock_provider.get_prices.return_value = {"A": 50.0, "B": 100.0}
+    resp = client.post("/v1/rebalance?diagnostics=true", json=_TWO_ASSET_PAYLOAD)
+    assert resp.status_code == 200
+    diag = resp.json()["diagnostics"]
+    assert diag["solver"] == "greedy"
+    assert set(diag) >= {"path", "cells", "table_bytes", "solve_ms", "price_cache_hits"}
+
+    assert "diagnostics" not in client.post("/v1/rebalance", json=_TWO_ASSET_PAYLOAD).json()
+
+
+def test_504_when_request_timeout_elapses(client, mock_provider, monkeypatch):
+    import threading
+
+    from app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "request_timeout_seconds", 0.01)
+    # The price fetch is held until the 504 is in, so the timeout always wins.
+    release, fetched = threading.Event(), threading.Event()
+
+    def held(tickers):
+        release.wait(5)
+        fetched.set()
+        return {"A": 100.0}
+
+    solved = []
+    mock_provider.get_prices.side_effect = held
+    monkeypatch.setattr("app.services.rebalance_service._solve",
+                        lambda *args: solved.append(args))
+    resp = client.post("/v1/rebalance", json=_SINGLE_ASSET_PAYLOAD)
+    assert resp.status_code == 504
+    release.set()
+    assert fetched.wait(5)
+    client.get("/v1/health")  # the loop has seen the fetch complete by now
+    assert solved == []  # the abandoned computation stopped before solving
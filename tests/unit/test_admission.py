@@ -0,0 +1,166 @@
+"""Unit tests for cost-aware admission control."""
+
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionController
+from app.core.exceptions import Overloaded
+from app.schemas.request import RebalanceRequest
+from app.services.rebalance_service import estimate_cost
+
+
+def _controller(**overrides) -> AdmissionController:
+    options = dict(max_concurrent=1, max_queue=1, queue_timeout=0.05,
+                   expensive_cells=1000, expensive_cold_tickers=3)
+    return AdmissionController(**{**options, **overrides})
+
+
+def _request(optimal: bool, increment: float = 100.0) -> RebalanceRequest:
+    return RebalanceRequest(
+        only_buy=True, increment=increment, optimal_redistribute=optimal,
+        assets=[
+            {"ticker": "A", "desired_percentage": 50.0, "shares": 0, "fees": 0},
+            {"ticker": "B", "desired_percentage": 50.0, "shares": 0, "fees": 0},
+        ],
+    )
+
+
+def test_estimate_bounds_cells_by_cached_prices():
+    assert estimate_cost(_request(False), {}) == (0, 2)
+    assert estimate_cost(_request(True), {"A": 1.5}) == (2 * 10_000, 1)
+    assert estimate_cost(_request(True), {"A": 1.5, "B": 2.5}) == (2 * 400, 0)
+
+
+def test_expensive_by_cells_or_cold_tickers():
+    controller = _controller()
+    assert not controller.is_expensive(999, 2)
+    assert controller.is_expensive(1000, 0)
+    assert controller.is_expensive(0, 3)
+    assert not controller.may_be_expensive(2, knapsack=False)
+
+
+def test_cheap_requests_bypass_the_slots():
+    async def main():
+        controller = _controller()
+        async with controller.admit(True):
+            async with controller.admit(False):
+                return "served"
+
+    assert asyncio.run(main()) == "served"
+
+
+def test_waiter_gets_slot_when_it_frees_up():
+    async def main():
+        controller = _controller(queue_timeout=1.0)
+        order = []
+
+        async def job(name, hold):
+            async with controller.admit(True):
+                order.append(name)
+                await asyncio.sleep(hold)
+
+        await asyncio.gather(job("first", 0.02), job("second", 0))
+        return order
+
+    assert asyncio.run(main()) == ["first", "second"]
+
+
+def test_full_queue_rejects_with_429():
+    async def main():
+        controller = _controller(queue_timeout=1.0)
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.admit(True):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(Overloaded) as exc:
+                async with controller.admit(True):
+                    pass
+            return exc.value
+        finally:
+            release.set()
+            await asyncio.gather(holder, waiter)
+
+    exc = asyncio.run(main())
+    assert (exc.status_code, exc.retry_after) == (429, 1)
+
+
+def test_queue_timeout_rejects_with_503():
+    async def main():
+        controller = _controller(queue_timeout=0.01)
+        async with controller.admit(True):
+            with pytest.raises(Overloaded) as exc:
+                async with controller.admit(True):
+                    pass
+        # The slot is released and usable again.
+        async with controller.admit(True):
+            pass
+        return exc.value
+
+    assert asyncio.run(main()).status_code == 503
+
+
+def test_overloaded_response_carries_retry_after():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.core.exceptions import overloaded_handler
+
+    app = FastAPI()
+    app.add_exception_handler(Overloaded, overloaded_handler)
+
+    @app.get("/busy")
+    async def busy():
+        raise Overloaded(503, "busy", 3)
+
+    resp = TestClient(app).get("/busy")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "3"
+
+
+def test_cold_tickers_are_counted_before_prices_are_fetched(monkeypatch):
+    from unittest.mock import MagicMock
+
+    from fastapi.testclient import TestClient
+
+    from app.api.deps import get_admission_controller, get_market_provider, get_result_cache
+    from app.main import app
+    from app.market_data.base import AbstractMarketDataProvider
+    from app.market_data.cache import LocalCache
+    from app.market_data.cached_provider import CachedMarketDataProvider
+
+    controller = _controller(max_concurrent=1, expensive_cold_tickers=2)
+    seen = []
+    is_expensive = controller.is_expensive
+    monkeypatch.setattr(controller, "is_expensive",
+                        lambda cells, cold: seen.append(cold) or is_expensive(cells, cold))
+    slots_held = []
+    upstream = MagicMock(spec=AbstractMarketDataProvider)
+
+    def fetch(tickers):
+        slots_held.append(controller._in_flight)
+        return {t: 10.0 for t in tickers}
+
+    upstream.get_prices.side_effect = fetch
+    provider = CachedMarketDataProvider(upstream, LocalCache(ttl_seconds=60))
+    app.dependency_overrides.update({
+        get_market_provider: lambda: provider,
+        get_admission_controller: lambda: controller,
+        get_result_cache: lambda: None,
+    })
+    try:
+        with TestClient(app) as client:
+            resp = client.post("/v1/rebalance", json=_request(False).model_dump())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert seen == [2]
+    assert slots_held == [1]  # the expensive request's slot covers the upstream fetch
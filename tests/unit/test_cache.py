@@ -2,9 +2,10 @@
 
 from unittest.mock import MagicMock
 
-from app.market_data.cache import LocalCache
-from app.market_data.cached_provider import CachedMarketDataProvider, _KEY_PREFIX
-from app.market_data.base import AbstractMarketDataProvider
+from app.market_data.cache import _EVICTIONS, _LOOKUPS, LocalCache
+from app.market_data.cached_provider import CachedMarketDataProvider, price_key
+from app.market_data.base import AbstractMarketDataProvider, AbstractQuoteProvider, Quote
+from app.market_data.market_hours import TradingSession
 
 
 # ---------------------------------------------------------------------------
@@ -64,6 +65,44 @@ def test_overwrite_resets_ttl():
     assert cache.get("k") == 2.0
 
 
+def test_per_call_ttl_overrides_default():
+    cache, clock = _make_cache(ttl=60)
+    clock.return_value = 0.0
+    cache.set("k", 1.0, ttl_seconds=600)
+    clock.return_value = 599.0
+    assert cache.get("k") == 1.0
+    clock.return_value = 601.0
+    assert cache.get("k") is None
+
+
+def test_max_entries_evicts_least_recently_used():
+    cache = LocalCache(ttl_seconds=300, max_entries=2)
+    cache.set("a", 1.0)
+    cache.set("b", 2.0)
+    cache.get("a")
+    cache.set("c", 3.0)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1.0
+    assert cache.get("c") == 3.0
+
+
+def test_overwrite_does_not_evict_when_full():
+    cache = LocalCache(ttl_seconds=300, max_entries=2)
+    cache.set("a", 1.0)
+    cache.set("b", 2.0)
+    cache.set("a", 5.0)
+    assert cache.get("a") == 5.0
+    assert cache.get("b") == 2.0
+
+
+def test_lru_eviction_is_counted_under_cache_name():
+    cache = LocalCache(ttl_seconds=300, max_entries=1, name="evict-test")
+    cache.set("a", 1.0)
+    cache.set("b", 2.0)
+    cache.set("c", 3.0)
+    assert _EVICTIONS.value(cache="evict-test") == 2.0
+
+
 # ---------------------------------------------------------------------------
 # CachedMarketDataProvider
 # ---------------------------------------------------------------------------
@@ -85,8 +124,8 @@ def test_all_miss_calls_underlying_provider():
 
 def test_all_hit_does_not_call_underlying_provider():
     provider, mock, cache = _make_provider({})
-    cache.set(_KEY_PREFIX + "A", 10.0)
-    cache.set(_KEY_PREFIX + "B", 20.0)
+    cache.set(price_key("A"), 10.0)
+    cache.set(price_key("B"), 20.0)
     result = provider.get_prices(["A", "B"])
     mock.get_prices.assert_not_called()
     assert result == {"A": 10.0, "B": 20.0}
@@ -94,16 +133,26 @@ def test_all_hit_does_not_call_underlying_provider():
 
 def test_partial_hit_calls_provider_only_for_misses():
     provider, mock, cache = _make_provider({"B": 20.0})
-    cache.set(_KEY_PREFIX + "A", 10.0)
+    cache.set(price_key("A"), 10.0)
     result = provider.get_prices(["A", "B"])
     mock.get_prices.assert_called_once_with(["B"])
     assert result == {"A": 10.0, "B": 20.0}
 
 
+def test_lookups_are_counted_per_backend():
+    labels = {"cache": "price", "backend": "local"}
+    hits, misses = _LOOKUPS.value(result="hit", **labels), _LOOKUPS.value(result="miss", **labels)
+    provider, _, cache = _make_provider({"B": 20.0})
+    cache.set(price_key("A"), 10.0)
+    provider.get_prices(["A", "B"])
+    assert _LOOKUPS.value(result="hit", **labels) == hits + 1
+    assert _LOOKUPS.value(result="miss", **labels) == misses + 1
+
+
 def test_fetched_prices_are_written_to_cache():
     provider, _, cache = _make_provider({"A": 55.0})
     provider.get_prices(["A"])
-    assert cache.get(_KEY_PREFIX + "A") == 55.0
+    assert cache.get(price_key("A")) == 55.0
 
 
 def test_provider_error_propagates():
@@ -116,3 +165,36 @@ def test_provider_error_propagates():
         assert False, "expected RuntimeError"
     except RuntimeError as exc:
         assert "feed down" in str(exc)
+
+
+def test_ttl_policy_receives_quote_session():
+    session = TradingSession(start=0.0, end=1.0, timezone="UTC")
+    mock = MagicMock(spec=AbstractQuoteProvider)
+    mock.get_quotes.return_value = {"A": Quote(10.0, session)}
+    clock = MagicMock(return_value=0.0)
+    cache = LocalCache(ttl_seconds=60, clock=clock)
+    policy = MagicMock(return_value=3600.0)
+    provider = CachedMarketDataProvider(mock, cache, ttl_policy=policy)
+
+    assert provider.get_prices(["A"]) == {"A": 10.0}
+    policy.assert_called_once_with(session)
+    clock.return_value = 3599.0
+    assert cache.get(price_key("A")) == 10.0
+
+
+def test_plain_provider_passes_no_session_to_ttl_policy():
+    mock = MagicMock(spec=AbstractMarketDataProvider)
+    mock.get_prices.return_value = {"A": 10.0}
+    policy = MagicMock(return_value=3600.0)
+    provider = CachedMarketDataProvider(mock, LocalCache(ttl_seconds=60), ttl_policy=policy)
+    assert provider.get_prices(["A"]) == {"A": 10.0}
+    policy.assert_called_once_with(None)
+
+
+def test_peek_returns_only_cached_prices_without_fetching():
+    import asyncio
+
+    provider, mock, cache = _make_provider({})
+    cache.set(price_key("A"), 10.0)
+    assert asyncio.run(provider.peek(["A", "B"])) == {"A": 10.0}
+    mock.get_prices.assert_not_called()
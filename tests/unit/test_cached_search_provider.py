@@ -0,0 +1,84 @@
+"""Unit tests for CachedTickerSearchProvider."""
+
+from unittest.mock import MagicMock
+
+from app.market_data.base import AbstractTickerSearchProvider
+from app.market_data.cache import LocalCache
+from app.market_data.cached_search_provider import CachedTickerSearchProvider
+
+
+def _quote(symbol: str, shortname: str) -> dict:
+    return {"symbol": symbol, "shortname": shortname, "quoteType": "ETF"}
+
+
+def _make_provider(
+    quotes: list[dict], result_limit: int | None = 10,
+) -> tuple[CachedTickerSearchProvider, MagicMock]:
+    mock = MagicMock(spec=AbstractTickerSearchProvider)
+    mock.result_limit = result_limit
+    mock.search.return_value = quotes
+    return CachedTickerSearchProvider(mock, LocalCache(ttl_seconds=300)), mock
+
+
+def test_miss_calls_upstream():
+    quotes = [_quote("VWCE.DE", "Vanguard FTSE All-World")]
+    provider, mock = _make_provider(quotes)
+    assert provider.search("VWCE") == quotes
+    mock.search.assert_called_once_with("VWCE")
+
+
+def test_exact_hit_does_not_call_upstream():
+    provider, mock = _make_provider([_quote("VWCE.DE", "Vanguard FTSE All-World")])
+    provider.search("VWCE")
+    provider.search("vwce ")
+    mock.search.assert_called_once()
+
+
+def test_extension_of_complete_prefix_filters_locally():
+    provider, mock = _make_provider([
+        _quote("VWCE.DE", "Vanguard FTSE All-World"),
+        _quote("VWCA.DE", "Vanguard FTSE All-World Acc"),
+    ])
+    provider.search("VWC")
+    assert provider.search("VWCE") == [_quote("VWCE.DE", "Vanguard FTSE All-World")]
+    mock.search.assert_called_once_with("VWC")
+
+
+def test_prefix_filter_matches_name_terms():
+    provider, mock = _make_provider([
+        _quote("VWCE.DE", "Vanguard FTSE All-World"),
+        _quote("VAGF.DE", "Vanguard Global Aggregate Bond"),
+    ])
+    provider.search("vanguard")
+    result = provider.search("vanguard all")
+    assert [q["symbol"] for q in result] == ["VWCE.DE"]
+    mock.search.assert_called_once()
+
+
+def test_truncated_prefix_is_not_reused():
+    quotes = [_quote(f"VW{i}", "Vanguard") for i in range(10)]
+    provider, mock = _make_provider(quotes)
+    provider.search("VW")
+    provider.search("VWC")
+    assert mock.search.call_count == 2
+
+
+def test_unknown_result_limit_disables_prefix_reuse():
+    provider, mock = _make_provider([_quote("VWCE.DE", "Vanguard")], result_limit=None)
+    provider.search("VWC")
+    provider.search("VWCE")
+    assert mock.search.call_count == 2
+
+
+def test_upstream_error_is_not_cached():
+    mock = MagicMock(spec=AbstractTickerSearchProvider)
+    mock.result_limit = 10
+    mock.search.side_effect = [RuntimeError("timeout"), []]
+    provider = CachedTickerSearchProvider(mock, LocalCache(ttl_seconds=300))
+    try:
+        provider.search("VWCE")
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+    assert provider.search("VWCE") == []
+    assert mock.search.call_count == 2
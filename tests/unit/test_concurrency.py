@@ -0,0 +1,168 @@
+"""Unit tests for SingleFlight and cancel_on_disconnect."""
+
+import asyncio
+import pickle
+import time
+
+import pytest
+
+from app.core.concurrency import CancelToken, SingleFlight, cancel_on_disconnect
+from app.core.exceptions import ClientDisconnected
+
+
+class _FakeRequest:
+    """Minimal stand-in exposing the ASGI receive channel."""
+
+    def __init__(self) -> None:
+        self.disconnected = asyncio.Event()
+
+    async def receive(self) -> dict:
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+
+# ---------------------------------------------------------------------------
+# SingleFlight
+# ---------------------------------------------------------------------------
+
+def test_concurrent_calls_share_one_task():
+    calls = 0
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def main() -> list[int]:
+        flight: SingleFlight[int] = SingleFlight()
+        return await asyncio.gather(*(flight.run("k", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == [42] * 5
+    assert calls == 1
+
+
+def test_sequential_calls_do_not_share():
+    calls = 0
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def main() -> list[int]:
+        flight: SingleFlight[int] = SingleFlight()
+        return [await flight.run("k", work), await flight.run("k", work)]
+
+    assert asyncio.run(main()) == [1, 2]
+
+
+def test_last_waiter_leaving_cancels_task():
+    cancelled = False
+
+    async def work() -> int:
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return 0
+
+    async def main() -> int:
+        flight: SingleFlight[int] = SingleFlight()
+        waiter = asyncio.ensure_future(flight.run("k", work))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+        return len(flight)
+
+    assert asyncio.run(main()) == 0
+    assert cancelled
+
+
+def test_remaining_waiter_keeps_task_alive():
+    async def work() -> int:
+        await asyncio.sleep(0.01)
+        return 7
+
+    async def main() -> int:
+        flight: SingleFlight[int] = SingleFlight()
+        first = asyncio.ensure_future(flight.run("k", work))
+        second = asyncio.ensure_future(flight.run("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == 7
+
+
+def test_exception_reaches_every_waiter():
+    async def work() -> int:
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    async def main() -> list:
+        flight: SingleFlight[int] = SingleFlight()
+        return await asyncio.gather(
+            flight.run("k", work), flight.run("k", work), return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+# ---------------------------------------------------------------------------
+# cancel_on_disconnect
+# ---------------------------------------------------------------------------
+
+def test_result_returned_when_client_stays():
+    async def main() -> int:
+        async def work() -> int:
+            return 1
+        return await cancel_on_disconnect(_FakeRequest(), work())
+
+    assert asyncio.run(main()) == 1
+
+
+def test_disconnect_cancels_work():
+    cancelled = False
+
+    async def work() -> int:
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return 0
+
+    async def main() -> None:
+        request = _FakeRequest()
+        asyncio.get_running_loop().call_later(0.01, request.disconnected.set)
+        await cancel_on_disconnect(request, work())
+
+    with pytest.raises(ClientDisconnected):
+        asyncio.run(main())
+    assert cancelled
+
+
+def test_cancel_token_cancel_and_timeout():
+    token = CancelToken()
+    assert not token.is_cancelled()
+    token.cancel()
+    assert token.is_cancelled()
+
+    timed = CancelToken(0.01)
+    assert not timed.is_cancelled()
+    time.sleep(0.02)
+    assert timed.is_cancelled()
+
+
+def test_pickled_cancel_token_keeps_only_the_deadline():
+    token = CancelToken(60)
+    token.cancel()
+    copy = pickle.loads(pickle.dumps(token))
+    assert copy.deadline == token.deadline
+    assert not copy.is_cancelled()
@@ -0,0 +1,77 @@
+"""Unit tests for ETag / If-None-Match on POST /v1/rebalance."""
+
+import pytest
+
+from app.api.deps import get_result_cache
+from app.api.v1.routes.rebalance import _etag_matches
+from app.main import app
+from app.services import rebalance_service
+
+
+@pytest.fixture
+def solves(solves, client) -> list:
+    # No result cache: a 304 must come from the ETag check alone.
+    app.dependency_overrides[get_result_cache] = lambda: None
+    return solves
+
+
+def test_response_carries_etag(client, mock_provider, solves, payload):
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    resp = client.post("/v1/rebalance", json=payload)
+    assert resp.status_code == 200
+    assert resp.headers["ETag"].startswith('"')
+    assert resp.headers["Cache-Control"] == "no-cache"
+
+
+def test_matching_etag_returns_304_without_solving(client, mock_provider, solves, payload):
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    etag = client.post("/v1/rebalance", json=payload).headers["ETag"]
+
+    resp = client.post("/v1/rebalance", json=payload, headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["ETag"] == etag
+    assert len(solves) == 1
+
+
+def test_price_change_changes_etag(client, mock_provider, solves, payload):
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    etag = client.post("/v1/rebalance", json=payload).headers["ETag"]
+
+    mock_provider.get_prices.return_value = {"A": 10.5, "B": 20.0}
+    resp = client.post("/v1/rebalance", json=payload, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert len(solves) == 2
+
+
+def test_request_change_changes_etag(client, mock_provider, solves, payload):
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    etag = client.post("/v1/rebalance", json=payload).headers["ETag"]
+    other = {**payload, "increment": 2000.0}
+    assert client.post("/v1/rebalance", json=other).headers["ETag"] != etag
+
+
+def test_solver_version_changes_etag(client, mock_provider, solves, monkeypatch, payload):
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    etag = client.post("/v1/rebalance", json=payload).headers["ETag"]
+
+    monkeypatch.setattr(rebalance_service, "SOLVER_VERSION", rebalance_service.SOLVER_VERSION + 1)
+    resp = client.post("/v1/rebalance", json=payload, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+def test_diagnostics_response_has_no_etag(client, mock_provider, solves, payload):
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    resp = client.post("/v1/rebalance?diagnostics=true", json=payload)
+    assert resp.status_code == 200
+    assert "ETag" not in resp.headers
+
+
+def test_etag_matching():
+    assert not _etag_matches(None, '"a"')
+    assert _etag_matches('"a"', '"a"')
+    assert _etag_matches('"b", W/"a"', '"a"')
+    assert _etag_matches("*", '"a"')
+    assert not _etag_matches('"b"', '"a"')
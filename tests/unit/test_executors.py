@@ -0,0 +1,62 @@
+"""Unit tests for the I/O and CPU executors."""
+
+import os
+import pickle
+import signal
+
+import pytest
+
+from app.core import executors
+from app.rebalance import KnapsackProblem, solve_knapsack
+
+_PROBLEM = KnapsackProblem(False, [1, 1], [3.0, 7.0], [50.0, 50.0], [50.0, 50.0], 10.0)
+
+
+@pytest.fixture
+def cpu_pool():
+    executors.start_cpu_pool(1, min_cost=100)
+    yield
+    executors.stop_cpu_pool()
+
+
+def test_problem_round_trips_through_pickle():
+    assert pickle.loads(pickle.dumps(_PROBLEM)) == _PROBLEM
+    assert _PROBLEM.cost == 2000
+
+
+def test_run_cpu_without_pool_runs_inline():
+    before = executors._CPU_TASKS.value(where="inline")
+    updated, remaining, stats = executors.run_cpu(solve_knapsack, _PROBLEM, cost=_PROBLEM.cost)
+    assert (updated, remaining, stats.path) == ([2, 2], 0.0, "dp")
+    assert executors._CPU_TASKS.value(where="inline") == before + 1
+
+
+def test_run_cpu_uses_process_pool_above_min_cost(cpu_pool):
+    before = executors._CPU_TASKS.value(where="process")
+    result = executors.run_cpu(solve_knapsack, _PROBLEM, cost=_PROBLEM.cost)
+    assert result == solve_knapsack(_PROBLEM)
+    assert executors._CPU_TASKS.value(where="process") == before + 1
+    assert ("cpu",) in executors._depths()
+
+
+def test_run_cpu_keeps_cheap_tasks_inline(cpu_pool):
+    before = executors._CPU_TASKS.value(where="process")
+    executors.run_cpu(solve_knapsack, _PROBLEM, cost=10)
+    assert executors._CPU_TASKS.value(where="process") == before
+
+
+def test_dead_worker_restarts_the_pool(cpu_pool):
+    broken = executors._cpu_pool
+    for process in list(broken._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+        process.join(5)
+    before = executors._CPU_TASKS.value(where="broken_pool")
+
+    result = executors.run_cpu(solve_knapsack, _PROBLEM, cost=_PROBLEM.cost)
+    assert result == solve_knapsack(_PROBLEM)
+    assert executors._CPU_TASKS.value(where="broken_pool") == before + 1
+    assert executors._cpu_pool is not broken
+
+    before = executors._CPU_TASKS.value(where="process")
+    executors.run_cpu(solve_knapsack, _PROBLEM, cost=_PROBLEM.cost)
+    assert executors._CPU_TASKS.value(where="process") == before + 1
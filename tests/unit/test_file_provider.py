@@ -0,0 +1,82 @@
+"""Unit tests for the CSV file-backed price provider."""
+
+import pytest
+
+from app.core.exceptions import MarketDataError, SymbolNotFound
+from app.market_data.file_provider import FileMarketDataProvider
+
+
+def _provider(tmp_path, text: str) -> FileMarketDataProvider:
+    path = tmp_path / "prices.csv"
+    path.write_text(text)
+    return FileMarketDataProvider(path)
+
+
+def test_latest_date_wins_regardless_of_row_order(tmp_path):
+    provider = _provider(tmp_path, (
+        "symbol,date,close\n"
+        "VWCE.DE,2024-05-31,112.64\n"
+        "AGGH.MI,2024-05-31,5.10\n"
+        "VWCE.DE,2024-05-30,112.10\n"
+    ))
+    assert provider.get_prices(["VWCE.DE", "AGGH.MI"]) == {"VWCE.DE": 112.64, "AGGH.MI": 5.10}
+
+
+def test_without_date_column_last_row_wins(tmp_path):
+    provider = _provider(tmp_path, "price,symbol\n1.0,A\n2.0,A\n")
+    assert provider.get_prices(["A"]) == {"A": 2.0}
+    assert provider.get_history("A") == [("", 1.0), ("", 2.0)]
+
+
+def test_history_is_sorted_by_date(tmp_path):
+    provider = _provider(tmp_path, (
+        "symbol,date,close\r\n"
+        "A,2024-01-03,3\r\n"
+        "A,2024-01-01,1\r\n"
+        "A,2024-01-02,2"
+    ))
+    assert provider.get_history("A") == [
+        ("2024-01-01", 1.0), ("2024-01-02", 2.0), ("2024-01-03", 3.0),
+    ]
+
+
+def test_unknown_ticker_raises(tmp_path):
+    provider = _provider(tmp_path, "symbol,close\nA,1\n")
+    with pytest.raises(MarketDataError, match="'B'"):
+        provider.get_prices(["A", "B"])
+    with pytest.raises(MarketDataError):
+        provider.get_history("B")
+
+
+def test_empty_ticker_list_raises(tmp_path):
+    provider = _provider(tmp_path, "symbol,close\nA,1\n")
+    with pytest.raises(ValueError):
+        provider.get_prices([])
+
+
+def test_header_without_price_column_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="header"):
+        _provider(tmp_path, "symbol,date\nA,2024-01-01\n")
+
+
+def test_blank_lines_are_skipped(tmp_path):
+    provider = _provider(tmp_path, "symbol,close\n\nA,1\n\n")
+    assert provider.get_prices(["A"]) == {"A": 1.0}
+
+
+def test_short_rows_are_skipped_with_a_warning(tmp_path, caplog):
+    text = "symbol,date,close\nA,2024-01-01,1\nB\n,2024-01-01,3\n  \nC,2024-01-01\n"
+    provider = _provider(tmp_path, text)
+    assert provider.get_prices(["A"]) == {"A": 1.0}
+    for symbol in ("B", "C"):
+        with pytest.raises(SymbolNotFound):
+            provider.get_prices([symbol])
+    assert "skipped 3 malformed rows (first at line 3)" in caplog.text
+
+
+def test_non_numeric_price_raises_market_data_error(tmp_path):
+    provider = _provider(tmp_path, "symbol,date,close\nA,2024-01-01,n/a\n")
+    with pytest.raises(MarketDataError, match="Invalid price 'n/a' for 'A'"):
+        provider.get_prices(["A"])
+    with pytest.raises(MarketDataError, match="Invalid price"):
+        provider.get_history("A")
@@ -0,0 +1,136 @@
+"""Unit tests for hedged upstream calls."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.market_data.hedging import Hedger, LatencyTracker
+
+HOSTS = ["https://primary", "https://alternate"]
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker()
+    assert tracker.percentile(0.95) is None
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+    assert tracker.percentile(0.5) == pytest.approx(0.051)
+    assert tracker.percentile(0.95) == pytest.approx(0.096)
+    assert tracker.percentile(1.0) == pytest.approx(0.1)
+
+
+def test_hedge_delay_uses_initial_delay_until_enough_samples():
+    hedger = Hedger(HOSTS, "test", initial_delay=0.5, min_samples=3, min_delay=0.01)
+    assert hedger.hedge_delay() == 0.5
+    for _ in range(3):
+        hedger._latency.record(0.2)
+    assert hedger.hedge_delay() == pytest.approx(0.2)
+
+
+def test_hedge_delay_has_floor():
+    hedger = Hedger(HOSTS, "test", min_samples=1, min_delay=0.05)
+    hedger._latency.record(0.001)
+    assert hedger.hedge_delay() == 0.05
+
+
+def test_single_host_calls_directly():
+    hedger = Hedger(HOSTS[:1], "test")
+    assert hedger.call(lambda host: host) == "https://primary"
+
+
+def test_fast_primary_is_not_hedged():
+    calls = []
+    hedger = Hedger(HOSTS, "test", initial_delay=1.0)
+
+    def fn(host):
+        calls.append(host)
+        return host
+
+    assert hedger.call(fn) == "https://primary"
+    assert calls == ["https://primary"]
+
+
+def test_slow_primary_is_hedged_and_alternate_wins():
+    release = threading.Event()
+    hedger = Hedger(HOSTS, "test", initial_delay=0.01)
+
+    def fn(host):
+        if host == "https://primary":
+            release.wait(5)
+        return host
+
+    try:
+        assert hedger.call(fn) == "https://alternate"
+    finally:
+        release.set()
+
+
+def test_failed_hedge_falls_back_to_slow_primary():
+    hedger = Hedger(HOSTS, "test", initial_delay=0.01)
+
+    def fn(host):
+        if host == "https://alternate":
+            raise RuntimeError("alternate down")
+        threading.Event().wait(0.05)
+        return host
+
+    assert hedger.call(fn) == "https://primary"
+
+
+def test_error_raised_when_all_requests_fail():
+    hedger = Hedger(HOSTS, "test", initial_delay=0.01)
+
+    def fn(host):
+        threading.Event().wait(0.02)
+        raise RuntimeError(host)
+
+    with pytest.raises(RuntimeError):
+        hedger.call(fn)
+
+
+def test_fast_primary_failure_is_not_hedged():
+    calls = []
+    hedger = Hedger(HOSTS, "test", initial_delay=1.0)
+
+    def fn(host):
+        calls.append(host)
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        hedger.call(fn)
+    assert calls == ["https://primary"]
+
+
+def test_async_hedge_cancels_slow_primary():
+    cancelled = []
+    hedger = Hedger(HOSTS, "test", initial_delay=0.01)
+
+    async def fn(host):
+        if host == "https://primary":
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(host)
+                raise
+        return host
+
+    async def main():
+        result = await hedger.acall(fn)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(main()) == "https://alternate"
+    assert cancelled == ["https://primary"]
+
+
+def test_async_fast_primary_is_not_hedged():
+    calls = []
+    hedger = Hedger(HOSTS, "test", initial_delay=1.0)
+
+    async def fn(host):
+        calls.append(host)
+        return host
+
+    assert asyncio.run(hedger.acall(fn)) == "https://primary"
+    assert calls == ["https://primary"]
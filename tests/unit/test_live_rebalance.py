@@ -0,0 +1,152 @@
+"""Unit tests for the /v1/rebalance/live WebSocket."""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.api import deps
+from app.api.deps import get_market_provider, get_price_updates
+from app.api.v1.routes.rebalance import _live_prices
+from app.core.config import get_settings
+from app.core.exceptions import MarketDataError
+from app.core.rate_limit import MemoryRateLimiter
+from app.main import app
+from app.market_data.base import AbstractMarketDataProvider
+from app.market_data.cache import LocalCache
+from app.market_data.cached_provider import CachedMarketDataProvider, price_key
+from app.market_data.price_updates import PriceUpdates
+from app.schemas.request import RebalanceRequest
+
+
+@pytest.fixture(autouse=True)
+def fast_polls(monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "live_poll_seconds", 0.01)
+
+
+def test_pushes_only_when_prices_change(client, mock_provider, solves, payload):
+    fetches = []
+
+    def prices(tickers):
+        fetches.append(tickers)
+        # Several polls at the first prices, then B moves.
+        return {"A": 10.0, "B": 20.0 if len(fetches) < 5 else 25.0}
+
+    mock_provider.get_prices.side_effect = prices
+    with client.websocket_connect("/v1/rebalance/live") as ws:
+        ws.send_json(payload)
+        first = ws.receive_json()
+        second = ws.receive_json()
+
+    assert [r["ticker_price"] for r in first["results"]] == [10.0, 20.0]
+    assert [r["ticker_price"] for r in second["results"]] == [10.0, 25.0]
+    assert len(fetches) >= 5
+    assert len(solves) == 2
+
+
+def test_matches_post_response(client, mock_provider, solves, payload):
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    expected = client.post("/v1/rebalance", json=payload).json()
+    with client.websocket_connect("/v1/rebalance/live") as ws:
+        ws.send_json(payload)
+        assert ws.receive_json() == expected
+
+
+def test_new_portfolio_replaces_the_old_one(client, mock_provider, solves, payload):
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    with client.websocket_connect("/v1/rebalance/live") as ws:
+        ws.send_json(payload)
+        ws.receive_json()
+        ws.send_json({**payload, "increment": 2000.0})
+        assert sum(r["buy"] * r["ticker_price"] for r in ws.receive_json()["results"]) > 1000
+
+
+def test_price_error_is_reported_and_retried(client, mock_provider, solves, payload):
+    mock_provider.get_prices.side_effect = [MarketDataError("upstream down"),
+                                            {"A": 10.0, "B": 20.0}]
+    with client.websocket_connect("/v1/rebalance/live") as ws:
+        ws.send_json(payload)
+        assert ws.receive_json() == {"detail": "upstream down"}
+        assert "results" in ws.receive_json()
+
+
+def test_invalid_portfolio_closes_with_1007(client, solves, payload):
+    with client.websocket_connect("/v1/rebalance/live") as ws:
+        ws.send_json({**payload, "increment": -1})
+        assert ws.receive_json()["detail"][0]["loc"] == ["increment"]
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+    assert exc.value.code == 1007
+
+
+def test_non_json_message_closes_with_1007(client, solves):
+    with client.websocket_connect("/v1/rebalance/live") as ws:
+        ws.send_text("not json")
+        assert ws.receive_json()["detail"][0]["type"] == "json_invalid"
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+    assert exc.value.code == 1007
+
+
+def test_portfolios_are_taken_from_the_rebalance_rate_limit(client, mock_provider, solves,
+                                                            monkeypatch, payload):
+    monkeypatch.setattr(get_settings(), "rate_limit_rebalance_per_minute", 60)
+    monkeypatch.setattr(get_settings(), "rate_limit_rebalance_burst", 1)
+    limiter = MemoryRateLimiter()
+    monkeypatch.setattr(deps, "_build_rate_limiter", lambda: limiter)
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    with client.websocket_connect("/v1/rebalance/live") as ws:
+        ws.send_json(payload)
+        ws.receive_json()
+        ws.send_json({**payload, "increment": 2000.0})
+        assert ws.receive_json() == {"detail": "Rate limit exceeded.", "retry_after": 1}
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+    assert exc.value.code == 1008
+
+
+def test_cache_writes_trigger_a_push_without_fetching(client, solves, monkeypatch, payload):
+    monkeypatch.setattr(get_settings(), "live_poll_seconds", 60)
+    upstream = MagicMock(spec=AbstractMarketDataProvider)
+    upstream.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    cache = LocalCache(ttl_seconds=60)
+    updates = PriceUpdates()
+    provider = CachedMarketDataProvider(upstream, cache, on_update=updates.publish)
+    app.dependency_overrides[get_market_provider] = lambda: provider
+    app.dependency_overrides[get_price_updates] = lambda: updates
+    with client.websocket_connect("/v1/rebalance/live") as ws:
+        ws.send_json(payload)
+        first = ws.receive_json()
+        # As the price streamer does: write the cache, then publish.
+        cache.set(price_key("B"), 25.0)
+        updates.publish(["B"])
+        second = ws.receive_json()
+
+    assert [r["ticker_price"] for r in first["results"]] == [10.0, 20.0]
+    assert [r["ticker_price"] for r in second["results"]] == [10.0, 25.0]
+    upstream.get_prices.assert_called_once_with(["A", "B"])
+
+
+def test_concurrent_refreshes_share_one_fetch(payload):
+    started = threading.Event()
+    release = threading.Event()
+    provider = MagicMock(spec=AbstractMarketDataProvider)
+
+    def slow(tickers):
+        started.set()
+        release.wait(5)
+        return {"A": 10.0, "B": 20.0}
+
+    provider.get_prices.side_effect = slow
+    request = RebalanceRequest(**payload)
+
+    async def main():
+        checks = [asyncio.create_task(_live_prices(request, provider)) for _ in range(3)]
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        release.set()
+        return await asyncio.gather(*checks)
+
+    assert asyncio.run(main()) == [[10.0, 20.0]] * 3
+    provider.get_prices.assert_called_once()
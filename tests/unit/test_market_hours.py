@@ -0,0 +1,92 @@
+"""Unit tests for trading-session aware cache TTLs."""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.market_data.market_hours import (
+    FUND_SETTLE_SECONDS,
+    SETTLE_SECONDS,
+    TradingSession,
+    cache_ttl,
+    next_open,
+)
+
+_BERLIN = ZoneInfo("Europe/Berlin")
+_MAX_TTL = 4 * 24 * 3600
+
+
+def _ts(*args: int, tz: ZoneInfo = _BERLIN) -> float:
+    return datetime(*args, tzinfo=tz).timestamp()
+
+
+# Friday 2026-10-16, XETRA regular session 09:00-17:30 local time.
+_FRIDAY = TradingSession(
+    start=_ts(2026, 10, 16, 9, 0), end=_ts(2026, 10, 16, 17, 30), timezone="Europe/Berlin",
+)
+
+
+def test_no_session_uses_default_ttl():
+    assert cache_ttl(None, _MAX_TTL, now=_FRIDAY.start) is None
+
+
+def test_open_market_uses_default_ttl():
+    assert cache_ttl(_FRIDAY, _MAX_TTL, now=_ts(2026, 10, 16, 12, 0)) is None
+
+
+def test_settle_window_after_close_uses_default_ttl():
+    assert cache_ttl(_FRIDAY, _MAX_TTL, now=_FRIDAY.end + SETTLE_SECONDS - 1) is None
+
+
+def test_fund_keeps_default_ttl_until_its_nav_is_out():
+    new_york = ZoneInfo("America/New_York")
+    fund = TradingSession(
+        start=_ts(2026, 10, 16, 9, 30, tz=new_york), end=_ts(2026, 10, 16, 16, 0, tz=new_york),
+        timezone="America/New_York", settle_seconds=FUND_SETTLE_SECONDS,
+    )
+    # Friday 16:20 ET: the NAV is not published yet, Thursday's must not be held.
+    assert cache_ttl(fund, _MAX_TTL, now=_ts(2026, 10, 16, 16, 20, tz=new_york)) is None
+    now = _ts(2026, 10, 17, 1, 0, tz=new_york)
+    assert cache_ttl(fund, _MAX_TTL, now=now) == pytest.approx(
+        _ts(2026, 10, 19, 9, 30, tz=new_york) - now
+    )
+
+
+def test_before_open_holds_until_open():
+    now = _ts(2026, 10, 16, 8, 0)
+    assert cache_ttl(_FRIDAY, _MAX_TTL, now=now) == pytest.approx(3600)
+
+
+def test_friday_evening_holds_until_monday_open():
+    now = _ts(2026, 10, 16, 20, 0)
+    assert cache_ttl(_FRIDAY, _MAX_TTL, now=now) == pytest.approx(_ts(2026, 10, 19, 9, 0) - now)
+
+
+def test_hold_is_capped():
+    assert cache_ttl(_FRIDAY, 3600, now=_ts(2026, 10, 17, 12, 0)) == 3600
+
+
+def test_next_open_keeps_local_time_across_dst_change():
+    # Europe leaves summer time on Sunday 2026-10-25.
+    friday = TradingSession(
+        start=_ts(2026, 10, 23, 9, 0), end=_ts(2026, 10, 23, 17, 30), timezone="Europe/Berlin",
+    )
+    assert next_open(friday, _ts(2026, 10, 23, 20, 0)) == _ts(2026, 10, 26, 9, 0)
+
+
+def test_continuous_session_rollover_gap_uses_default_ttl():
+    utc = ZoneInfo("UTC")
+    fx = TradingSession(
+        start=_ts(2026, 10, 15, 0, 0, tz=utc), end=_ts(2026, 10, 15, 23, 59, tz=utc), timezone="UTC",
+    )
+    assert cache_ttl(fx, _MAX_TTL, now=_ts(2026, 10, 15, 23, 59, 30, tz=utc)) is None
+
+
+def test_continuous_session_weekend_holds_until_monday():
+    utc = ZoneInfo("UTC")
+    fx = TradingSession(
+        start=_ts(2026, 10, 16, 0, 0, tz=utc), end=_ts(2026, 10, 16, 23, 59, tz=utc), timezone="UTC",
+    )
+    now = _ts(2026, 10, 17, 12, 0, tz=utc)
+    assert cache_ttl(fx, _MAX_TTL, now=now) == pytest.approx(_ts(2026, 10, 19, 0, 0, tz=utc) - now)
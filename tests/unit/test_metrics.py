@@ -0,0 +1,73 @@
+"""Unit tests for the in-process Prometheus metrics registry."""
+
+import pytest
+
+from app.core.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_renders_labelled_samples():
+    c = Counter("requests_total", "Requests.", ["route"])
+    c.inc(route="/a")
+    c.inc(2, route="/a")
+    assert c.value(route="/a") == 3.0
+    text = c.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/a"} 3.0' in text
+
+
+def test_wrong_labels_raise():
+    c = Counter("x_total", "X.", ["route"])
+    with pytest.raises(ValueError):
+        c.inc(path="/a")
+
+
+def test_label_values_are_escaped():
+    c = Counter("x_total", "X.", ["q"])
+    c.inc(q='a"b')
+    assert r'x_total{q="a\"b"} 1.0' in c.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    h.observe(0.05)
+    h.observe(0.5)
+    h.observe(5.0)
+    text = h.render()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert h.count() == 3
+
+
+def test_histogram_times_blocks_that_raise():
+    h = Histogram("command_seconds", "Latency.", ["command"])
+    with pytest.raises(RuntimeError), h.time(command="get"):
+        raise RuntimeError
+    assert h.count(command="get") == 1
+
+
+def test_gauge_function_is_evaluated_at_render():
+    g = Gauge("depth", "Depth.", ["pool"])
+    depth = {"n": 1}
+    g.set_function(lambda: {("io",): depth["n"]})
+    depth["n"] = 4
+    assert 'depth{pool="io"} 4.0' in g.render()
+
+
+def test_registry_rejects_duplicate_names():
+    registry = Registry()
+    registry.register(Counter("dup_total", "Dup."))
+    with pytest.raises(ValueError):
+        registry.register(Counter("dup_total", "Dup."))
+
+
+def test_metrics_endpoint_serves_text_format():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
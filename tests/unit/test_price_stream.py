@@ -0,0 +1,170 @@
+"""Unit tests for streamed price ingestion."""
+
+import asyncio
+import base64
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.market_data.base import AbstractMarketDataProvider
+from app.market_data.cache import LocalCache
+from app.market_data.cached_provider import CachedMarketDataProvider, price_key
+from app.market_data.streaming import (
+    Popularity,
+    PriceStreamer,
+    PriceUpdate,
+    decode_message,
+    decode_pricing,
+    encode_pricing,
+)
+
+
+def _frame(ticker: str, price: float) -> str:
+    message = base64.b64encode(encode_pricing(ticker, price)).decode()
+    return json.dumps({"type": "pricing", "message": message})
+
+
+def test_pricing_round_trip_drops_float32_noise():
+    assert decode_pricing(encode_pricing("VWCE.DE", 112.53)) == PriceUpdate("VWCE.DE", 112.53)
+
+
+def test_unknown_fields_are_skipped():
+    # currency (4, string), time (3, varint) and changePercent (8, float) around the known ones.
+    data = (b"\x22\x03USD" + b"\x18\x96\x01" + encode_pricing("AAPL", 189.5)
+            + b"\x45\x00\x00\x80\x3f")
+    assert decode_pricing(data) == PriceUpdate("AAPL", 189.5)
+
+
+@pytest.mark.parametrize("data", [b"", b"\x0a\x05AA", b"\x0a\x04AAPL", b"\x15\x00\x00"])
+def test_malformed_pricing_raises(data):
+    with pytest.raises(ValueError):
+        decode_pricing(data)
+
+
+def test_message_versions():
+    raw = base64.b64encode(encode_pricing("AAPL", 189.5)).decode()
+    assert decode_message(raw) == PriceUpdate("AAPL", 189.5)
+    assert decode_message(_frame("AAPL", 189.5).encode()) == PriceUpdate("AAPL", 189.5)
+    assert decode_message(json.dumps({"type": "heartbeat"})) is None
+    with pytest.raises(ValueError):
+        decode_message("not base64!")
+
+
+def test_popularity_ranks_and_decays():
+    popularity = Popularity()
+    popularity.record(["A", "B", "A"])
+    popularity.record(["C", "A", "B"])
+    assert popularity.top(2) == ["A", "B"]
+    # Halved at every top(): C (1 request) is ranked for three rounds, A and B for four.
+    assert [popularity.top(3) for _ in range(4)] == [["A", "B", "C"], ["A", "B", "C"],
+                                                     ["A", "B"], []]
+
+
+def test_popularity_bounds_tracked_tickers():
+    popularity = Popularity(max_tracked=1)
+    popularity.record(["A", "B"])
+    assert popularity.top(5) == ["A"]
+
+
+def test_cached_provider_reports_lookups():
+    upstream = MagicMock(spec=AbstractMarketDataProvider)
+    upstream.get_prices.return_value = {"A": 1.0}
+    popularity = Popularity()
+    provider = CachedMarketDataProvider(upstream, LocalCache(ttl_seconds=60),
+                                        on_lookup=popularity.record)
+    provider.get_prices(["A"])
+    provider.get_prices(["A"])  # served from cache, still counted
+    assert popularity._counts == {"A": 2}
+
+
+def test_cached_provider_reports_fetched_prices():
+    upstream = MagicMock(spec=AbstractMarketDataProvider)
+    upstream.get_prices.return_value = {"B": 2.0}
+    cache = LocalCache(ttl_seconds=60)
+    cache.set(price_key("A"), 1.0)
+    updated = []
+    provider = CachedMarketDataProvider(upstream, cache, on_update=updated.append)
+    provider.get_prices(["A", "B"])
+    provider.get_prices(["A", "B"])  # all cached: nothing written
+    assert updated == [["B"]]
+
+
+class FakeConnection:
+    def __init__(self, frames: list[str]) -> None:
+        self.frames = frames
+        self.sent: list[dict] = []
+        self.subscribed = asyncio.Event()
+
+    async def send(self, message: str) -> None:
+        self.sent.append(json.loads(message))
+        self.subscribed.set()
+
+    async def __aiter__(self):
+        await self.subscribed.wait()
+        for frame in self.frames:
+            yield frame
+
+
+def test_stream_subscribes_to_popular_tickers_and_fills_cache():
+    cache = LocalCache(ttl_seconds=60)
+    popularity = Popularity()
+    popularity.record(["AAPL", "VWCE.DE"])
+    ws = FakeConnection([_frame("AAPL", 189.5), "garbage", _frame("VWCE.DE", 112.53),
+                         _frame("AAPL", 0.0)])
+    updated = []
+    streamer = PriceStreamer("ws://stub", cache, popularity, top_n=5, refresh_seconds=60,
+                             on_update=updated.append)
+
+    asyncio.run(streamer.stream(ws))
+
+    assert ws.sent == [{"subscribe": ["AAPL", "VWCE.DE"]}]
+    assert updated == [["AAPL"], ["VWCE.DE"]]
+    assert cache.get(price_key("AAPL")) == 189.5  # the zero price was ignored
+    assert cache.get(price_key("VWCE.DE")) == 112.53
+
+
+def test_subscriptions_follow_popularity():
+    popularity = Popularity()
+    popularity.record(["A"])
+    ws = FakeConnection([])
+    streamer = PriceStreamer("ws://stub", LocalCache(ttl_seconds=60), popularity,
+                             top_n=1, refresh_seconds=0)
+
+    async def main():
+        task = asyncio.create_task(streamer._follow_popularity(ws))
+        await asyncio.sleep(0)
+        popularity.record(["B", "B", "B", "B"])
+        while len(ws.sent) < 3:
+            await asyncio.sleep(0)
+        task.cancel()
+
+    asyncio.run(main())
+    assert ws.sent[:3] == [{"subscribe": ["A"]}, {"unsubscribe": ["A"]}, {"subscribe": ["B"]}]
+
+
+def test_run_reconnects_after_a_failure(monkeypatch):
+    attempts = []
+
+    class Failing:
+        async def __aenter__(self):
+            attempts.append(1)
+            raise OSError("refused")
+
+        async def __aexit__(self, *exc):
+            return False
+
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 3:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr("app.market_data.streaming.asyncio.sleep", fake_sleep)
+    streamer = PriceStreamer("ws://stub", LocalCache(ttl_seconds=60), Popularity(),
+                             top_n=5, refresh_seconds=60, connect=lambda url: Failing())
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(streamer.run())
+    assert len(attempts) == 3
+    assert sleeps == [1.0, 2.0, 4.0]
@@ -0,0 +1,101 @@
+"""Unit tests for request profiling and replay captures."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.api.deps import get_market_provider
+from app.core.config import get_settings
+from app.core.exceptions import Overloaded
+from app.main import app
+from app.market_data.base import AbstractMarketDataProvider
+from app.schemas.request import RebalanceRequest
+from app.services import profiling
+from app.services.profiling import RecordingProvider, profile_rebalance
+from benchmarks.replay import matches, replay
+
+_PAYLOAD = {
+    "only_buy": True,
+    "increment": 500.0,
+    "assets": [
+        {"ticker": "A", "desired_percentage": 60.0, "shares": 0, "fees": 0},
+        {"ticker": "B", "desired_percentage": 40.0, "shares": 0, "fees": 0},
+    ],
+}
+
+
+def _provider() -> MagicMock:
+    provider = MagicMock(spec=AbstractMarketDataProvider)
+    provider.get_prices.return_value = {"A": 30.0, "B": 7.0}
+    return provider
+
+
+def test_recording_provider_remembers_prices():
+    recorder = RecordingProvider(_provider())
+    assert recorder.get_prices(["A", "B"]) == {"A": 30.0, "B": 7.0}
+    assert recorder.prices == {"A": 30.0, "B": 7.0}
+
+
+def test_profile_is_attached_and_capture_replays(tmp_path):
+    response = profile_rebalance(RebalanceRequest(**_PAYLOAD), _provider(), tmp_path)
+
+    profile = response.profile
+    assert profile.prices == {"A": 30.0, "B": 7.0}
+    assert "run_rebalance" in profile.stats
+    assert (tmp_path / f"{profile.id}.prof").exists()
+
+    capture = json.loads((tmp_path / f"{profile.id}.json").read_text())
+    replayed, _ = replay(capture, repeat=1)
+    assert replayed == capture["response"]
+
+
+def test_capture_with_diagnostics_replays(tmp_path):
+    response = profile_rebalance(RebalanceRequest(**_PAYLOAD), _provider(), tmp_path,
+                                 diagnostics=True)
+    capture = json.loads((tmp_path / f"{response.profile.id}.json").read_text())
+    assert "diagnostics" in capture["response"]
+    replayed, _ = replay(capture, repeat=1)
+    assert matches(replayed, capture["response"])
+    assert not matches(replayed, {**capture["response"], "change": -1})
+
+
+def test_concurrent_profile_is_refused():
+    with profiling._profiling:
+        with pytest.raises(Overloaded) as exc:
+            profile_rebalance(RebalanceRequest(**_PAYLOAD), _provider())
+    assert exc.value.status_code == 429
+
+
+@pytest.fixture
+def admin_client(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    get_settings.cache_clear()
+    app.dependency_overrides[get_market_provider] = _provider
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.clear()
+    get_settings.cache_clear()
+
+
+def test_profiling_requires_admin_token(admin_client):
+    resp = admin_client.post("/v1/rebalance?profile=true", json=_PAYLOAD)
+    assert resp.status_code == 403
+    resp = admin_client.post("/v1/rebalance?profile=true", json=_PAYLOAD,
+                             headers={"X-Admin-Token": "wrong"})
+    assert resp.status_code == 403
+
+
+def test_profiled_response_includes_profile(admin_client):
+    resp = admin_client.post("/v1/rebalance?profile=true", json=_PAYLOAD,
+                             headers={"X-Admin-Token": "secret"})
+    assert resp.status_code == 200
+    assert resp.json()["profile"]["prices"] == {"A": 30.0, "B": 7.0}
+
+
+def test_plain_response_has_no_profile(admin_client):
+    resp = admin_client.post("/v1/rebalance", json=_PAYLOAD)
+    assert resp.status_code == 200
+    assert "profile" not in resp.json()
@@ -0,0 +1,115 @@
+"""Unit tests for the latency-aware price provider registry."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.exceptions import MarketDataError, SymbolNotFound
+from app.market_data.base import AbstractMarketDataProvider, AbstractQuoteProvider, Quote
+from app.market_data.market_hours import TradingSession
+from app.market_data.registry import ProviderRegistry
+
+
+def _provider(prices: dict[str, float] | None = None, error: Exception | None = None):
+    provider = MagicMock(spec=AbstractMarketDataProvider)
+    if error is not None:
+        provider.get_prices.side_effect = error
+    else:
+        provider.get_prices.side_effect = lambda tickers: {
+            t: prices[t] for t in tickers if t in prices
+        }
+    return provider
+
+
+def test_empty_ticker_list_raises():
+    registry = ProviderRegistry([("a", _provider({}))])
+    with pytest.raises(ValueError):
+        registry.get_quotes([])
+
+
+def test_returns_quotes_from_first_provider():
+    first, second = _provider({"A": 1.0}), _provider({"A": 2.0})
+    registry = ProviderRegistry([("first", first), ("second", second)])
+    assert registry.get_prices(["A"]) == {"A": 1.0}
+    second.get_prices.assert_not_called()
+
+
+def test_quote_provider_sessions_are_kept():
+    session = TradingSession(start=0, end=1, timezone="UTC")
+    provider = MagicMock(spec=AbstractQuoteProvider)
+    provider.get_quotes.return_value = {"A": Quote(1.0, session)}
+    registry = ProviderRegistry([("q", provider)])
+    assert registry.get_quotes(["A"]) == {"A": Quote(1.0, session)}
+
+
+def test_fails_over_when_provider_raises():
+    broken, backup = _provider(error=RuntimeError("down")), _provider({"A": 2.0, "B": 3.0})
+    registry = ProviderRegistry([("broken", broken), ("backup", backup)])
+    assert registry.get_prices(["A", "B"]) == {"A": 2.0, "B": 3.0}
+
+
+def test_missing_tickers_move_to_next_provider():
+    partial, backup = _provider({"A": 1.0}), _provider({"A": 9.0, "B": 2.0})
+    registry = ProviderRegistry([("partial", partial), ("backup", backup)])
+    assert registry.get_prices(["A", "B"]) == {"A": 1.0, "B": 2.0}
+    backup.get_prices.assert_called_once_with(["B"])
+
+
+def test_raises_when_every_provider_fails():
+    registry = ProviderRegistry([
+        ("a", _provider(error=RuntimeError("a down"))),
+        ("b", _provider(error=RuntimeError("b down"))),
+    ])
+    with pytest.raises(MarketDataError, match="b down"):
+        registry.get_prices(["A"])
+
+
+def test_failing_provider_ranks_after_healthy_one():
+    flaky, steady = _provider(error=RuntimeError("down")), _provider({"A": 1.0})
+    registry = ProviderRegistry([("flaky", flaky), ("steady", steady)])
+    registry.get_prices(["A"])
+    assert registry.ranked() == ["steady", "flaky"]
+
+
+def test_faster_provider_is_preferred():
+    registry = ProviderRegistry([("slow", _provider({})), ("fast", _provider({}))])
+    slow, fast = registry._states
+    registry._record(slow, 0.8, ok=True)
+    registry._record(fast, 0.1, ok=True)
+    assert registry.ranked() == ["fast", "slow"]
+
+
+def test_circuit_opens_after_threshold_and_closes_after_cooldown():
+    clock = MagicMock(return_value=0.0)
+    registry = ProviderRegistry(
+        [("a", _provider({})), ("b", _provider({}))],
+        failure_threshold=2, cooldown_seconds=30, clock=clock,
+    )
+    a, b = registry._states
+    registry._record(b, 5.0, ok=True)  # much slower, but healthy
+    registry._record(a, 0.01, ok=False)
+    assert registry.ranked()[0] == "a"
+    registry._record(a, 0.01, ok=False)
+    assert registry.ranked() == ["b", "a"]
+    clock.return_value = 31.0
+    assert registry.ranked()[0] == "a"
+
+
+def test_open_circuit_provider_is_still_tried_last():
+    clock = MagicMock(return_value=0.0)
+    only = _provider({"A": 1.0})
+    registry = ProviderRegistry([("only", only)], failure_threshold=1, clock=clock)
+    registry._record(registry._states[0], 0.1, ok=False)
+    assert registry.get_prices(["A"]) == {"A": 1.0}
+
+
+def test_unknown_ticker_does_not_open_the_circuit():
+    clock = MagicMock(return_value=0.0)
+    unknown = _provider(error=SymbolNotFound("no such ticker"))
+    registry = ProviderRegistry([("a", unknown), ("b", _provider({}))],
+                                failure_threshold=1, clock=clock)
+    with pytest.raises(MarketDataError, match="no such ticker"):
+        registry.get_prices(["NOPE"])
+    a, b = registry._states
+    assert a.failures == 0 and a.open_until == 0.0
+    assert a.error_rate == 0.0
@@ -0,0 +1,135 @@
+"""Unit tests for per-client token-bucket rate limiting."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.api.deps import get_ticker_search_provider
+from app.core.config import get_settings
+from app.core.rate_limit import Budget, MemoryRateLimiter, RedisRateLimiter
+from app.main import app
+from app.market_data.base import AbstractTickerSearchProvider
+
+BUDGET = Budget("search", per_minute=60, burst=2)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    limiter = MemoryRateLimiter(clock=clock)
+
+    async def take():
+        return await limiter.acquire("ip:1", BUDGET)
+
+    first, second, third = (asyncio.run(take()) for _ in range(3))
+    assert (first.allowed, first.remaining) == (True, 1)
+    assert (second.allowed, second.remaining, second.reset_seconds) == (True, 0, 2)
+    assert (third.allowed, third.retry_after) == (False, 1)
+
+    clock.now = 1.0  # one token a second
+    assert asyncio.run(take()).allowed
+    assert not asyncio.run(take()).allowed
+
+
+def test_clients_and_budgets_have_separate_buckets():
+    limiter = MemoryRateLimiter(clock=FakeClock())
+    rebalance = Budget("rebalance", per_minute=60, burst=1)
+
+    async def main():
+        a = await limiter.acquire("ip:1", rebalance)
+        b = await limiter.acquire("ip:1", rebalance)
+        c = await limiter.acquire("ip:2", rebalance)
+        d = await limiter.acquire("ip:1", BUDGET)
+        return [x.allowed for x in (a, b, c, d)]
+
+    assert asyncio.run(main()) == [True, False, True, True]
+
+
+def test_least_recent_client_is_dropped():
+    limiter = MemoryRateLimiter(max_clients=1, clock=FakeClock())
+    one = Budget("search", per_minute=60, burst=1)
+
+    async def main():
+        await limiter.acquire("ip:1", one)
+        await limiter.acquire("ip:2", one)
+        # ip:1's empty bucket was evicted: it starts full again.
+        return (await limiter.acquire("ip:1", one)).allowed
+
+    assert asyncio.run(main())
+
+
+def test_redis_limiter_reads_script_result():
+    client = MagicMock()
+    client.register_script.return_value = AsyncMock(return_value=[0, 400])
+    limiter = RedisRateLimiter(client)
+
+    decision = asyncio.run(limiter.acquire("ip:1", BUDGET))
+
+    script = client.register_script.return_value
+    script.assert_awaited_once_with(keys=["ratelimit:search:ip:1"], args=[1.0, 2])
+    assert (decision.allowed, decision.remaining, decision.retry_after) == (False, 0, 1)
+
+
+def test_redis_limiter_fails_open():
+    client = MagicMock()
+    client.register_script.return_value = AsyncMock(side_effect=ConnectionError("down"))
+
+    decision = asyncio.run(RedisRateLimiter(client).acquire("ip:1", BUDGET))
+
+    assert decision.allowed
+    assert decision.remaining == BUDGET.burst
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(get_settings(), "rate_limit_search_per_minute", 60)
+    monkeypatch.setattr(get_settings(), "rate_limit_search_burst", 2)
+    limiter = MemoryRateLimiter()
+    monkeypatch.setattr(deps, "_build_rate_limiter", lambda: limiter)
+    provider = MagicMock(spec=AbstractTickerSearchProvider)
+    provider.asearch.return_value = []
+    app.dependency_overrides[get_ticker_search_provider] = lambda: provider
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+
+def test_search_returns_limit_headers_then_429(client):
+    first = client.get("/v1/tickers/search?q=VW")
+    assert first.status_code == 200
+    assert first.headers["RateLimit-Limit"] == "2"
+    assert first.headers["RateLimit-Remaining"] == "1"
+
+    client.get("/v1/tickers/search?q=VW")
+    limited = client.get("/v1/tickers/search?q=VW")
+    assert limited.status_code == 429
+    assert limited.headers["RateLimit-Remaining"] == "0"
+    assert limited.headers["Retry-After"] == "1"
+
+
+def test_api_key_gets_its_own_bucket(client, monkeypatch):
+    monkeypatch.setattr(deps, "_api_keys", lambda: frozenset({"secret"}))
+    for _ in range(2):
+        client.get("/v1/tickers/search?q=VW")
+    assert client.get("/v1/tickers/search?q=VW").status_code == 429
+    resp = client.get("/v1/tickers/search?q=VW", headers={"X-API-Key": "secret"})
+    assert resp.status_code == 200
+
+
+def test_unknown_api_key_shares_the_ip_bucket(client, monkeypatch):
+    monkeypatch.setattr(deps, "_api_keys", lambda: frozenset({"secret"}))
+    for i in range(2):
+        client.get("/v1/tickers/search?q=VW", headers={"X-API-Key": f"made-up-{i}"})
+    resp = client.get("/v1/tickers/search?q=VW", headers={"X-API-Key": "made-up-2"})
+    assert resp.status_code == 429
+
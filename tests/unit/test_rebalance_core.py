@@ -3,6 +3,8 @@
 import unittest
 
 from app.rebalance import (
+    SolverCancelled,
+    SolverStats,
     calculate_rebalance,
     redistribute_change,
     redistribute_change_optimal,
@@ -544,5 +546,49 @@ class TestRedistributeChangeOptimalShared(unittest.TestCase):
                 self.assertAlmostEqual(remaining, 100.0, places=2)
 
 
+class TestSolverStats(unittest.TestCase):
+    def test_dp_path_reports_table_size(self):
+        stats = SolverStats()
+        redistribute_change_optimal(
+            False, [1, 1], [3.0, 7.0], [50.0, 50.0], [50.0, 50.0], 10.0, stats=stats,
+        )
+        self.assertEqual(stats.path, "dp")
+        self.assertEqual(stats.candidates, 2)
+        self.assertEqual(stats.capacity_cents, 1000)
+        self.assertEqual(stats.cells, 2000)
+        self.assertEqual(stats.table_bytes, 24 * 1001)
+
+    def test_large_change_reports_greedy_fallback(self):
+        stats = SolverStats()
+        redistribute_change_optimal(
+            False, [1], [10.0], [100.0], [100.0], MAX_CENTS / 100 + 1, stats=stats,
+        )
+        self.assertEqual(stats.path, "greedy_fallback")
+        self.assertEqual(stats.cells, 0)
+
+    def test_unaffordable_candidates_report_no_candidates(self):
+        stats = SolverStats()
+        redistribute_change_optimal(
+            False, [1], [500.0], [100.0], [100.0], 10.0, stats=stats,
+        )
+        self.assertEqual(stats.path, "no_candidates")
+
+
+class TestCancellation(unittest.TestCase):
+    def test_should_cancel_aborts_the_dp(self):
+        with self.assertRaises(SolverCancelled):
+            redistribute_change_optimal(
+                False, [1, 1], [3.0, 7.0], [50.0, 50.0], [50.0, 50.0], 1000.0,
+                should_cancel=lambda: True,
+            )
+
+    def test_should_cancel_false_does_not_change_result(self):
+        args = (False, [1, 1], [3.0, 7.0], [50.0, 50.0], [50.0, 50.0], 1000.0)
+        self.assertEqual(
+            redistribute_change_optimal(*args, should_cancel=lambda: False),
+            redistribute_change_optimal(*args),
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
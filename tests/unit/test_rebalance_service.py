@@ -359,3 +359,48 @@ def test_zero_price_raises_market_data_error():
     ])
     with pytest.raises(MarketDataError, match="Invalid price"):
         _run(req, {"A": 0.0})
+
+
+# ---------------------------------------------------------------------------
+# Diagnostics
+# ---------------------------------------------------------------------------
+
+def test_diagnostics_omitted_by_default():
+    req = _request(True, 100.0, [{"ticker": "A", "desired_percentage": 100.0}])
+    assert _run(req, {"A": 30.0}).diagnostics is None
+
+
+def test_diagnostics_report_dp_path():
+    """A: 1 share (30), B: 16 shares (48) -> 22.00 left; only B (3.00) fits the DP."""
+    req = _request(False, 100.0, [
+        {"ticker": "A", "desired_percentage": 50.0},
+        {"ticker": "B", "desired_percentage": 50.0},
+    ], optimal_redistribute=True)
+    provider = MagicMock(spec=AbstractMarketDataProvider)
+    provider.get_prices.return_value = {"A": 30.0, "B": 3.0}
+    diag = run_rebalance(req, provider, diagnostics=True).diagnostics
+    assert diag.solver == "knapsack"
+    assert diag.path == "dp"
+    assert (diag.candidates, diag.capacity_cents, diag.cells) == (1, 2200, 2200)
+    assert diag.solve_ms >= 0
+
+
+def test_diagnostics_report_price_cache_counts():
+    from app.core import tracing
+    from app.market_data.cache import LocalCache
+    from app.market_data.cached_provider import CachedMarketDataProvider
+
+    upstream = MagicMock(spec=AbstractMarketDataProvider)
+    provider = CachedMarketDataProvider(upstream, LocalCache(ttl_seconds=300))
+    req = _request(True, 100.0, [
+        {"ticker": "A", "desired_percentage": 50.0},
+        {"ticker": "B", "desired_percentage": 50.0},
+    ])
+    upstream.get_prices.return_value = {"A": 20.0}
+    provider.get_prices(["A"])  # warm A
+    upstream.get_prices.return_value = {"B": 10.0}
+    with tracing.collect():
+        diag = run_rebalance(req, provider, diagnostics=True).diagnostics
+    assert diag.solver == "greedy"
+    assert diag.path == "greedy"
+    assert (diag.price_cache_hits, diag.price_cache_misses) == (1, 1)
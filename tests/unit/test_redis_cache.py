@@ -0,0 +1,61 @@
+"""Unit tests for RedisCache against a stub asyncio client."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.market_data.redis_cache import RedisCache
+
+
+def _client(stored: str | None = None) -> MagicMock:
+    client = MagicMock()
+    client.get = AsyncMock(return_value=stored)
+    client.setex = AsyncMock(return_value=True)
+    return client
+
+
+def test_aget_decodes_value():
+    cache = RedisCache(_client("12.5"), ttl_seconds=60)
+    assert asyncio.run(cache.aget("k")) == 12.5
+
+
+def test_aget_returns_none_for_missing_key():
+    cache = RedisCache(_client(None), ttl_seconds=60)
+    assert asyncio.run(cache.aget("k")) is None
+
+
+def test_aset_uses_setex_with_ttl_and_dumps():
+    client = _client()
+    cache = RedisCache(client, ttl_seconds=60, loads=json.loads, dumps=json.dumps)
+    asyncio.run(cache.aset("k", {"a": 1}))
+    client.setex.assert_awaited_once_with("k", 60, '{"a": 1}')
+
+
+def test_sync_get_from_thread_runs_on_bound_loop():
+    cache = RedisCache(_client("3.0"), ttl_seconds=60)
+
+    async def main() -> float | None:
+        loop = asyncio.get_running_loop()
+        cache.bind_loop(loop)
+        return await loop.run_in_executor(None, cache.get, "k")
+
+    assert asyncio.run(main()) == 3.0
+
+
+def test_sync_get_before_bind_raises():
+    cache = RedisCache(_client("3.0"), ttl_seconds=60)
+    with pytest.raises(RuntimeError, match="bind_loop"):
+        cache.get("k")
+
+
+def test_sync_get_on_event_loop_raises():
+    cache = RedisCache(_client("3.0"), ttl_seconds=60)
+
+    async def main() -> None:
+        cache.bind_loop(asyncio.get_running_loop())
+        cache.get("k")
+
+    with pytest.raises(RuntimeError, match="deadlock"):
+        asyncio.run(main())
@@ -0,0 +1,57 @@
+"""Unit tests for per-route request latency and executor queue depth metrics."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import executors
+from app.core.request_metrics import _DURATION, RequestMetricsMiddleware
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    router = APIRouter()
+
+    @router.get("/items/{item_id}")
+    async def item(item_id: str) -> dict:
+        return {"id": item_id}
+
+    app.include_router(router, prefix="/v1")
+    return app
+
+
+def test_requests_are_labelled_by_prefixed_route_template():
+    labels = {"method": "GET", "route": "/v1/items/{item_id}", "status": "200"}
+    before = _DURATION.count(**labels)
+    with TestClient(_app()) as client:
+        client.get("/v1/items/a")
+        client.get("/v1/items/b")
+    assert _DURATION.count(**labels) == before + 2
+
+
+def test_unmatched_requests_share_one_label():
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = _DURATION.count(**labels)
+    with TestClient(_app()) as client:
+        client.get("/nope/1")
+        client.get("/nope/2")
+    assert _DURATION.count(**labels) == before + 2
+
+
+def test_executor_queue_depth_counts_waiting_tasks():
+    started, release = threading.Event(), threading.Event()
+    pool = executors.track("test", ThreadPoolExecutor(max_workers=1))
+    try:
+        pool.submit(lambda: (started.set(), release.wait()))
+        started.wait(1)
+        pool.submit(release.wait)
+        pool.submit(release.wait)
+        assert executors._depths()[("test",)] == 2
+        assert 'executor_queue_depth{executor="test"} 2.0' in executors._QUEUE_DEPTH.render()
+    finally:
+        release.set()
+        pool.shutdown()
@@ -0,0 +1,86 @@
+"""Unit tests for memoised rebalance results."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.api.deps import get_result_cache
+from app.api.v1.routes.rebalance import _run_cached
+from app.main import app
+from app.market_data.cache import LocalCache
+from app.schemas.request import RebalanceRequest
+from app.services import rebalance_service
+from app.services.rebalance_service import resolve_prices, result_key
+from benchmarks.portfolios import StaticPrices
+
+
+@pytest.fixture
+def results(client) -> LocalCache:
+    cache = LocalCache(ttl_seconds=60, max_entries=8)
+    app.dependency_overrides[get_result_cache] = lambda: cache
+    return cache
+
+
+def test_key_covers_request_and_prices(payload):
+    request = RebalanceRequest(**payload)
+    same = RebalanceRequest(**{**payload, "optimal_redistribute": False})
+    assert result_key(request, [10.0, 20.0]) == result_key(same, [10.0, 20.0])
+    assert result_key(request, [10.0, 20.0]) != result_key(request, [10.0, 20.01])
+    other = RebalanceRequest(**{**payload, "increment": 1001.0})
+    assert result_key(request, [10.0, 20.0]) != result_key(other, [10.0, 20.0])
+
+
+def test_repeat_request_is_served_from_cache(client, mock_provider, results, solves, payload):
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    first = client.post("/v1/rebalance", json=payload)
+    second = client.post("/v1/rebalance", json=payload)
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert len(solves) == 1
+
+
+def test_new_prices_are_solved_again(client, mock_provider, results, solves, payload):
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    client.post("/v1/rebalance", json=payload)
+    mock_provider.get_prices.return_value = {"A": 11.0, "B": 20.0}
+    resp = client.post("/v1/rebalance", json=payload)
+    assert resp.json()["results"][0]["ticker_price"] == 11.0
+    assert len(solves) == 2
+
+
+def test_diagnostics_bypass_the_cache(client, mock_provider, results, solves, payload):
+    mock_provider.get_prices.return_value = {"A": 10.0, "B": 20.0}
+    client.post("/v1/rebalance", json=payload)
+    client.post("/v1/rebalance?diagnostics=true", json=payload)
+    assert len(solves) == 2
+
+
+def test_concurrent_identical_requests_share_one_solve(monkeypatch, solves, payload):
+    started = threading.Event()
+    release = threading.Event()
+    counting = rebalance_service._solve
+
+    def slow(*args):
+        started.set()
+        release.wait(5)
+        return counting(*args)
+
+    monkeypatch.setattr(rebalance_service, "_solve", slow)
+    request = RebalanceRequest(**payload)
+    prices = resolve_prices(request, StaticPrices({"A": 10.0, "B": 20.0}))
+    key = result_key(request, prices)
+    cache = LocalCache(ttl_seconds=60, max_entries=8)
+
+    async def main():
+        runs = [
+            asyncio.create_task(_run_cached(request, prices, key, cache, None))
+            for _ in range(3)
+        ]
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        release.set()
+        return await asyncio.gather(*runs)
+
+    responses = asyncio.run(main())
+    assert len(solves) == 1
+    assert responses[0] is responses[1] is responses[2]
@@ -0,0 +1,114 @@
+"""Unit tests for the shared-memory price cache."""
+
+import asyncio
+import uuid
+from multiprocessing import shared_memory
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.market_data.shm_cache import KEY_SIZE, SharedMemoryCache
+
+
+@pytest.fixture
+def name():
+    segment = f"test-prices-{uuid.uuid4().hex[:12]}"
+    yield segment
+    try:
+        shm = shared_memory.SharedMemory(name=segment)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def _cache(name: str, ttl: int = 300, slots: int = 64) -> tuple[SharedMemoryCache, MagicMock]:
+    clock = MagicMock(return_value=1000.0)
+    return SharedMemoryCache(name, ttl_seconds=ttl, slots=slots, clock=clock), clock
+
+
+def test_set_then_get(name):
+    cache, _ = _cache(name)
+    cache.set("market:price:AAPL", 189.5)
+    assert cache.get("market:price:AAPL") == 189.5
+    assert cache.get("market:price:MSFT") is None
+
+
+def test_overwrite_reuses_slot(name):
+    cache, _ = _cache(name)
+    cache.set("k", 1.0)
+    cache.set("k", 2.0)
+    assert cache.get("k") == 2.0
+
+
+def test_entry_expires(name):
+    cache, clock = _cache(name, ttl=300)
+    cache.set("k", 1.0)
+    clock.return_value = 1300.0
+    assert cache.get("k") == 1.0
+    clock.return_value = 1300.5
+    assert cache.get("k") is None
+
+
+def test_per_call_ttl_overrides_default(name):
+    cache, clock = _cache(name, ttl=300)
+    cache.set("k", 1.0, ttl_seconds=3600)
+    clock.return_value = 1000.0 + 3000
+    assert cache.get("k") == 1.0
+
+
+def test_instances_with_same_name_share_entries(name):
+    writer, _ = _cache(name)
+    reader, _ = _cache(name)
+    writer.set("market:price:VWCE.DE", 112.3)
+    assert reader.get("market:price:VWCE.DE") == 112.3
+
+
+def test_colliding_keys_are_probed(name):
+    cache, _ = _cache(name, slots=4)
+    for i in range(4):
+        cache.set(f"k{i}", float(i))
+    assert [cache.get(f"k{i}") for i in range(4)] == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_full_table_skips_new_keys(name, caplog):
+    cache, _ = _cache(name, slots=2)
+    cache.set("a", 1.0)
+    cache.set("b", 2.0)
+    cache.set("c", 3.0)
+    assert cache.get("c") is None
+    assert cache.get("a") == 1.0
+    assert "full" in caplog.text
+
+
+def test_oversized_key_is_not_cached(name):
+    cache, _ = _cache(name)
+    key = "x" * (KEY_SIZE + 1)
+    cache.set(key, 1.0)
+    assert cache.get(key) is None
+
+
+def test_incompatible_layout_is_rejected(name):
+    _cache(name, slots=64)
+    with pytest.raises(RuntimeError, match="incompatible layout"):
+        _cache(name, slots=128)
+
+
+def test_shutdown_detaches_without_snapshot(name, monkeypatch, tmp_path):
+    # Snapshots belong to the in-process cache; the segment persists by itself.
+    from app.api import deps
+    from app.core.config import get_settings
+
+    path = tmp_path / "prices.json"
+    monkeypatch.setattr(get_settings(), "cache_backend", "shm")
+    monkeypatch.setattr(get_settings(), "price_snapshot_path", str(path))
+    cache, _ = _cache(name)
+    cache.set("k", 1.0)
+    build = MagicMock(return_value=cache)
+    monkeypatch.setattr(deps, "_build_cache", build)
+    asyncio.run(deps.close_resources())
+    assert not path.exists()
+    assert cache._buf is None
+    build.cache_clear.assert_called_once()
+    # Closing detached this worker only: the entries stay in the segment.
+    assert _cache(name)[0].get("k") == 1.0
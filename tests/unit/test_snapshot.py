@@ -0,0 +1,72 @@
+"""Unit tests for the on-disk price snapshot."""
+
+from unittest.mock import MagicMock
+
+from app.market_data.cache import LocalCache
+from app.market_data.snapshot import load_snapshot, write_snapshot
+
+
+def _cache(ttl: int = 300) -> tuple[LocalCache, MagicMock]:
+    clock = MagicMock(return_value=0.0)
+    return LocalCache(ttl_seconds=ttl, clock=clock), clock
+
+
+def test_round_trip_restores_values(tmp_path):
+    path = tmp_path / "prices.snap"
+    source, _ = _cache()
+    source.set("market:price:A", 101.25)
+    source.set("market:price:B", 0.5)
+    assert write_snapshot(path, source, clock=lambda: 1000.0) == 2
+
+    target, _ = _cache()
+    assert load_snapshot(path, target, clock=lambda: 1000.0) == 2
+    assert target.get("market:price:A") == 101.25
+    assert target.get("market:price:B") == 0.5
+
+
+def test_restored_entry_keeps_original_expiry(tmp_path):
+    path = tmp_path / "prices.snap"
+    source, source_clock = _cache(ttl=300)
+    source.set("k", 1.0)
+    source_clock.return_value = 240.0  # one minute of TTL left
+    write_snapshot(path, source, clock=lambda: 1000.0)
+
+    target, target_clock = _cache(ttl=300)
+    load_snapshot(path, target, clock=lambda: 1030.0)  # restart took 30 s
+    target_clock.return_value = 29.0
+    assert target.get("k") == 1.0
+    target_clock.return_value = 31.0
+    assert target.get("k") is None
+
+
+def test_entries_expired_while_down_are_skipped(tmp_path):
+    path = tmp_path / "prices.snap"
+    source, _ = _cache(ttl=60)
+    source.set("k", 1.0)
+    write_snapshot(path, source, clock=lambda: 1000.0)
+
+    target, _ = _cache()
+    assert load_snapshot(path, target, clock=lambda: 1061.0) == 0
+    assert target.get("k") is None
+
+
+def test_missing_file_starts_cold(tmp_path):
+    target, _ = _cache()
+    assert load_snapshot(tmp_path / "absent.snap", target) == 0
+
+
+def test_corrupt_file_is_ignored(tmp_path):
+    path = tmp_path / "prices.snap"
+    path.write_bytes(b"garbage!")
+    target, _ = _cache()
+    assert load_snapshot(path, target) == 0
+
+
+def test_truncated_file_is_ignored(tmp_path):
+    path = tmp_path / "prices.snap"
+    source, _ = _cache()
+    source.set("k", 1.0)
+    write_snapshot(path, source)
+    path.write_bytes(path.read_bytes()[:-4])
+    target, _ = _cache()
+    assert load_snapshot(path, target) == 0
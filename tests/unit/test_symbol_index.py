@@ -0,0 +1,112 @@
+"""Unit tests for SymbolIndex and IndexedTickerSearchProvider."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.market_data.base import AbstractTickerSearchProvider
+from app.market_data.indexed_search_provider import IndexedTickerSearchProvider
+from app.market_data.symbol_index import BUNDLED_SYMBOLS, SymbolIndex
+
+
+def _quote(symbol: str, shortname: str, quote_type: str = "ETF") -> dict:
+    return {"symbol": symbol, "shortname": shortname, "exchange": "GER", "quoteType": quote_type}
+
+
+@pytest.fixture
+def index() -> SymbolIndex:
+    return SymbolIndex([
+        _quote("VWCE.DE", "Vanguard FTSE All-World UCITS ETF"),
+        _quote("VAGF.DE", "Vanguard Global Aggregate Bond UCITS ETF"),
+        _quote("VWRL.AS", "Vanguard FTSE All-World UCITS ETF"),
+        _quote("^GDAXI", "DAX Performance Index", "INDEX"),
+        _quote("V", "Visa Inc.", "EQUITY"),
+    ])
+
+
+# ---------------------------------------------------------------------------
+# SymbolIndex
+# ---------------------------------------------------------------------------
+
+def test_symbol_prefix_match(index):
+    assert [q["symbol"] for q in index.search("vwc", limit=10)] == ["VWCE.DE"]
+
+
+def test_name_terms_must_all_match(index):
+    result = index.search("vanguard all", limit=10)
+    assert [q["symbol"] for q in result] == ["VWCE.DE", "VWRL.AS"]
+
+
+def test_exact_symbol_ranked_first(index):
+    assert index.search("v", limit=10)[0]["symbol"] == "V"
+
+
+def test_disallowed_types_are_dropped(index):
+    assert index.search("dax", limit=10) == []
+    assert len(index) == 4
+
+
+def test_limit_is_applied(index):
+    assert len(index.search("vanguard", limit=2)) == 2
+
+
+def test_no_match_returns_empty(index):
+    assert index.search("zzzz", limit=10) == []
+
+
+def test_bundled_file_loads():
+    bundled = SymbolIndex.from_csv(BUNDLED_SYMBOLS)
+    assert bundled.search("VWCE", limit=1)[0]["symbol"] == "VWCE.DE"
+
+
+# ---------------------------------------------------------------------------
+# IndexedTickerSearchProvider
+# ---------------------------------------------------------------------------
+
+def _make_provider(index: SymbolIndex, min_hits: int) -> tuple[IndexedTickerSearchProvider, MagicMock]:
+    upstream = MagicMock(spec=AbstractTickerSearchProvider)
+    upstream.search.return_value = [
+        _quote("VWCE.DE", "Vanguard FTSE All-World UCITS ETF"),
+        _quote("VWCA.DE", "Vanguard FTSE All-World Acc"),
+    ]
+    return IndexedTickerSearchProvider(index, upstream, min_hits), upstream
+
+
+def test_enough_local_hits_skip_upstream(index):
+    provider, upstream = _make_provider(index, min_hits=1)
+    assert [q["symbol"] for q in provider.search("VWCE")] == ["VWCE.DE"]
+    upstream.search.assert_not_called()
+
+
+def test_enough_local_hits_return_all_of_them(index):
+    provider, upstream = _make_provider(index, min_hits=1)
+    result = provider.search("vanguard")
+    assert [q["symbol"] for q in result] == ["VWCE.DE", "VAGF.DE", "VWRL.AS"]
+    upstream.search.assert_not_called()
+
+
+def test_merged_quotes_are_capped_at_the_result_limit(index):
+    upstream = MagicMock(spec=AbstractTickerSearchProvider)
+    upstream.search.return_value = [_quote(f"VW{i}.DE", "Vanguard") for i in range(5)]
+    provider = IndexedTickerSearchProvider(index, upstream, min_hits=5, result_limit=3)
+    assert [q["symbol"] for q in provider.search("VWC")] == ["VWCE.DE", "VW0.DE", "VW1.DE"]
+
+
+def test_too_few_hits_merge_upstream_without_duplicates(index):
+    provider, upstream = _make_provider(index, min_hits=5)
+    result = provider.search("VWC")
+    assert [q["symbol"] for q in result] == ["VWCE.DE", "VWCA.DE"]
+    upstream.search.assert_called_once_with("VWC")
+
+
+def test_upstream_failure_serves_local_hits(index):
+    provider, upstream = _make_provider(index, min_hits=5)
+    upstream.search.side_effect = RuntimeError("timeout")
+    assert [q["symbol"] for q in provider.search("VWC")] == ["VWCE.DE"]
+
+
+def test_upstream_failure_without_local_hits_propagates(index):
+    provider, upstream = _make_provider(index, min_hits=5)
+    upstream.search.side_effect = RuntimeError("timeout")
+    with pytest.raises(RuntimeError, match="timeout"):
+        provider.search("zzzz")
@@ -13,7 +13,10 @@ from app.market_data.base import AbstractTickerSearchProvider
 
 @pytest.fixture
 def mock_search_provider() -> MagicMock:
-    return MagicMock(spec=AbstractTickerSearchProvider)
+    provider = MagicMock(spec=AbstractTickerSearchProvider)
+    # The route awaits asearch; route it through search so tests configure one method.
+    provider.asearch.side_effect = lambda q: provider.search(q)
+    return provider
 
 
 @pytest.fixture
@@ -0,0 +1,88 @@
+"""Unit tests for per-request stage timing and the Server-Timing header."""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_market_provider
+from app.api.v1.routes import rebalance
+from app.core import tracing
+from app.core.tracing import RequestTrace, ServerTimingMiddleware
+from app.market_data.base import AbstractMarketDataProvider
+from app.market_data.cache import LocalCache
+from app.market_data.cached_provider import CachedMarketDataProvider
+
+_PAYLOAD = {
+    "only_buy": True,
+    "increment": 500.0,
+    "assets": [{"ticker": "A", "desired_percentage": 100.0, "shares": 0, "fees": 0}],
+}
+
+
+def _stages(header: str) -> dict[str, float]:
+    return {
+        name: float(dur.removeprefix("dur="))
+        for name, dur in (part.strip().split(";") for part in header.split(","))
+    }
+
+
+def test_stage_without_trace_is_noop():
+    with tracing.stage("solve"):
+        pass
+    tracing.count("hits")
+    assert tracing.current() is None
+
+
+def test_stages_accumulate_and_format():
+    trace = RequestTrace()
+    trace.add("cache", 0.001)
+    trace.add("cache", 0.0005)
+    trace.add("solve", 0.002)
+    assert trace.server_timing() == "cache;dur=1.50, solve;dur=2.00"
+
+
+def test_bind_carries_trace_into_executor_thread():
+    trace = RequestTrace()
+    token = tracing._current.set(trace)
+    try:
+        def work() -> str:
+            with tracing.stage("solve"):
+                tracing.count("hits", 2)
+            return "done"
+
+        with ThreadPoolExecutor(1) as pool:
+            assert pool.submit(tracing.bind(work)).result() == "done"
+    finally:
+        tracing._current.reset(token)
+    assert {"queue", "solve"} <= trace.stages.keys()
+    assert trace.counters == {"hits": 2}
+
+
+def test_rebalance_response_reports_stages():
+    upstream = MagicMock(spec=AbstractMarketDataProvider)
+    upstream.get_prices.return_value = {"A": 100.0}
+    provider = CachedMarketDataProvider(upstream, LocalCache(ttl_seconds=60))
+
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+    app.include_router(rebalance.router, prefix="/v1")
+    app.dependency_overrides[get_market_provider] = lambda: provider
+
+    with TestClient(app) as client:
+        cold = client.post("/v1/rebalance", json=_PAYLOAD)
+        warm = client.post("/v1/rebalance", json=_PAYLOAD)
+
+    assert cold.status_code == 200
+    stages = _stages(cold.headers["server-timing"])
+    assert {"parse", "queue", "cache", "upstream", "solve", "serialize", "total"} <= stages.keys()
+    assert stages["total"] >= stages["solve"]
+    assert "upstream" not in _stages(warm.headers["server-timing"])
+
+
+def test_header_absent_without_middleware(client, mock_provider):
+    mock_provider.get_prices.return_value = {"A": 100.0}
+    resp = client.post("/v1/rebalance", json=_PAYLOAD)
+    assert resp.status_code == 200
+    assert "server-timing" not in resp.headers
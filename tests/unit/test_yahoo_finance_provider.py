@@ -2,9 +2,11 @@
 
 from unittest.mock import MagicMock, call, patch
 
+import httpx
 import pytest
 
-from app.core.exceptions import MarketDataError
+from app.core.exceptions import MarketDataError, SymbolNotFound
+from app.market_data.market_hours import FUND_SETTLE_SECONDS, TradingSession
 from app.market_data.yahoo_finance_provider import YahooFinanceProvider
 
 
@@ -76,13 +78,67 @@ def test_succeeds_on_second_attempt(mock_get, mock_sleep):
 def test_empty_close_after_filtering_retries_and_raises(mock_get, mock_sleep):
     mock_get.return_value = _resp([None, None])
     provider = YahooFinanceProvider()
-    with pytest.raises(MarketDataError, match="after 3 attempts"):
+    with pytest.raises(SymbolNotFound, match="after 3 attempts"):
         provider.get_prices(["EMPTY"])
     assert mock_get.call_count == 3
     assert mock_sleep.call_count == 2
 
 
+@patch("app.market_data.yahoo_finance_provider.time.sleep")
+@patch("app.market_data.yahoo_finance_provider.httpx.get")
+def test_unknown_symbol_raises_symbol_not_found_without_retrying(mock_get, mock_sleep):
+    request = httpx.Request("GET", "https://query2.finance.yahoo.com/v8/finance/chart/NOPE")
+    resp = MagicMock()
+    resp.raise_for_status.side_effect = httpx.HTTPStatusError(
+        "404 Not Found", request=request, response=httpx.Response(404, request=request),
+    )
+    mock_get.return_value = resp
+    with pytest.raises(SymbolNotFound, match="NOPE"):
+        YahooFinanceProvider().get_prices(["NOPE"])
+    assert mock_get.call_count == 1
+    mock_sleep.assert_not_called()
+
+
 def test_empty_ticker_list_raises_value_error():
     provider = YahooFinanceProvider()
     with pytest.raises(ValueError, match="empty"):
         provider.get_prices([])
+
+
+@patch("app.market_data.yahoo_finance_provider.httpx.get")
+def test_quotes_carry_regular_trading_session(mock_get):
+    resp = _resp([10.0])
+    resp.json.return_value["chart"]["result"][0]["meta"] = {
+        "instrumentType": "ETF",
+        "exchangeTimezoneName": "Europe/Berlin",
+        "currentTradingPeriod": {"regular": {"start": 100, "end": 200}},
+    }
+    mock_get.return_value = resp
+    quotes = YahooFinanceProvider().get_quotes(["VWCE.DE"])
+    assert quotes["VWCE.DE"].price == 10.0
+    assert quotes["VWCE.DE"].session == TradingSession(100.0, 200.0, "Europe/Berlin")
+
+
+@patch("app.market_data.yahoo_finance_provider.httpx.get")
+def test_crypto_quotes_have_no_session(mock_get):
+    resp = _resp([10.0])
+    resp.json.return_value["chart"]["result"][0]["meta"] = {
+        "instrumentType": "CRYPTOCURRENCY",
+        "exchangeTimezoneName": "UTC",
+        "currentTradingPeriod": {"regular": {"start": 100, "end": 200}},
+    }
+    mock_get.return_value = resp
+    assert YahooFinanceProvider().get_quotes(["BTC-USD"])["BTC-USD"].session is None
+
+
+@patch("app.market_data.yahoo_finance_provider.httpx.get")
+def test_fund_quotes_settle_until_the_nav_is_out(mock_get):
+    resp = _resp([500.0])
+    resp.json.return_value["chart"]["result"][0]["meta"] = {
+        "instrumentType": "MUTUALFUND",
+        "exchangeTimezoneName": "America/New_York",
+        "currentTradingPeriod": {"regular": {"start": 100, "end": 200}},
+    }
+    mock_get.return_value = resp
+    session = YahooFinanceProvider().get_quotes(["VFIAX"])["VFIAX"].session
+    assert session.settle_seconds == FUND_SETTLE_SECONDS
@@ -1,6 +1,7 @@
 """Unit tests for YahooTickerSearchProvider (httpx-based)."""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -38,3 +39,12 @@ def test_http_error_propagates(mock_get):
     provider = YahooTickerSearchProvider()
     with pytest.raises(Exception, match="connection refused"):
         provider.search("AAPL")
+
+
+@patch("app.market_data.yahoo_search_provider.httpx.AsyncClient")
+def test_asearch_returns_quotes_list(mock_client_cls):
+    quotes = [{"symbol": "AAPL", "quoteType": "EQUITY"}]
+    client = mock_client_cls.return_value.__aenter__.return_value
+    client.get = AsyncMock(return_value=_resp(quotes))
+    provider = YahooTickerSearchProvider()
+    assert asyncio.run(provider.asearch("AAPL")) == quotes